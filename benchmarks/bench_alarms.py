@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# check_for_alarms'ın her tik başına maliyetini hasta sayısına göre ölçer.
+# Sahte bir saat bir günü dakika dakika ilerletir; alarm çıkan ve çıkmayan tikler ayrı raporlanır.
+# Ayrıca tüm hastaların aynı dakikada (08:00) çalan alarmlarının tek tikte toplanıp dağıtılması ölçülür.
+# Kullanım: python3 benchmarks/bench_alarms.py [hasta sayısı ...]
+
+import os
+import sys
+import json
+import shutil
+import random
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QCoreApplication
+
+from hemsirem_engine import AlarmEngine
+from hemsirem_patients import PatientRegistry
+from hemsirem_plan import TIME_FIELD
+
+# bench_timing_wheel ile aynı dağılım: her zaman diliminin tipik saat aralığı
+SLOT_HOURS = [(7, 9), (10, 11), (12, 13), (15, 16), (18, 19), (21, 23)]
+# Ölçümün başladığı an (bir pazartesi); haftalık sıfırlama ölçüme karışmasın diye gün içinde kalınır
+START = datetime(2026, 10, 12, 0, 0, 30)
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def _engine(patient_count, clock):
+    # Hasta listesi önceden yazılır; add_patient her eklemede patients.json'ı yeniden yazdığından
+    # binlerce hasta için kurulum ölçümden uzun sürerdi
+    data_dir = tempfile.mkdtemp(prefix="hemsirem-bench-")
+    registry = PatientRegistry(data_dir)
+    registry.load()
+    registry.patients += [{"id": f"hasta-{i}", "name": f"Hasta {i}"} for i in range(1, patient_count)]
+    registry.save()
+    return AlarmEngine(data_dir, clock=lambda: clock[0])
+
+
+def _close(engine):
+    engine.close()
+    shutil.rmtree(engine.data_dir, ignore_errors=True)
+
+
+def bench_same_minute(patient_count):
+    # Tüm hastaların pazartesi sabah dozu 08:00'de: tek tikte toplama, sıralama ve tek bildirim
+    clock = [START.replace(hour=7, minute=59)]
+    engine = _engine(patient_count, clock)
+    for patient_id in engine.patients:
+        engine.set_value(patient_id, (0, 0, TIME_FIELD), 8 * 60)
+    engine.flush()
+    alarms = []
+    engine.alarm.connect(alarms.append)
+    clock[0] = START.replace(hour=8, minute=0, second=1)
+    t0 = time.perf_counter()
+    engine.check_for_alarms()
+    elapsed = time.perf_counter() - t0
+    delivered = len(alarms[0]["alarms"]) if alarms and alarms[0]["type"] == "batch" else len(alarms)
+    _close(engine)
+    return delivered, elapsed
+
+
+def bench(patient_count, seed=1):
+    rng = random.Random(seed)
+    clock = [START]
+    engine = _engine(patient_count, clock)
+    for patient_id in engine.patients:
+        for day in range(len(engine.days)):
+            for slot, (first_hour, last_hour) in enumerate(SLOT_HOURS):
+                if rng.random() < 0.7:
+                    minute = rng.randint(first_hour, last_hour) * 60 + rng.choice((0, 15, 30, 45))
+                    engine.set_value(patient_id, (day, slot, TIME_FIELD), minute)
+    engine.flush()
+    alarms = []
+    engine.alarm.connect(alarms.append)
+    engine.check_for_alarms()
+
+    idle, firing = [], []
+    for minute in range(1, 24 * 60):
+        clock[0] = START + timedelta(minutes=minute)
+        before = len(alarms)
+        t0 = time.perf_counter()
+        engine.check_for_alarms()
+        elapsed = time.perf_counter() - t0
+        (firing if len(alarms) > before else idle).append(elapsed)
+    _close(engine)
+    delivered, same_minute = bench_same_minute(patient_count)
+
+    return {
+        "patients": patient_count,
+        "ticks": len(idle) + len(firing),
+        "alarm_ticks": len(firing),
+        "idle_tick_median_us": round(_percentile(idle, 0.5) * 1e6, 2),
+        "idle_tick_p99_us": round(_percentile(idle, 0.99) * 1e6, 2),
+        "alarm_tick_median_us": round(_percentile(firing, 0.5) * 1e6, 2),
+        "alarm_tick_p99_us": round(_percentile(firing, 0.99) * 1e6, 2),
+        "same_minute_alarms": delivered,
+        "same_minute_tick_ms": round(same_minute * 1000, 2),
+    }
+
+
+def run(patient_counts=(1, 10, 100, 1000, 10000)):
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    return [bench(count) for count in patient_counts]
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [1, 10, 100, 1000, 10000]
+    # Programın kendi bilgi mesajları JSON çıktısına karışmasın
+    with redirect_stdout(sys.stderr):
+        results = run(counts)
+    print(json.dumps(results, indent=4))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# Hasta başına bellek kullanımını ölçer: alan modeli (Schedule), derlenmiş alarm dizini ve karşılaştırma için
+# eski sürümün adlarla anahtarlanmış iç içe sözlüğü. Qt yüklenmez; alan modeli PyQt5 olmadan da kullanılabilir.
+# Kullanım: python3 benchmarks/bench_memory.py [hasta sayısı ...]
+
+import os
+import sys
+import json
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from hemsirem_plan import (DAYS, TIME_SLOTS, TIME_FIELD, STATUS_FIELD, STATUS_LABELS, Status, Schedule,
+                           time_text)
+from hemsirem_schedule import ScheduleIndex
+
+
+def _random_minute(rng):
+    return rng.randrange(24) * 60 + rng.choice((0, 15, 30, 45))
+
+
+def synthetic_state(rng):
+    # Dolu bir hasta: tüm zaman dilimlerinde saat ve durum, günlük ilaçlar ve randevu
+    schedule = Schedule()
+    for day in range(len(DAYS)):
+        for slot in range(len(TIME_SLOTS)):
+            schedule.apply((day, slot, TIME_FIELD), _random_minute(rng))
+            schedule.apply((day, slot, STATUS_FIELD), rng.choice(list(Status)))
+    schedule.apply(("daily_medications",), [f"İlaç {slot} 1x1, Vitamin" for slot in range(len(TIME_SLOTS))])
+    schedule.apply(("appointment_data",), {"hospital": "Devlet Hastanesi", "doctor": "Dr. Ayşe Yılmaz",
+                                           "time": "10:30", "date": "01.08.2025",
+                                           "reminder_time": "09:00", "reminder_date": "31.07.2025"})
+    # Gerçek yüklemedeki gibi metinler JSON'dan gelir (paylaşılan sabitler ölçümü çarpıtmasın)
+    return json.dumps(schedule.to_state(), ensure_ascii=False)
+
+
+def legacy_state(state):
+    # Aynı verinin eski (sürüm 1) biçimi: gün adı -> zaman dilimi adı -> {"time", "status"}
+    schedule = Schedule.from_state(json.loads(state))
+    data = dict(schedule.settings(), last_reset_date="2025-07-28")
+    for day, day_name in enumerate(DAYS):
+        data[day_name] = {
+            slot_name: {"time": time_text(schedule.plan.minute(day, slot)),
+                        "status": STATUS_LABELS[schedule.plan.statuses[day * len(TIME_SLOTS) + slot]]}
+            for slot, slot_name in enumerate(TIME_SLOTS)}
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _measure(build, sources):
+    # Oluşturulan nesneler canlı tutulurken ayrılan bellek, hasta başına bayt olarak
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [build(source) for source in sources]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del objects
+    return round(used / len(sources))
+
+
+def _compiled(state):
+    schedule = Schedule.from_state(json.loads(state))
+    index = ScheduleIndex(DAYS, TIME_SLOTS)
+    index.compile(schedule)
+    return schedule, index
+
+
+def bench(patient_count, seed=1):
+    rng = random.Random(seed)
+    states = [synthetic_state(rng) for _ in range(patient_count)]
+    legacy = [legacy_state(state) for state in states]
+    return {
+        "patients": patient_count,
+        "schedule_bytes_per_patient": _measure(lambda state: Schedule.from_state(json.loads(state)), states),
+        "schedule_with_index_bytes_per_patient": _measure(_compiled, states),
+        "legacy_dict_bytes_per_patient": _measure(json.loads, legacy),
+    }
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [1, 10, 100]
+    print(json.dumps([bench(count) for count in counts], indent=4))
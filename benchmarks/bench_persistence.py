@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# Veri yükleme (load_medications) ve kaydetme (set_value + flush) süresini veri boyutuna göre ölçer.
+# Veri boyutu: yapılmış düzenleme sayısı (günlük uzunluğu) ve hasta sayısı; her iki depolama arka ucu için.
+# Kullanım: python3 benchmarks/bench_persistence.py [düzenleme sayısı ...]
+
+import os
+import sys
+import json
+import random
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QCoreApplication
+
+from hemsirem_engine import AlarmEngine
+from hemsirem_patients import Patient
+from hemsirem_storage import STORAGE_BACKENDS
+from hemsirem_plan import Status, TIME_FIELD, STATUS_FIELD
+
+# Gerçek kullanımdaki gibi her bu kadar düzenlemede bir diske yazılır
+EDITS_PER_FLUSH = 10
+SAVE_BATCH = 20
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def _random_edit(engine, rng):
+    day, slot = rng.randrange(len(engine.days)), rng.randrange(len(engine.time_slots))
+    if rng.random() < 0.5:
+        return (day, slot, TIME_FIELD), rng.randrange(24) * 60 + rng.choice((0, 15, 30, 45))
+    return (day, slot, STATUS_FIELD), rng.choice(list(Status))
+
+
+def _disk_bytes(data_dir):
+    return sum(os.path.getsize(os.path.join(data_dir, name)) for name in os.listdir(data_dir)
+               if os.path.isfile(os.path.join(data_dir, name)))
+
+
+def bench(edit_count, backend, repeats=20, seed=1):
+    os.environ["HEMSIREM_STORAGE"] = backend
+    rng = random.Random(seed)
+    data_dir = tempfile.mkdtemp(prefix="hemsirem-bench-")
+    engine = AlarmEngine(data_dir)
+    patient_id = engine.active_id
+    for number in range(edit_count):
+        engine.set_value(patient_id, *_random_edit(engine, rng))
+        if number % EDITS_PER_FLUSH == EDITS_PER_FLUSH - 1:
+            engine.flush()
+
+    # Kaydetme: tek düzenleme ve SAVE_BATCH düzenlemelik bir grup, her biri ardından flush ile
+    save_one, save_batch = [], []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        engine.set_value(patient_id, *_random_edit(engine, rng))
+        engine.flush()
+        save_one.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        for _ in range(SAVE_BATCH):
+            engine.set_value(patient_id, *_random_edit(engine, rng))
+        engine.flush()
+        save_batch.append(time.perf_counter() - t0)
+    engine.close()
+
+    # Yükleme: dosyaları açan yeni bir hasta nesnesi, motorun açılışta yaptığı gibi
+    load = []
+    for _ in range(repeats):
+        patient = Patient(patient_id, "", data_dir, engine.days, engine.time_slots)
+        t0 = time.perf_counter()
+        engine.load_medications(patient)
+        load.append(time.perf_counter() - t0)
+        patient.storage.close()
+
+    return {
+        "backend": backend,
+        "edits": edit_count,
+        "disk_bytes": _disk_bytes(data_dir),
+        "load_median_ms": round(_median(load) * 1000, 3),
+        "save_one_median_ms": round(_median(save_one) * 1000, 3),
+        f"save_{SAVE_BATCH}_median_ms": round(_median(save_batch) * 1000, 3),
+    }
+
+
+def bench_open(patient_count, backend, seed=1):
+    # Motorun açılışta tüm hastaları yüklemesi (hasta başına load_medications) ne kadar sürer
+    os.environ["HEMSIREM_STORAGE"] = backend
+    rng = random.Random(seed)
+    data_dir = tempfile.mkdtemp(prefix="hemsirem-bench-")
+    engine = AlarmEngine(data_dir)
+    while len(engine.patients) < patient_count:
+        patient = engine.add_patient(f"Hasta {len(engine.patients)}")
+        for _ in range(EDITS_PER_FLUSH):
+            engine.set_value(patient.id, *_random_edit(engine, rng))
+    engine.close()
+    t0 = time.perf_counter()
+    engine = AlarmEngine(data_dir)
+    open_ms = (time.perf_counter() - t0) * 1000
+    engine.close()
+    return {"backend": backend, "patients": patient_count, "engine_open_ms": round(open_ms, 2)}
+
+
+def run(edit_counts=(10, 100, 1000, 10000), patient_counts=(1, 10, 100)):
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    previous = os.environ.get("HEMSIREM_STORAGE")
+    try:
+        return {
+            "edits": [bench(count, backend) for backend in STORAGE_BACKENDS for count in edit_counts],
+            "patients": [bench_open(count, backend) for backend in STORAGE_BACKENDS for count in patient_counts],
+        }
+    finally:
+        if previous is None:
+            os.environ.pop("HEMSIREM_STORAGE", None)
+        else:
+            os.environ["HEMSIREM_STORAGE"] = previous
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10, 100, 1000, 10000]
+    # Programın kendi bilgi mesajları JSON çıktısına karışmasın
+    with redirect_stdout(sys.stderr):
+        results = run(counts)
+    print(json.dumps(results, indent=4))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# Tekrar kurallarından sıradaki N tekrarın üretilme süresini yüzlerce kural için ölçer; ayrıca her kuralın
+# sıradaki tekrarının alarm yığınına konması ve yığının zaman sırasıyla boşaltılması ölçülür. Qt yüklenmez.
+# Kullanım: python3 benchmarks/bench_recurrence.py [kural sayısı ...]
+
+import os
+import sys
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from hemsirem_recurrence import Recurrence
+from hemsirem_schedule import AlarmScheduler
+
+# Gerçekçi kural karışımı; başlangıç anları ölçüm anından aylar, yıllar önce
+RULES = (
+    "FREQ=HOURLY;INTERVAL=8",
+    "FREQ=HOURLY;INTERVAL=12;COUNT=60",
+    "FREQ=DAILY",
+    "FREQ=DAILY;INTERVAL=2;BYHOUR=9,21",
+    "FREQ=WEEKLY;BYDAY=MO,WE,FR",
+    "FREQ=WEEKLY;INTERVAL=2;BYDAY=TU,TH;BYHOUR=8;BYMINUTE=30",
+    "FREQ=MONTHLY;BYDAY=1MO",
+    "FREQ=MONTHLY;BYMONTHDAY=1,15,-1",
+    "FREQ=DAILY;COUNT=500",
+)
+
+
+def synthetic_rules(count, now, rng):
+    rules = []
+    for i in range(count):
+        start = now - timedelta(days=rng.randint(30, 3 * 365), minutes=rng.choice((0, 15, 30, 45)))
+        rules.append(Recurrence(f"İlaç {i}", start.replace(second=0, microsecond=0), rng.choice(RULES)))
+    return rules
+
+
+def bench(rule_count, next_count=10, seed=1):
+    rng = random.Random(seed)
+    now = datetime(2025, 8, 1, 12, 0)
+    rules = synthetic_rules(rule_count, now, rng)
+
+    started = time.perf_counter()
+    produced = sum(len(rule.next_occurrences(now, next_count)) for rule in rules)
+    next_ms = (time.perf_counter() - started) * 1000
+
+    # Motorun yaptığı gibi: yığında kural başına yalnızca sıradaki tekrar; çalan kural yeniden zamanlanır
+    scheduler = AlarmScheduler()
+    started = time.perf_counter()
+    for i, rule in enumerate(rules):
+        scheduler.schedule(i, rule.next_after(now))
+    feed_ms = (time.perf_counter() - started) * 1000
+
+    fired = 0
+    cursor = now
+    started = time.perf_counter()
+    while fired < rule_count * next_count and scheduler.next_deadline() is not None:
+        cursor = scheduler.next_deadline()
+        for key, when in scheduler.pop_due(cursor):
+            scheduler.schedule(key, rules[key].next_after(when))
+            fired += 1
+    drain_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        "rules": rule_count,
+        "next": next_count,
+        "occurrences": produced,
+        "next_occurrences_ms": round(next_ms, 2),
+        "next_occurrences_per_rule_us": round(next_ms * 1000 / rule_count, 2),
+        "feed_scheduler_ms": round(feed_ms, 2),
+        "fired": fired,
+        "drain_scheduler_ms": round(drain_ms, 2),
+        "simulated_days": round((cursor - now).total_seconds() / 86400, 1),
+    }
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [100, 500]
+    print(json.dumps([bench(count, next_count) for count in counts for next_count in (10, 100)], indent=4))
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# Bir servisteki tüm hastalar için aylık uyum raporu üretme süresini ölçer (sıralı ve süreç havuzuyla).
+# Kullanım: python3 benchmarks/bench_report.py [hasta sayısı] [biçim ...]
+
+import os
+import sys
+import json
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from hemsirem_history import AdherenceHistory
+from hemsirem_patients import PatientRegistry
+from hemsirem_plan import TIME_SLOTS, Status
+from hemsirem_report import month_range, report_jobs, render_reports
+
+# Rapordan önceki bu kadar günlük geçmiş de yazılır; dizin sayesinde raporda okunmamalı
+HISTORY_DAYS = 365
+
+
+def synthetic_ward(root_dir, patient_count, month_end, seed=1):
+    rng = random.Random(seed)
+    registry = PatientRegistry(root_dir)
+    registry.load()
+    while len(registry.patients) < patient_count:
+        registry.add(f"Hasta {len(registry.patients)}")
+    records = 0
+    for patient in registry.patients:
+        history = AdherenceHistory(registry.data_dir(patient["id"]))
+        for offset in range(HISTORY_DAYS, -1, -1):
+            day = month_end - timedelta(days=offset)
+            changed_at = datetime.combine(day, datetime.min.time()).timestamp()
+            for slot in range(len(TIME_SLOTS)):
+                # Bazı dozlar gün içinde birden çok kez işaretlenir; raporda son durum sayılır
+                for _ in range(rng.choice((1, 1, 1, 2))):
+                    history.append(day, slot, rng.choices(list(Status), (1, 7, 1, 1))[0], changed_at)
+                    records += 1
+        history.close()
+    return registry, records
+
+
+def bench(patient_count, formats):
+    root_dir = tempfile.mkdtemp(prefix="hemsirem-bench-")
+    start, end = month_range(2026, 9)
+    started = time.perf_counter()
+    registry, records = synthetic_ward(root_dir, patient_count, end)
+    results = {"patients": patient_count, "history_records": records,
+               "setup_s": round(time.perf_counter() - started, 2)}
+    for report_format in formats:
+        out_dir = os.path.join(root_dir, report_format)
+        os.makedirs(out_dir)
+        jobs = report_jobs(registry, None, start, end, report_format, out_dir)
+        for label, processes in (("serial", 1), ("pool", None)):
+            t0 = time.perf_counter()
+            rendered = render_reports(jobs, processes)
+            results[f"{report_format}_{label}_s"] = round(time.perf_counter() - t0, 3)
+        results[f"{report_format}_doses_per_report"] = rendered[0][1]
+    return results
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    formats = sys.argv[2:] or ["csv", "html", "pdf"]
+    print(json.dumps(bench(count, formats), indent=4))
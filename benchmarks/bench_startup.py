@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# Hemşirem penceresinin açılış süresini (kurulum + ilk boyama) ve widget sayısını ölçer.
+# Kullanım: QT_QPA_PLATFORM=offscreen python3 benchmarks/bench_startup.py [tekrar sayısı]
+
+import os
+import sys
+import json
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+# Ölçümler kullanıcının gerçek verisine dokunmasın
+os.environ["HOME"] = tempfile.mkdtemp(prefix="hemsirem-bench-")
+
+from PyQt5.QtWidgets import QApplication
+
+
+def bench(repeats):
+    app = QApplication.instance() or QApplication(sys.argv)
+    started = time.perf_counter()
+    import hemsirem
+    import_ms = (time.perf_counter() - started) * 1000
+
+    construct, first_paint, widgets = [], [], []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        window = hemsirem.HemşiremApp()
+        t1 = time.perf_counter()
+        window.show()
+        window.repaint()
+        app.processEvents()
+        t2 = time.perf_counter()
+        construct.append((t1 - t0) * 1000)
+        first_paint.append((t2 - t0) * 1000)
+        widgets.append(len(app.allWidgets()))
+        window.engine.close()
+        window.tray_icon and window.tray_icon.hide()
+        window.deleteLater()
+        app.processEvents()
+
+    construct.sort()
+    first_paint.sort()
+    return {
+        "import_ms": round(import_ms, 2),
+        "construct_median_ms": round(construct[len(construct) // 2], 2),
+        "first_paint_median_ms": round(first_paint[len(first_paint) // 2], 2),
+        "widgets": widgets[0],
+    }
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print(json.dumps(bench(repeats), indent=4))
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# Zamanlama çarkında alarm dağıtım gecikmesini farklı hasta sayıları için ölçer.
+# Kullanım: python3 benchmarks/bench_timing_wheel.py [hasta sayısı ...]
+
+import os
+import sys
+import json
+import random
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from hemsirem_schedule import ScheduleIndex, TimingWheel, MINUTES_PER_WEEK
+from hemsirem_plan import DAYS, TIME_SLOTS, TIME_FIELD, Schedule
+# Gerçekçi bir dağılım için her zaman diliminin tipik saat aralığı
+SLOT_HOURS = [(7, 9), (10, 11), (12, 13), (15, 16), (18, 19), (21, 23)]
+
+
+def synthetic_schedule(rng):
+    schedule = Schedule()
+    for day in range(len(DAYS)):
+        for slot, (first_hour, last_hour) in enumerate(SLOT_HOURS):
+            if rng.random() < 0.7:
+                schedule.apply((day, slot, TIME_FIELD), rng.randint(first_hour, last_hour) * 60 + rng.choice((0, 15, 30, 45)))
+    return schedule
+
+
+def bench(patient_count, samples=2000, seed=1):
+    rng = random.Random(seed)
+    wheel = TimingWheel()
+    started = time.perf_counter()
+    for patient_id in range(patient_count):
+        index = ScheduleIndex(DAYS, TIME_SLOTS, owner=SimpleNamespace(id=patient_id))
+        index.wheel = wheel
+        index.compile(synthetic_schedule(rng))
+    build_ms = (time.perf_counter() - started) * 1000
+
+    # Alarmlar gerçekte zaman sırasıyla dağıtılır; ölçüm de haftayı ileriye doğru dolaşır
+    start_minute = rng.randrange(MINUTES_PER_WEEK)
+    latencies = []
+    due_total = 0
+    for step in range(samples):
+        week_minute = (start_minute + step * 7) % MINUTES_PER_WEEK
+        t0 = time.perf_counter()
+        due = wheel.due(week_minute)
+        wheel.next_due_minute((week_minute + 1) % MINUTES_PER_WEEK)
+        latencies.append(time.perf_counter() - t0)
+        due_total += len(due)
+
+    latencies.sort()
+    return {
+        "patients": patient_count,
+        "entries": len(wheel),
+        "build_ms": round(build_ms, 2),
+        "dispatch_median_us": round(latencies[len(latencies) // 2] * 1e6, 2),
+        "dispatch_p99_us": round(latencies[int(len(latencies) * 0.99)] * 1e6, 2),
+        "due_per_minute_avg": round(due_total / samples, 2),
+    }
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10, 1000, 10000]
+    print(json.dumps([bench(count) for count in counts], indent=4))
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# Çizelgenin yeniden doldurulma süresini ve alarm penceresinin açılma gecikmesini ölçer.
+# Kullanım: QT_QPA_PLATFORM=offscreen python3 benchmarks/bench_ui.py [tekrar sayısı]
+
+import os
+import sys
+import json
+import tempfile
+import time
+from contextlib import nullcontext, redirect_stdout
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+# Ölçümler kullanıcının gerçek verisine dokunmasın
+os.environ["HOME"] = tempfile.mkdtemp(prefix="hemsirem-bench-")
+
+from PyQt5.QtWidgets import QApplication
+
+from hemsirem_plan import TIME_FIELD, STATUS_FIELD, Status, DAY_GROUPS, template_changes
+
+
+def _median_ms(values):
+    values = sorted(values)
+    return round(values[len(values) // 2] * 1000, 3)
+
+
+def _alarms(window):
+    engine, patient = window.engine, window.patient
+    now = datetime.now().replace(second=0, microsecond=0)
+    medication = engine._alarm_payload("medication", patient, now)
+    medication.update(day=engine.days[now.weekday()], time_slot=engine.time_slots[0], medications="Aspirin")
+    appointment = engine._alarm_payload("appointment", patient, now, days_left=3)
+    batch = engine._batch_payload([medication, appointment], [medication], now)
+    return {"medication": medication, "appointment": appointment, "batch": batch}
+
+
+def _journal_lines(storage):
+    path = getattr(storage, "journal_file", None)
+    if path is None or not os.path.exists(path):
+        return 0
+    with open(path, 'rb') as f:
+        return f.read().count(b"\n")
+
+
+def _bulk_update(window, batched, status):
+    # Tüm hafta (42 zaman dilimi) için saat ve durum; ardından kayıt diske yazılır.
+    # Sayaçlar: depolama yazması, günlük kaydı, motor sinyali ve görünüm bildirimi.
+    engine, patient, model = window.engine, window.patient, window.schedule_model
+    signals = []
+    on_changed = lambda *args: signals.append(args)
+    engine.changed.connect(on_changed)
+    engine.changed_batch.connect(on_changed)
+    engine.flush()
+    writes, lines, updates = patient.storage.writes, _journal_lines(patient.storage), model.updates
+    t0 = time.perf_counter()
+    with engine.batch(patient.id) if batched else nullcontext():
+        for day in range(len(window.days)):
+            for slot in range(len(window.time_slots)):
+                engine.set_value(patient.id, (day, slot, TIME_FIELD), 7 * 60 + slot * 150)
+                engine.set_value(patient.id, (day, slot, STATUS_FIELD), status)
+    engine.flush()
+    window.repaint()
+    QApplication.processEvents()
+    elapsed = time.perf_counter() - t0
+    engine.changed.disconnect(on_changed)
+    engine.changed_batch.disconnect(on_changed)
+    return {
+        "ms": round(elapsed * 1000, 3),
+        "storage_writes": patient.storage.writes - writes,
+        "journal_records": _journal_lines(patient.storage) - lines,
+        "engine_signals": len(signals),
+        "ui_updates": model.updates - updates,
+    }
+
+
+def _template_update(window, minute):
+    # Haftalık şablon: bir zaman diliminin saati ve ilacı tüm günlere, tek toplu güncellemeyle
+    engine, patient, model = window.engine, window.patient, window.schedule_model
+    engine.flush()
+    writes, compiles, updates = patient.storage.writes, patient.schedule_index.compiles, model.updates
+    t0 = time.perf_counter()
+    with engine.batch(patient.id):
+        for path, value in template_changes(patient.schedule, 1, minute, DAY_GROUPS["Tüm hafta"], f"Şablon {minute}"):
+            engine.set_value(patient.id, path, value)
+    engine.flush()
+    window.repaint()
+    QApplication.processEvents()
+    elapsed = time.perf_counter() - t0
+    return {
+        "ms": round(elapsed * 1000, 3),
+        "storage_writes": patient.storage.writes - writes,
+        "index_compiles": patient.schedule_index.compiles - compiles,
+        "ui_updates": model.updates - updates,
+    }
+
+
+def bench(repeats):
+    app = QApplication.instance() or QApplication(sys.argv)
+    import hemsirem
+    window = hemsirem.HemşiremApp()
+    # Ölçüm sırasında ses çalınmaz; yalnızca pencerenin açılması ölçülür
+    window.audio.play = lambda *args, **kwargs: False
+    window.show()
+    app.processEvents()
+    for day in range(len(window.days)):
+        window.engine.set_value(window.patient.id, (day, 0, TIME_FIELD), 8 * 60)
+    # Tüm gün sekmeleri açılmış olsun; yenileme tüm görünümlere yayılır
+    for index in range(window.tab_widget.count()):
+        window.tab_widget.setCurrentIndex(index)
+        app.processEvents()
+
+    # Hasta verisinin tamamen yeniden bağlanması (eski update_ui_with_medication_data karşılığı)
+    # ve tek bir hücrenin yenilenmesi; ikisi de ekrana çizilene kadar
+    full, cell = [], []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        window.activate_patient(window.patient.id)
+        window.repaint()
+        app.processEvents()
+        full.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        window.on_engine_data_changed(window.patient.id, [window.current_day_index, 0, STATUS_FIELD])
+        window.repaint()
+        app.processEvents()
+        cell.append(time.perf_counter() - t0)
+
+    # Haftanın tamamının güncellenmesi: tek tek ve toplu (engine.batch) olarak
+    bulk_update = {"single": _bulk_update(window, False, Status.TAKEN),
+                   "batch": _bulk_update(window, True, Status.NOT_TAKEN)}
+    template = [_template_update(window, 9 * 60 + i) for i in range(repeats)]
+
+    # Alarm geldiği andan pencerenin çizilmesine kadar; ardından pencere onaylanarak kapatılır
+    dialog_latency = {}
+    for alarm_type, alarm in _alarms(window).items():
+        samples = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            window.trigger_alarm(dict(alarm))
+            dialog = window._alarm_dialogs[window.alarm_queue.pending()[-1].key]
+            dialog.repaint()
+            app.processEvents()
+            samples.append(time.perf_counter() - t0)
+            dialog.accept()
+            app.processEvents()
+        dialog_latency[f"{alarm_type}_dialog_median_ms"] = _median_ms(samples)
+
+    window.engine.close()
+    window.tray_icon and window.tray_icon.hide()
+    window.deleteLater()
+    app.processEvents()
+    return {
+        "refresh_full_median_ms": _median_ms(full),
+        "refresh_cell_median_ms": _median_ms(cell),
+        "bulk_update": bulk_update,
+        "template_all_days": {**template[-1], "ms": _median_ms([t["ms"] / 1000 for t in template])},
+        **dialog_latency,
+    }
+
+
+def run(repeats=20):
+    return bench(repeats)
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    # Programın kendi bilgi mesajları JSON çıktısına karışmasın
+    with redirect_stdout(sys.stderr):
+        results = run(repeats)
+    print(json.dumps(results, indent=4))
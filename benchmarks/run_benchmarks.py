@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# Tüm ölçümleri çalıştırır ve sonuçları tek bir JSON belgesi olarak yazar; sürümler arası
+# karşılaştırma için aynı makinede saklanan sonuçlarla kıyaslanabilir.
+# Kullanım: python3 benchmarks/run_benchmarks.py [--quick] [--output DOSYA] [ölçüm ...]
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+from contextlib import redirect_stdout
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import bench_startup
+import bench_persistence
+import bench_alarms
+import bench_ui
+import bench_timing_wheel
+import bench_report
+import bench_memory
+import bench_recurrence
+
+from PyQt5.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+from PyQt5.QtWidgets import QApplication
+
+# ölçüm adı -> (tam çalıştırma, --quick ile kısa çalıştırma)
+SUITES = {
+    "startup": (lambda: bench_startup.bench(10), lambda: bench_startup.bench(3)),
+    "persistence": (lambda: bench_persistence.run(), lambda: bench_persistence.run((10, 1000), (1, 10))),
+    "alarms": (lambda: bench_alarms.run(), lambda: bench_alarms.run((1, 10))),
+    "ui": (lambda: bench_ui.run(20), lambda: bench_ui.run(5)),
+    "timing_wheel": (lambda: [bench_timing_wheel.bench(count) for count in (10, 1000, 10000)],
+                     lambda: [bench_timing_wheel.bench(count, samples=500) for count in (10, 1000)]),
+    "report": (lambda: bench_report.bench(40, ["csv", "html", "pdf"]), lambda: bench_report.bench(5, ["csv", "pdf"])),
+    "memory": (lambda: [bench_memory.bench(count) for count in (1, 10, 100)],
+               lambda: [bench_memory.bench(count) for count in (1, 10)]),
+    "recurrence": (lambda: [bench_recurrence.bench(count, n) for count in (100, 500) for n in (10, 100)],
+                   lambda: [bench_recurrence.bench(100, 10)]),
+}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def metadata(quick):
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "quick": quick,
+        "python": platform.python_version(),
+        "qt": QT_VERSION_STR,
+        "pyqt": PYQT_VERSION_STR,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "qpa": os.environ.get("QT_QPA_PLATFORM"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="run_benchmarks", description="Hemşirem başarım ölçümleri")
+    parser.add_argument("suites", nargs="*", help=f"çalıştırılacak ölçümler: {', '.join(SUITES)} (varsayılan: tümü)")
+    parser.add_argument("--quick", action="store_true", help="daha az tekrar ve daha küçük veriyle çalıştır")
+    parser.add_argument("--output", help="sonuçların yazılacağı JSON dosyası (varsayılan: standart çıktı)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.suites if name not in SUITES]
+    if unknown:
+        parser.error(f"bilinmeyen ölçüm: {', '.join(unknown)}")
+
+    # Pencere ölçümleri için QApplication diğer ölçümlerden önce oluşturulmalı
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {"meta": metadata(args.quick), "results": {}, "durations_s": {}}
+    for name in args.suites or SUITES:
+        started = time.perf_counter()
+        # Programın kendi bilgi mesajları JSON çıktısına karışmasın
+        with redirect_stdout(sys.stderr):
+            results["results"][name] = SUITES[name][1 if args.quick else 0]()
+        results["durations_s"][name] = round(time.perf_counter() - started, 2)
+        print(f"Bilgi: {name} tamamlandı ({results['durations_s'][name]} sn).", file=sys.stderr)
+
+    text = json.dumps(results, indent=4, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,61 +2,99 @@
 
 import sys
 import os
-import json
-from datetime import datetime, date, timedelta
+import time
+from datetime import datetime, timedelta
+
+from hemsirem_profile import profiler
+from hemsirem_metrics import metrics
+from hemsirem_watchdog import start_watchdog
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                             QLabel, QPushButton, QTabWidget, QLineEdit,
-                             QMessageBox, QGroupBox, QRadioButton, QDialog, QSizePolicy, QAbstractSpinBox,
-                             QSpacerItem, QSystemTrayIcon, QMenu, QAction, QButtonGroup, QFormLayout)
-from PyQt5.QtCore import Qt, QTimer, QTime, QDate, QUrl
-from PyQt5.QtGui import QIcon, QPixmap, QFontMetrics
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+                             QLabel, QPushButton, QTabWidget, QLineEdit, QComboBox, QInputDialog,
+                             QMessageBox, QGroupBox, QDialog, QSizePolicy, QAbstractSpinBox,
+                             QSpacerItem, QSystemTrayIcon, QMenu, QAction, QFormLayout,
+                             QTableView, QHeaderView, QAbstractItemView, QStyledItemDelegate, QStyle,
+                             QStyleOptionButton, QFileDialog, QCheckBox, QGridLayout, QPlainTextEdit)
+from PyQt5.QtCore import Qt, QTimer, QEvent, QRect, QSize
+from PyQt5.QtGui import QFontMetrics
+
+from hemsirem_engine import AlarmEngine, DataDirLocked, default_data_dir
+from hemsirem_daemon import RemoteEngine
+from hemsirem_resources import resources, LOGO_SIZE
+from hemsirem_audio import AlarmAudio
+from hemsirem_alarms import AlarmQueue
+from hemsirem_model import WeeklyScheduleModel, STATUS_LABELS, TIME_FIELD, STATUS_FIELD
+from hemsirem_plan import DAY_GROUPS, NO_TIME, parse_time, template_changes
+from hemsirem_recurrence import Recurrence
+
+profiler.since_start("imports")
+
+# Ses altyapısı (QtMultimedia/GStreamer) açılışı geciktirmesin diye pencere çizildikten bu kadar sonra hazırlanır
+AUDIO_PREWARM_DELAY_MS = 2000
+# Arayüzden alınan uyum raporunun kapsadığı gün sayısı (bugün dahil)
+REPORT_DAYS = 30
+# Veri dizini kilitliyken (servis açılıyor olabilir) servise bağlanma denemeleri ve aralarındaki bekleme
+DAEMON_CONNECT_ATTEMPTS = 5
+DAEMON_RETRY_DELAY_S = 1
 
 class HemşiremApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, engine=None, alarm_client=False):
         super().__init__()
         self.setWindowTitle("Hemşirem")
 
-        self.data_dir = os.path.join(os.path.expanduser("~"), ".Hemşirem")
-        os.makedirs(self.data_dir, exist_ok=True)
-        self.data_file = os.path.join(self.data_dir, "hemsiremdata.json")
-
-        self.medications = self.load_medications()
-        
-        # self.days ve self.time_slots tanımlamaları buraya taşındı
-        self.days = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
-        self.time_slots = ["Sabah", "Öğleden önce", "Öğle", "İkindi", "Akşam", "Gece"]
-
-        self.check_and_reset_weekly() # <-- Şimdi 'self.days' tanımlanmış durumda
+        # Alarm motoru: arka plan servisine bağlı vekil (RemoteEngine) ya da süreç içi AlarmEngine.
+        # Veri dosyaları, kayıt ve alarm çizelgesi motora aittir; arayüz yalnızca gösterir ve düzenler.
+        with profiler.phase("engine"):
+            self.engine = engine if engine is not None else AlarmEngine()
+        self.alarm_client = alarm_client # Servis tarafından yalnızca alarm göstermek için başlatıldı
+        self.days = self.engine.days
+        self.time_slots = self.engine.time_slots
+        self.patients = self.engine.patients
+
+        QApplication.instance().aboutToQuit.connect(self.engine.close)
+        self.engine.alarm.connect(self.trigger_alarm)
+        self.engine.patient_added.connect(self.on_patient_added)
+        self.engine.weekly_reset.connect(self.on_engine_data_changed)
+        self.engine.changed_batch.connect(self.on_engine_batch_changed)
+        if self.engine.remote:
+            self.engine.changed.connect(self.on_engine_data_changed)
+            self.engine.activate_requested.connect(self.show_main_window)
+            self.engine.disconnected.connect(self.on_daemon_disconnected)
+
+        # Alarmlar engellemeden kuyruğa alınır; her biri onaylanana kadar kendi penceresinde bekler
+        self.alarm_queue = AlarmQueue()
+        self._alarm_dialogs = {}
+
+        # Haftalık çizelge tüm gün sekmelerinin ortak modelidir; düzenlemeler motora iletilir
+        self.schedule_model = WeeklyScheduleModel(self.days, self.time_slots, self.set_medication_value, self)
+        self.time_delegate = TimeEditDelegate(self)
+        self.status_delegate = StatusDelegate(self)
+
+        self.activate_patient(self.engine.active_id)
 
         self.current_day_index = datetime.now().weekday() # 0 = Pazartesi, 6 = Pazar
 
-        self.player = QMediaPlayer()
-        self.player.setVolume(50)
+        # Alarm sesleri pencere çizildikten sonra (veya ilk alarmda) belleğe çözülür
+        self.audio = AlarmAudio(resources, self)
+        self._first_paint_done = False
 
-        self.setup_ui()
-        self.setup_alarm_timer()
+        with profiler.phase("setup_ui"):
+            self.setup_ui()
+            self.setup_clock_timer()
 
-        self.set_initial_window_size()
-        self._last_checked_minute = -1 # Aynı dakika içinde birden fazla tetiklemeyi önlemek için
+            self.set_initial_window_size()
 
         # SİSTEM TEPSİSİ ENTEGRASYONU BAŞLANGICI
-        self.setup_tray_icon()
+        # Servise bağlıyken arayüz kalıcı değildir; tepsi simgesi yalnızca süreç içi motorla kullanılır
+        self.tray_icon = None
+        if not self.engine.remote:
+            with profiler.phase("tray"):
+                self.setup_tray_icon()
         # SİSTEM TEPSİSİ ENTEGRASYONU SONU
 
-    def load_resource(self, filename):
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        resource_path = os.path.join(script_dir, filename)
-        if os.path.exists(resource_path):
-            return resource_path
-        else:
-            print(f"Uyarı: {filename} bulunamadı. Lütfen {filename} dosyasının programla aynı dizinde olduğundan emin olun.")
-            return None
-
     def setup_ui(self):
-        icon_path = self.load_resource("hemsirem.png")
-        if icon_path:
-            self.setWindowIcon(QIcon(icon_path))
+        # Logo ve simge bir kez yüklenip ölçeklenir; pencereler sonra önbellekten okur
+        resources.preload("hemsirem.png")
+        self.setWindowIcon(resources.icon("hemsirem.png"))
 
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -71,13 +109,11 @@ class HemşiremApp(QMainWindow):
         title_button_row_layout = QHBoxLayout()
 
         self.logo_label = QLabel()
-        logo_path = self.load_resource("hemsirem.png")
-        if logo_path:
-            pixmap = QPixmap(logo_path)
-            scaled_pixmap = pixmap.scaled(96, 96, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            self.logo_label.setPixmap(scaled_pixmap)
+        logo_pixmap = resources.pixmap("hemsirem.png", LOGO_SIZE)
+        if logo_pixmap is not None:
+            self.logo_label.setPixmap(logo_pixmap)
         else:
-            self.logo_label.setFixedSize(96, 96)
+            self.logo_label.setFixedSize(LOGO_SIZE, LOGO_SIZE)
             self.logo_label.setStyleSheet("background-color: black;")
 
         title_button_row_layout.addWidget(self.logo_label)
@@ -102,11 +138,34 @@ class HemşiremApp(QMainWindow):
         title_button_row_layout.addWidget(title_labels_container)
         title_button_row_layout.addStretch(1)
 
+        template_button = QPushButton("Haftalık Şablon")
+        template_button.setToolTip("Bir zaman diliminin saatini ve ilacını birden çok güne uygula")
+        template_button.clicked.connect(self.show_template_dialog)
+        title_button_row_layout.addWidget(template_button)
         settings_button = QPushButton("Ayarlar")
         settings_button.clicked.connect(self.show_settings_dialog)
         title_button_row_layout.addWidget(settings_button)
         header_layout.addLayout(title_button_row_layout)
 
+        # Hasta seçimi (bakımevi gibi birden fazla kişinin izlendiği kurulumlar için)
+        patient_row_layout = QHBoxLayout()
+        patient_row_layout.addWidget(QLabel("Hasta:"))
+        self.patient_combo = QComboBox()
+        self.patient_combo.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        for patient in self.patients.values():
+            self.patient_combo.addItem(patient.name, patient.id)
+        self.patient_combo.setCurrentIndex(self.patient_combo.findData(self.patient.id))
+        self.patient_combo.currentIndexChanged.connect(self.on_patient_changed)
+        patient_row_layout.addWidget(self.patient_combo)
+        add_patient_button = QPushButton("Yeni Hasta")
+        add_patient_button.clicked.connect(self.add_patient)
+        patient_row_layout.addWidget(add_patient_button)
+        report_button = QPushButton("Rapor")
+        report_button.setToolTip(f"Son {REPORT_DAYS} günün ilaç uyum raporunu kaydet")
+        report_button.clicked.connect(self.export_report)
+        patient_row_layout.addWidget(report_button)
+        header_layout.addLayout(patient_row_layout)
+
         self.current_time_label = QLabel(datetime.now().strftime("Bugün: %A Saat: %H:%M"))
         self.current_time_label.setAlignment(Qt.AlignCenter)
         # Font boyutu artırıldı
@@ -119,11 +178,18 @@ class HemşiremApp(QMainWindow):
         self.tab_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         # self.days ve self.time_slots burada tanımlanıyordu, __init__ metoduna taşındı.
 
+        # Sekmeler ilk açıldıklarında oluşturulur; o zamana kadar boş bir yer tutucu sayfa gösterilir
+        self.day_pages = {}
         self.day_widgets = {}
-        for i, day in enumerate(self.days):
-            day_widget = self.create_day_widget(day)
-            self.tab_widget.addTab(day_widget, day)
-            self.day_widgets[day] = day_widget
+        for day in self.days:
+            page = QWidget()
+            page_layout = QVBoxLayout(page)
+            page_layout.setContentsMargins(0, 0, 0, 0)
+            self.tab_widget.addTab(page, day)
+            self.day_pages[day] = page
+        self.tab_widget.currentChanged.connect(self.materialize_day_tab)
+        self.tab_widget.setCurrentIndex(self.current_day_index)
+        self.materialize_day_tab(self.current_day_index)
         self.main_layout.addWidget(self.tab_widget)
 
         self.main_layout.addSpacerItem(QSpacerItem(0, 5, QSizePolicy.Minimum, QSizePolicy.Fixed))
@@ -134,8 +200,6 @@ class HemşiremApp(QMainWindow):
 
         self.main_layout.addSpacerItem(QSpacerItem(0, 5, QSizePolicy.Minimum, QSizePolicy.Fixed))
 
-        self.update_ui_with_medication_data()
-
     def set_initial_window_size(self):
         # Yeni genişlik hesaplaması:
         # Minimum genişliği, içindeki elemanların minimum sığabileceği kadar belirleyelim.
@@ -159,6 +223,7 @@ class HemşiremApp(QMainWindow):
         header_height = self.logo_label.sizeHint().height() + \
                         self.main_title_label.sizeHint().height() + \
                         self.sub_title_label.sizeHint().height() + \
+                        self.patient_combo.sizeHint().height() + \
                         self.current_time_label.sizeHint().height() + \
                         self.main_layout.spacing() * 2
 
@@ -196,197 +261,85 @@ class HemşiremApp(QMainWindow):
 
 
     def create_day_widget(self, day_name):
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
-        layout.setContentsMargins(5, 5, 5, 5)
-        layout.setSpacing(5)
-
-        header_layout = QHBoxLayout()
-        header_layout.setSpacing(5)
-
-        header_layout.addSpacerItem(QSpacerItem(10, 0, QSizePolicy.Fixed, QSizePolicy.Minimum))
-
-        time_slot_header = QLabel("Zaman Dilimi")
-        # Genişlik 80'den 95'e çıkarıldı
-        time_slot_header.setFixedWidth(95)
-        time_slot_header.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        # Font boyutu ayarlandı
-        time_slot_header.setStyleSheet("font-size: 14px;")
-        header_layout.addWidget(time_slot_header)
-
-        header_layout.addSpacerItem(QSpacerItem(15, 0, QSizePolicy.Fixed, QSizePolicy.Minimum))
-
-        hour_header = QLabel("Saat")
-        hour_header.setFixedWidth(70)
-        hour_header.setAlignment(Qt.AlignCenter)
-        # Font boyutu ayarlandı
-        hour_header.setStyleSheet("font-size: 14px;")
-        header_layout.addWidget(hour_header)
-
-        header_layout.addSpacerItem(QSpacerItem(5, 0, QSizePolicy.Fixed, QSizePolicy.Minimum))
-
-        status_header = QLabel("Durum")
-        status_header.setAlignment(Qt.AlignCenter)
-        # Font boyutu ayarlandı
-        status_header.setStyleSheet("font-size: 14px;")
-        header_layout.addWidget(status_header)
-        header_layout.addStretch(1)
-
-        header_layout.addSpacerItem(QSpacerItem(10, 0, QSizePolicy.Fixed, QSizePolicy.Minimum))
-
-        layout.addLayout(header_layout)
-
-        for time_slot in self.time_slots:
-            row_layout = QHBoxLayout()
-            row_layout.setSpacing(5)
-
-            row_layout.addSpacerItem(QSpacerItem(10, 0, QSizePolicy.Fixed, QSizePolicy.Minimum))
-
-            time_slot_label = QLabel(time_slot)
-            time_slot_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-            # Genişlik 80'den 95'e çıkarıldı
-            time_slot_label.setFixedWidth(95)
-            # Font boyutu ayarlandı
-            time_slot_label.setStyleSheet("font-size: 14px;")
-            row_layout.addWidget(time_slot_label)
-
-            row_layout.addSpacerItem(QSpacerItem(15, 0, QSizePolicy.Fixed, QSizePolicy.Minimum))
-
-            time_edit = QLineEdit()
-            time_edit.setInputMask("99:99")
-            time_edit.setAlignment(Qt.AlignCenter)
-            time_edit.setFixedSize(70, 25)
-            time_edit.setPlaceholderText("HH:MM")
-            # Font boyutu ayarlandı
-            time_edit.setStyleSheet("font-size: 14px;")
-
-            setattr(widget, f'{time_slot.lower().replace(" ", "_")}_time_edit', time_edit)
-            row_layout.addWidget(time_edit)
-
-            radio_button_group_widget = QWidget()
-            radio_button_layout = QHBoxLayout(radio_button_group_widget)
-            radio_button_layout.setContentsMargins(0, 0, 0, 0)
-            radio_button_layout.setSpacing(2)
-
-            radio_button_group_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-
-            status_button_group = QButtonGroup(widget)
-            setattr(widget, f'{day_name}_{time_slot}_status_button_group', status_button_group)
-
-            self.rb_bilinmiyor = QRadioButton("Bilinmiyor")
-            self.rb_ictim = QRadioButton("İçtim")
-            self.rb_icmedim = QRadioButton("İçmedim")
-            self.rb_hatirlamiyorum = QRadioButton("Hatırlamıyorum")
-
-            # Font boyutu ayarlandı
-            self.rb_bilinmiyor.setStyleSheet("font-size: 14px;")
-            self.rb_ictim.setStyleSheet("font-size: 14px;")
-            self.rb_icmedim.setStyleSheet("font-size: 14px;")
-            self.rb_hatirlamiyorum.setStyleSheet("font-size: 14px;")
-
-            status_button_group.addButton(self.rb_bilinmiyor, 0)
-            status_button_group.addButton(self.rb_ictim, 1)
-            status_button_group.addButton(self.rb_icmedim, 2)
-            status_button_group.addButton(self.rb_hatirlamiyorum, 3)
-
-            radio_button_layout.addWidget(self.rb_bilinmiyor)
-            radio_button_layout.addWidget(self.rb_ictim)
-            radio_button_layout.addWidget(self.rb_icmedim)
-            radio_button_layout.addWidget(self.rb_hatirlamiyorum)
-            radio_button_layout.addStretch(1)
-
-            status_button_group.buttonToggled.connect(lambda btn, checked, d=day_name, ts=time_slot: self.on_status_radio_toggled(d, ts, btn.text(), checked))
-
-            setattr(widget, f'{day_name}_{time_slot}_radio_group_widget', radio_button_group_widget)
-
-            row_layout.addWidget(radio_button_group_widget)
-
-            row_layout.addSpacerItem(QSpacerItem(10, 0, QSizePolicy.Fixed, QSizePolicy.Minimum))
-
-            layout.addLayout(row_layout)
-
-        layout.addSpacerItem(QSpacerItem(0, 10, QSizePolicy.Minimum, QSizePolicy.Fixed))
-        # layout.addStretch(1) # Bu satır yorum satırı yapıldı
-        return widget
-
-    def on_status_radio_toggled(self, day, time_slot, status_text, checked):
-        if checked:
-            if day not in self.medications:
-                self.medications[day] = {}
-            if time_slot not in self.medications[day]:
-                self.medications[day][time_slot] = {}
-            self.medications[day][time_slot]['status'] = status_text
-            self.save_medications()
-
-    def update_ui_with_medication_data(self):
-        for day_index, day_name in enumerate(self.days):
-            for time_slot_index, time_slot_name in enumerate(self.time_slots):
-                day_data = self.medications.get(day_name, {})
-                slot_data = day_data.get(time_slot_name, {})
-
-                widget = self.day_widgets[day_name]
-
-                time_edit = getattr(widget, f'{time_slot_name.lower().replace(" ", "_")}_time_edit')
-
-                try:
-                    time_edit.textChanged.disconnect()
-                except TypeError:
-                    pass
-
-                if 'time' in slot_data and slot_data['time']:
-                    time_edit.setText(slot_data['time'])
-                else:
-                    time_edit.setText("00:00")
-
-                time_edit.textChanged.connect(lambda text, d=day_name, ts=time_slot_name: self.save_time_setting(d, ts, text))
-
-                status_button_group = getattr(widget, f'{day_name}_{time_slot_name}_status_button_group')
-                current_status = slot_data.get('status', 'Bilinmiyor')
-
-                if current_status == "Bilinmiyor":
-                    status_button_group.buttons()[0].setChecked(True)
-                elif current_status == "İçtim":
-                    status_button_group.buttons()[1].setChecked(True)
-                elif current_status == "İçmedim":
-                    status_button_group.buttons()[2].setChecked(True)
-                elif current_status == "Hatırlamıyorum":
-                    status_button_group.buttons()[3].setChecked(True)
-                else:
-                    status_button_group.buttons()[0].setChecked(True)
-                    self.medications[day_name][time_slot_name]['status'] = "Bilinmiyor"
-                    self.save_medications()
-
-    def save_time_setting(self, day, time_slot, time_str):
-        if day not in self.medications:
-            self.medications[day] = {}
-        if time_slot not in self.medications[day]:
-            self.medications[day][time_slot] = {}
-        self.medications[day][time_slot]['time'] = time_str
-        self.save_medications()
+        # Gün sekmesi ortak çizelge modelinin yalnızca o güne ait iki sütununu gösterir
+        view = QTableView()
+        view.setModel(self.schedule_model)
+        day = self.days.index(day_name)
+        time_column = self.schedule_model.column(day, TIME_FIELD)
+        status_column = self.schedule_model.column(day, STATUS_FIELD)
+        for column in range(self.schedule_model.columnCount()):
+            view.setColumnHidden(column, column not in (time_column, status_column))
+        view.setItemDelegateForColumn(time_column, self.time_delegate)
+        view.setItemDelegateForColumn(status_column, self.status_delegate)
+
+        view.setStyleSheet("font-size: 14px;")
+        view.setShowGrid(False)
+        view.setSelectionMode(QAbstractItemView.NoSelection)
+        view.setEditTriggers(QAbstractItemView.AllEditTriggers)
+        view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+        vertical_header = view.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+        vertical_header.setDefaultSectionSize(30)
+        vertical_header.setMinimumWidth(95)
+        vertical_header.setDefaultAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+
+        horizontal_header = view.horizontalHeader()
+        horizontal_header.setSectionResizeMode(time_column, QHeaderView.Fixed)
+        horizontal_header.resizeSection(time_column, 70)
+        horizontal_header.setSectionResizeMode(status_column, QHeaderView.Stretch)
+        return view
+
+    def materialize_day_tab(self, index):
+        if index < 0:
+            return
+        day_name = self.days[index]
+        if day_name in self.day_widgets:
+            return
+        day_widget = self.create_day_widget(day_name)
+        self.day_pages[day_name].layout().addWidget(day_widget)
+        self.day_widgets[day_name] = day_widget
 
     def show_settings_dialog(self):
         dialog = SettingsDialog(self)
 
         # Doktor randevusu verilerini dialoga gönder
-        appointment_data = self.medications.get("appointment_data", {})
+        appointment = self.patient.schedule.appointment
         dialog.set_appointment_details(
-            appointment_data.get("hospital", ""),
-            appointment_data.get("doctor", ""),
-            appointment_data.get("time", ""),
-            appointment_data.get("date", ""),
-            appointment_data.get("reminder_time", ""), # Yeni alan
-            appointment_data.get("reminder_date", "")  # Yeni alan
+            appointment.hospital,
+            appointment.doctor,
+            appointment.time,
+            appointment.date,
+            appointment.reminder_time, # Yeni alan
+            appointment.reminder_date  # Yeni alan
         )
 
         # Günlük ilaç verilerini dialoga gönder
-        daily_medications_data = self.medications.get("daily_medications", {})
-        dialog.set_daily_medications(daily_medications_data)
+        dialog.set_daily_medications(self.patient.schedule.daily_medications.to_list())
+        dialog.set_recurrences(self.patient.schedule.recurrences)
 
         if dialog.exec_():
             # Dialogdan güncel doktor randevusu ve günlük ilaç verilerini al ve kaydet
-            self.medications["appointment_data"] = dialog.get_appointment_details()
-            self.medications["daily_medications"] = dialog.get_daily_medications()
-            self.save_medications()
+            try:
+                self.set_medication_value(("appointment_data",), dialog.get_appointment_details())
+            except ValueError as e:
+                QMessageBox.warning(self, "Hemşirem", f"Randevu bilgileri kaydedilmedi: {e}")
+            self.set_medication_value(("daily_medications",), dialog.get_daily_medications())
+            try:
+                self.set_medication_value(("recurrences",), dialog.get_recurrences())
+            except ValueError as e:
+                QMessageBox.warning(self, "Hemşirem", f"Tekrarlayan ilaçlar kaydedilmedi: {e}")
+
+    def show_template_dialog(self):
+        dialog = TemplateDialog(self.patient.schedule, self.days, self.time_slots, self.current_day_index, self)
+        if not dialog.exec_():
+            return
+        changes = template_changes(self.patient.schedule, dialog.slot(), dialog.minute(), dialog.days(),
+                                   dialog.medications())
+        # Tüm günler tek bir toplu güncellemeyle yazılır: tek kayıt, tek alarm dizini derlemesi, tek görünüm güncellemesi
+        with self.engine.batch(self.patient.id):
+            for path, value in changes:
+                self.set_medication_value(path, value)
 
     def show_about_dialog(self):
         QMessageBox.about(self, "Hakkında", "Hemşirem İlaç ve Randevu Hatırlatıcısı\n"
@@ -396,209 +349,193 @@ class HemşiremApp(QMainWindow):
                                           "Github: github.com/shampuan\n\n"
                                           "Bu program ilaç hatırlatma amacıyla geliştirilmiştir. \nBu program, hiçbir garanti getirmez.")
 
-    def load_medications(self):
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                print("Hata: medications.json dosyası bozuk. Yeni bir dosya oluşturuluyor.")
-                return {}
-        return {}
-
-    def save_medications(self):
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump(self.medications, f, ensure_ascii=False, indent=4)
-
-    def setup_alarm_timer(self):
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.check_for_alarms)
-        self.timer.start(1000)
-
-    def check_for_alarms(self):
-        self.current_time_label.setText(datetime.now().strftime("Bugün: %A Saat: %H:%M"))
-
-        current_qtime = QTime.currentTime()
-        current_qdate = QDate.currentDate()
-        current_minute = current_qtime.minute()
-
-        # Aynı dakika içinde birden fazla kontrolü/tetiklemeyi önlemek için
-        if current_minute == self._last_checked_minute:
-            return
-        self._last_checked_minute = current_minute
-
-        alarm_triggered_this_minute = False
+    def activate_patient(self, patient_id):
+        # Arayüzün gösterdiği ve düzenlediği hasta
+        self.patient = self.patients[patient_id]
+        self.schedule_model.set_plan(self.patient.schedule.plan)
+        if len(self.patients) > 1:
+            self.setWindowTitle(f"Hemşirem - {self.patient.name}")
+        else:
+            self.setWindowTitle("Hemşirem")
 
-        # --- Doktor Randevusu Alarmı Kontrolü ---
-        appointment_data = self.medications.get("appointment_data", {})
-        app_time_str = appointment_data.get("time", "").strip() # Gerçek randevu saati
-        app_date_str = appointment_data.get("date", "").strip() # Gerçek randevu tarihi
-        reminder_time_str = appointment_data.get("reminder_time", "").strip() # Yeni: Hatırlatma saati
-        reminder_date_str = appointment_data.get("reminder_date", "").strip() # Yeni: Hatırlatma tarihi
+    def on_patient_changed(self, index):
+        patient_id = self.patient_combo.itemData(index)
+        if patient_id is None or patient_id == self.patient.id:
+            return
+        self.engine.flush()
+        self.activate_patient(patient_id)
+        self.engine.set_active(patient_id)
+
+    def add_patient(self):
+        name, ok = QInputDialog.getText(self, "Yeni Hasta", "Hasta adı:")
+        name = name.strip()
+        if not ok or not name:
+            return
+        # Hasta motor tarafında oluşturulur; hazır olduğunda on_patient_added çağrılır
+        self.engine.add_patient(name)
+
+    def export_report(self):
+        # Rapor modülü (ve QtPrintSupport) yalnızca rapor istendiğinde yüklenir
+        import hemsirem_report
+        end = datetime.now().date()
+        start = end - timedelta(days=REPORT_DAYS - 1)
+        default_path = os.path.join(os.path.expanduser("~"), f"Hemşirem - {self.patient.name} - {end:%d.%m.%Y}.pdf")
+        path, selected_filter = QFileDialog.getSaveFileName(self, "Uyum Raporu", default_path,
+                                                            "PDF (*.pdf);;HTML (*.html);;CSV (*.csv)")
+        if not path:
+            return
+        if os.path.splitext(path)[1].lstrip(".").lower() not in hemsirem_report.REPORT_FORMATS:
+            path += "." + selected_filter.split("*.")[-1].rstrip(")")
+        # Bekleyen durum değişiklikleri önce geçmişe yazılır (servis kendi kayıt zamanlayıcısıyla yazar)
+        self.engine.flush()
+        try:
+            hemsirem_report.render_patient_report(getattr(self.engine, "data_dir", default_data_dir()),
+                                                  self.patient.id, self.patient.name, start, end, path)
+        except OSError as e:
+            QMessageBox.warning(self, "Hemşirem", f"Rapor kaydedilemedi: {e}")
+
+    def on_patient_added(self, patient_id):
+        self.patient_combo.addItem(self.patients[patient_id].name, patient_id)
+        self.patient_combo.setCurrentIndex(self.patient_combo.count() - 1)
+
+    def on_engine_data_changed(self, patient_id, path=None, value=None):
+        # Motorun kendi yaptığı değişiklikler (haftalık sıfırlama, servisten gelenler) görünen hastaya yansıtılır
+        if patient_id == self.patient.id:
+            self.schedule_model.refresh(path)
+
+    def on_engine_batch_changed(self, patient_id, changes):
+        # Toplu güncelleme (yerel veya servisten) görünümlere tek bildirimle yansıtılır
+        if patient_id == self.patient.id:
+            self.schedule_model.refresh_batch([path for path, _ in changes])
+
+    def set_medication_value(self, path, value):
+        # Düzenleme motora iletilir; kayıt ve alarm çizelgesi güncellemesi orada yapılır
+        self.engine.set_value(self.patient.id, path, value)
+
+    def on_daemon_disconnected(self):
+        QMessageBox.warning(self, "Hemşirem", "Hemşirem servisiyle bağlantı kesildi. Program kapatılıyor.")
+        QApplication.quit()
+
+    def setup_clock_timer(self):
+        # Saat etiketi yalnızca pencere görünürken, dakika başlarında güncellenir
+        self.clock_timer = QTimer(self)
+        self.clock_timer.setSingleShot(True)
+        self.clock_timer.timeout.connect(self.update_clock_label)
+
+    def update_clock_label(self):
+        now = datetime.now()
+        self.current_time_label.setText(now.strftime("Bugün: %A Saat: %H:%M"))
+        if self.isVisible():
+            self.clock_timer.start(60000 - now.second * 1000 - now.microsecond // 1000 + 50)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_clock_label()
+
+    def hideEvent(self, event):
+        self.clock_timer.stop()
+        super().hideEvent(event)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._first_paint_done:
+            self._first_paint_done = True
+            profiler.since_start("first_paint")
+            profiler.report(self.engine.data_dir if not self.engine.remote else default_data_dir())
+            QTimer.singleShot(AUDIO_PREWARM_DELAY_MS, self.audio.preload)
+
+    @metrics.timed("trigger_alarm")
+    def trigger_alarm(self, alarm):
+        # alarm: AlarmEngine'in ürettiği (veya servisten gelen) alarm sözlüğü.
+        # Pencere modal açılmaz (exec_ yok); olay döngüsü ve zamanlayıcı alarm beklerken de işlemeye devam eder.
+        if alarm["type"] not in ("appointment", "medication", "batch", "missed"): # Hata durumu veya bilinmeyen alarm tipi
+            print("Hata: Bilinmeyen alarm tipi.")
+            metrics.error("unknown_alarm_type")
+            return
 
-        app_alarm_time = None
-        app_alarm_date = None
-        reminder_alarm_time = None
-        reminder_alarm_date = None
+        pending, is_new = self.alarm_queue.push(alarm)
+        if not is_new:
+            # Aynı alarm hâlâ onay bekliyor; yeni pencere açılmaz, mevcut pencere güncellenip öne getirilir
+            alarm_dialog = self._alarm_dialogs[pending.key]
+            self.fill_alarm_dialog(alarm_dialog, pending.alarm)
+            if alarm["type"] in ("appointment", "medication"):
+                alarm_dialog.setWindowTitle(f"{alarm_dialog.windowTitle()} ({pending.count}. kez)")
+            alarm_dialog.raise_()
+            alarm_dialog.activateWindow()
+            return
 
-        if app_time_str and app_date_str and app_time_str != "  :  " and app_date_str != ".. . .":
-            try:
-                app_alarm_time = QTime.fromString(app_time_str, "HH:mm")
-                app_alarm_date = QDate.fromString(app_date_str, "dd.MM.yyyy")
-            except ValueError as e:
-                print(f"Hata: Doktor randevu saati veya tarihi geçersiz formatta: {e}")
+        # İlaç ve randevu alarmlarının sesleri farklıdır (alarm.mp3 / alarm1.mp3); ses zaten çalıyorsa sürer.
+        # Toplu alarmda tek ses çalar: içinde ilaç varsa ilaç sesi, yalnızca randevu varsa randevu sesi.
+        sound_type = alarm["type"]
+        if sound_type in ("batch", "missed"):
+            batch_types = {item.get("type") for item in alarm.get("alarms", [])}
+            sound_type = "appointment" if batch_types == {"appointment"} else "medication"
+        self.audio.play(sound_type, alarm.get("deadline"))
 
-        if reminder_time_str and reminder_date_str and reminder_time_str != "  :  " and reminder_date_str != ".. . .":
-            try:
-                reminder_alarm_time = QTime.fromString(reminder_time_str, "HH:mm")
-                reminder_alarm_date = QDate.fromString(reminder_date_str, "dd.MM.yyyy")
-            except ValueError as e:
-                print(f"Hata: Doktor randevu hatırlatma saati veya tarihi geçersiz formatta: {e}")
-
-        # Sadece hem gerçek randevu bilgileri hem de hatırlatma bilgileri geçerliyse kontrol et
-        if app_alarm_time and app_alarm_date and reminder_alarm_time and reminder_alarm_date:
-            # Mevcut zaman hatırlatma tarih ve saatine uyuyor mu kontrol et
-            if (current_qdate == reminder_alarm_date and
-                current_qtime.hour() == reminder_alarm_time.hour() and
-                current_qtime.minute() == reminder_alarm_time.minute()):
-
-                # Gerçek randevuya kaç gün kaldığını hesapla
-                today_date_py = date(current_qdate.year(), current_qdate.month(), current_qdate.day())
-                appointment_date_py = date(app_alarm_date.year(), app_alarm_date.month(), app_alarm_date.day())
-                days_until_actual_appointment = (appointment_date_py - today_date_py).days
-
-                # Aynı hatırlatma için tekrar tetiklemeyi önle
-                last_triggered_app_reminder_dt_str = self.medications.get("appointment_reminder_last_triggered_datetime", "")
-                last_triggered_app_reminder_dt = None
-                if last_triggered_app_reminder_dt_str:
-                    try:
-                        last_triggered_app_reminder_dt = datetime.strptime(last_triggered_app_reminder_dt_str, "%Y-%m-%d %H:%M")
-                    except ValueError:
-                        pass
-
-                current_dt_for_reminder_check = datetime(current_qdate.year(), current_qdate.month(), current_qdate.day(),
-                                                        current_qtime.hour(), current_qtime.minute())
-
-                if last_triggered_app_reminder_dt is None or last_triggered_app_reminder_dt != current_dt_for_reminder_check:
-                    self.trigger_alarm(alarm_type="appointment", current_time=current_qtime, days_left=days_until_actual_appointment)
-                    self.medications["appointment_reminder_last_triggered_datetime"] = current_dt_for_reminder_check.strftime("%Y-%m-%d %H:%M")
-                    self.save_medications()
-                    alarm_triggered_this_minute = True
-
-
-        # --- İlaç Alarmları Kontrolü (sadece randevu alarmı tetiklenmediyse) ---
-        # Eğer randevu alarmı bu dakika içinde tetiklenmediyse, ilaç alarmlarını kontrol et
-        if not alarm_triggered_this_minute:
-            day_name = self.days[current_qdate.dayOfWeek() - 1] # QDate.dayOfWeek Pazartesi için 1 döndürür
-            day_data = self.medications.get(day_name, {})
-
-            for time_slot_name in self.time_slots:
-                slot_data = day_data.get(time_slot_name, {})
-                alarm_time_str = slot_data.get('time')
-                status = slot_data.get('status', 'Bilinmiyor')
-
-                if alarm_time_str:
-                    if alarm_time_str == "  :  ":
-                        continue
-
-                    alarm_time = QTime.fromString(alarm_time_str, "HH:mm")
-                    if (alarm_time.isValid() and
-                        current_qtime.hour() == alarm_time.hour() and
-                        current_qtime.minute() == alarm_time.minute() and
-                        status != "İçtim"): # Sadece 'İçtim' durumunda değilse tetikle
-
-                        self.trigger_alarm(alarm_type="medication", current_time=current_qtime) # alarm_type eklendi
-                        alarm_triggered_this_minute = True
-                        break # Bu dakika içinde bir ilaç alarmı bulunduysa diğerlerini kontrol etmeyi durdur.
-
-
-    def trigger_alarm(self, alarm_type, current_time, days_left=None):
-        if self.player.state() != QMediaPlayer.PlayingState:
-            alarm_sound_path = self.load_resource("alarm.mp3")
-            if alarm_sound_path:
-                media_content = QMediaContent(QUrl.fromLocalFile(alarm_sound_path))
-                self.player.setMedia(media_content)
-                self.player.play()
-            else:
-                print(f"Uyarı: alarm.mp3 bulunamadı. Alarm sesi çalınamıyor.")
-
-        if alarm_type == "appointment":
+        if alarm["type"] == "appointment":
             alarm_dialog = DoctorAppointmentAlarmDialog(self)
-            appointment_data = self.medications.get("appointment_data", {})
-            alarm_dialog.set_appointment_details(appointment_data, days_left)
-        elif alarm_type == "medication":
+        elif alarm["type"] in ("batch", "missed"):
+            alarm_dialog = AlarmBatchDialog(self)
+        else:
             alarm_dialog = AlarmDialog(self)
-            alarm_dialog.set_alarm_time(current_time.toString("HH:mm"))
-
-            # Güncel zaman dilimindeki ilaç bilgisini alarm ekranına gönder
-            current_time_slot = ""
-            current_hour_minute = current_time.toString("HH:mm")
-            for ts_name in self.time_slots:
-                day_data = self.medications.get(self.days[datetime.now().weekday()], {})
-                slot_data = day_data.get(ts_name, {})
-                alarm_time_str = slot_data.get('time')
-                if alarm_time_str and QTime.fromString(alarm_time_str, "HH:mm").isValid() and current_hour_minute == alarm_time_str:
-                    current_time_slot = ts_name
-                    break
-
-            daily_meds = self.medications.get("daily_medications", {}).get(current_time_slot, "")
-            alarm_dialog.set_current_slot_medications(daily_meds)
-
-            # Doktor randevu bilgisini ilaç alarm ekranına gönder (kullanıcının isteği üzerine kalabilir)
-            appointment_data = self.medications.get("appointment_data", {})
-            alarm_dialog.set_doctor_appointment_details(appointment_data)
-        else: # Hata durumu veya bilinmeyen alarm tipi
-            print("Hata: Bilinmeyen alarm tipi.")
+        self.fill_alarm_dialog(alarm_dialog, alarm)
+
+        # Ana pencere tepsideyken alarm penceresinin kapanması programı kapatmasın
+        alarm_dialog.setAttribute(Qt.WA_QuitOnClose, False)
+        alarm_dialog.setAttribute(Qt.WA_DeleteOnClose)
+        alarm_dialog.finished.connect(lambda result, key=pending.key: self.acknowledge_alarm(key))
+
+        # Üst üste açılan pencereler birbirini tamamen örtmesin
+        if self._alarm_dialogs:
+            offset = 30 * len(self._alarm_dialogs)
+            first_dialog = next(iter(self._alarm_dialogs.values()))
+            alarm_dialog.move(first_dialog.pos().x() + offset, first_dialog.pos().y() + offset)
+        self._alarm_dialogs[pending.key] = alarm_dialog
+        alarm_dialog.show()
+        alarm_dialog.raise_()
+        alarm_dialog.activateWindow()
+        if alarm.get("deadline") is not None:
+            metrics.lateness("alarm_display_lateness", time.time() - alarm["deadline"])
+
+    def fill_alarm_dialog(self, alarm_dialog, alarm):
+        if alarm["type"] in ("batch", "missed"):
+            # Toplu alarm birden fazla hastayı kapsayabilir; hasta adları listede gösterilir
+            alarm_dialog.set_batch(alarm)
             return
+        if alarm["type"] == "appointment":
+            alarm_dialog.set_appointment_details(alarm["appointment_data"], alarm["days_left"])
+            alarm_dialog.setWindowTitle("Randevunuz Yaklaşıyor!")
+        else:
+            alarm_dialog.set_alarm_time(alarm["time"])
 
-        alarm_dialog.exec_()
-        self.player.stop()
-
-    def check_and_reset_weekly(self):
-        current_date_py = date.today()
-        current_year, current_week_number, _ = current_date_py.isocalendar()
-
-        last_reset_date_str = self.medications.get("last_reset_date")
-        last_reset_date_py = None
-        if last_reset_date_str:
-            try:
-                last_reset_date_py = datetime.strptime(last_reset_date_str, "%Y-%m-%d").date()
-            except ValueError:
-                pass
-
-        perform_reset = False
-
-        if last_reset_date_py:
-            last_reset_year, last_reset_week_number, _ = last_reset_date_py.isocalendar()
+            # Güncel zaman dilimindeki ilaç bilgisini alarm ekranına gönder (zaman dilimi dizinden gelir)
+            alarm_dialog.set_current_slot_medications(alarm["medications"])
 
-            # Hata düzeltildi: 'last_year_number' yerine 'last_reset_year' kullanıldı
-            if (current_week_number != last_reset_week_number) or (current_year > last_reset_year):
-                perform_reset = True
-        else:
-            self.medications["last_reset_date"] = current_date_py.strftime("%Y-%m-%d")
-            self.save_medications()
-            print("İlk çalıştırma: Haftalık sıfırlama başlangıç tarihi ayarlandı.")
+            # Doktor randevu bilgisini ilaç alarm ekranına gönder (kullanıcının isteği üzerine kalabilir)
+            alarm_dialog.set_doctor_appointment_details(alarm["appointment_data"])
+            alarm_dialog.setWindowTitle("İlacınızın Saati Geldi!")
+
+        # Birden fazla hasta varsa alarmın kime ait olduğu başlıkta gösterilir
+        if alarm.get("multi_patient"):
+            alarm_dialog.setWindowTitle(f"{alarm_dialog.windowTitle()} - {alarm['patient_name']}")
+
+    def acknowledge_alarm(self, key):
+        # Kullanıcı alarm penceresini kapattı (TAMAM ya da pencere düğmesi)
+        self.alarm_queue.acknowledge(key)
+        self._alarm_dialogs.pop(key, None)
+        if self.alarm_queue:
             return
+        self.audio.stop()
 
-        if perform_reset:
-            print("Haftalık sıfırlama yapılıyor...")
-            for day_name in self.days:
-                if day_name in self.medications:
-                    for time_slot_name in self.time_slots:
-                        if time_slot_name in self.medications[day_name]:
-                            self.medications[day_name][time_slot_name]['status'] = "Bilinmiyor"
-            self.medications["last_reset_date"] = current_date_py.strftime("%Y-%m-%d")
-            self.save_medications()
-            self.update_ui_with_medication_data()
+        # Yalnızca alarm için başlatılan arayüz, son alarm onaylanınca çıkar
+        if self.alarm_client and not self.isVisible():
+            QApplication.quit()
 
     # SİSTEM TEPSİSİ İŞLEVSELLİĞİ İÇİN YENİ METOTLAR BAŞLANGICI
     def setup_tray_icon(self):
         # Sistem tepsisi simgesini oluştur
-        icon_path = self.load_resource("hemsirem.png") # Mevcut ikonunuzu kullanın
-        if icon_path:
-            self.tray_icon = QSystemTrayIcon(QIcon(icon_path), self)
-        else:
-            self.tray_icon = QSystemTrayIcon(QIcon(), self) # Varsayılan boş ikon
+        # Dosya yoksa simge boş kalır
+        self.tray_icon = QSystemTrayIcon(resources.icon("hemsirem.png"), self)
 
         self.tray_icon.setToolTip("Hemşirem İlaç Hatırlatıcısı") # Fare üzerine gelince görünen metin
 
@@ -639,33 +576,111 @@ class HemşiremApp(QMainWindow):
 
     def closeEvent(self, event):
         # Pencere kapatma düğmesine basıldığında
-        if self.tray_icon.isVisible():
+        if self.tray_icon is not None and self.tray_icon.isVisible():
             # Eğer sistem tepsisi simgesi görünürse (yani destekleniyorsa)
             self.hide() # Pencereyi gizle
             event.ignore() # Kapatma olayını yok say, programı kapatma
             # QMessageBox.information(self, "Hemşirem", "Program arka planda çalışmaya devam ediyor. Programı kapatmak için sistem tepsisindeki ikona sağ tıklayıp 'Çıkış'ı seçin.") # Bu satır kaldırıldı
         else:
             # Sistem tepsisi simgesi desteklenmiyorsa veya görünmezse, normal kapatma işlemi
+            self.engine.flush()
             event.accept() # Kapatma olayını kabul et, programı kapat
     # SİSTEM TEPSİSİ İŞLEVSELLİĞİ İÇİN YENİ METOTLAR SONU
 
+class TimeEditDelegate(QStyledItemDelegate):
+    """Saat hücresinin düzenleyicisi; eskisi gibi yazılan her geçerli saat anında kaydedilir."""
+
+    def createEditor(self, parent, option, index):
+        editor = QLineEdit(parent)
+        editor.setInputMask("99:99")
+        editor.setAlignment(Qt.AlignCenter)
+        editor.setPlaceholderText("HH:MM")
+        editor.textEdited.connect(lambda text, e=editor: self.commitData.emit(e))
+        return editor
+
+    def setEditorData(self, editor, index):
+        # Motordan gelen yenileme yazılmakta olan metnin imlecini bozmasın
+        value = index.data(Qt.EditRole)
+        if editor.text() != value:
+            editor.setText(value)
+
+    def setModelData(self, editor, model, index):
+        # Yarım kalmış saat model tarafından reddedilir; yalnızca geçerli (veya tamamen silinmiş) saat kaydedilir
+        model.setData(index, editor.text(), Qt.EditRole)
+
+
+class StatusDelegate(QStyledItemDelegate):
+    """Durum hücresi: dört seçenek radyo düğmesi olarak çizilir ve tıklamayla seçilir.
+
+    Hücre başına widget oluşturulmaz; düğmeler yalnızca stil ile boyanır.
+    """
+
+    CHOICE_SPACING = 8
+
+    def _style(self, option):
+        return option.widget.style() if option.widget is not None else QApplication.style()
+
+    def _choice_rects(self, option):
+        style = self._style(option)
+        indicator_width = style.pixelMetric(QStyle.PM_ExclusiveIndicatorWidth, None, option.widget)
+        label_spacing = style.pixelMetric(QStyle.PM_RadioButtonLabelSpacing, None, option.widget)
+        x = option.rect.x() + 4
+        rects = []
+        for text in STATUS_LABELS:
+            width = indicator_width + label_spacing + option.fontMetrics.width(text) + 2
+            rects.append(QRect(x, option.rect.y(), width, option.rect.height()))
+            x += width + self.CHOICE_SPACING
+        return rects
+
+    def paint(self, painter, option, index):
+        self.initStyleOption(option, index)
+        style = self._style(option)
+        current_status = index.data(Qt.EditRole)
+        painter.save()
+        painter.setFont(option.font)
+        for status, (text, rect) in enumerate(zip(STATUS_LABELS, self._choice_rects(option))):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = text
+            button.palette = option.palette
+            button.fontMetrics = option.fontMetrics
+            button.state = QStyle.State_Enabled | (QStyle.State_On if status == current_status else QStyle.State_Off)
+            style.drawControl(QStyle.CE_RadioButton, button, painter, option.widget)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        self.initStyleOption(option, index)
+        rects = self._choice_rects(option)
+        return QSize(rects[-1].right() - option.rect.x() + 4, option.fontMetrics.height() + 10)
+
+    def createEditor(self, parent, option, index):
+        return None
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() != QEvent.MouseButtonRelease or event.button() != Qt.LeftButton:
+            return False
+        for status, rect in enumerate(self._choice_rects(option)):
+            if rect.contains(event.pos()):
+                model.setData(index, status, Qt.EditRole)
+                return True
+        return False
+
+
 class SettingsDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Ayarlar")
-        self.setFixedSize(500, 700) # Pencere boyutu 600'den 700'e yükseltildi
+        self.setFixedSize(500, 850) # Tekrarlayan ilaçlar bölümü için 850
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
 
         logo_label = QLabel()
-        logo_path = self.parent().load_resource("hemsirem.png")
-        if logo_path:
-            pixmap = QPixmap(logo_path)
-            scaled_pixmap = pixmap.scaled(96, 96, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            logo_label.setPixmap(scaled_pixmap)
+        logo_pixmap = resources.pixmap("hemsirem.png", LOGO_SIZE)
+        if logo_pixmap is not None:
+            logo_label.setPixmap(logo_pixmap)
         else:
-            logo_label.setFixedSize(96, 96)
+            logo_label.setFixedSize(LOGO_SIZE, LOGO_SIZE)
             logo_label.setStyleSheet("background-color: black;")
         layout.addWidget(logo_label, alignment=Qt.AlignLeft)
 
@@ -721,6 +736,15 @@ class SettingsDialog(QDialog):
             daily_meds_form_layout.addRow(f"{slot}:", med_edit)
         layout.addWidget(daily_meds_group)
 
+        # Zaman dilimlerine uymayan ilaçlar: satır başına bir tekrar kuralı
+        recurrences_group = QGroupBox("Tekrarlayan İlaçlar (İlaç | GG.AA.YYYY SS:DD | Kural)")
+        recurrences_layout = QVBoxLayout(recurrences_group)
+        self.recurrences_edit = QPlainTextEdit()
+        self.recurrences_edit.setPlaceholderText("Antibiyotik | 01.08.2025 08:00 | FREQ=HOURLY;INTERVAL=8\n"
+                                                 "B12 iğnesi | 01.08.2025 10:00 | FREQ=MONTHLY;BYDAY=1MO")
+        recurrences_layout.addWidget(self.recurrences_edit)
+        layout.addWidget(recurrences_group)
+
         layout.addStretch()
 
         button_layout = QHBoxLayout()
@@ -764,14 +788,116 @@ class SettingsDialog(QDialog):
             self.reminder_date_edit.clear()    # Yeni alanlar da temizlendi
 
     def set_daily_medications(self, daily_meds_data):
-        for slot, edit_widget in self.daily_meds_edits.items():
-            edit_widget.setText(daily_meds_data.get(slot, ""))
+        # Zaman dilimi sırasıyla ilaç listesi
+        for slot, edit_widget in enumerate(self.daily_meds_edits.values()):
+            edit_widget.setText(daily_meds_data[slot] if slot < len(daily_meds_data) else "")
 
     def get_daily_medications(self):
-        daily_meds_data = {}
-        for slot, edit_widget in self.daily_meds_edits.items():
-            daily_meds_data[slot] = edit_widget.text()
-        return daily_meds_data
+        return [edit_widget.text() for edit_widget in self.daily_meds_edits.values()]
+
+    def set_recurrences(self, recurrences):
+        self.recurrences_edit.setPlainText("\n".join(recurrence.to_line() for recurrence in recurrences))
+
+    def get_recurrences(self):
+        # Boş satırlar atlanır; hatalı bir satır ValueError verir ve hiçbir kural kaydedilmez
+        recurrences = []
+        for number, line in enumerate(self.recurrences_edit.toPlainText().splitlines(), 1):
+            if line.strip():
+                try:
+                    recurrences.append(Recurrence.from_line(line).to_dict())
+                except ValueError as e:
+                    raise ValueError(f"{number}. satır: {e}") from None
+        return recurrences
+
+
+class TemplateDialog(QDialog):
+    """Bir zaman diliminin saatini ve günlük ilacını seçilen günlere uygulayan pencere."""
+
+    def __init__(self, schedule, days, time_slots, current_day, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Haftalık Şablon")
+        self.schedule = schedule
+        self.current_day = current_day
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        form_layout = QFormLayout()
+        self.slot_combo = QComboBox()
+        self.slot_combo.addItems(time_slots)
+        form_layout.addRow("Zaman Dilimi:", self.slot_combo)
+
+        self.time_edit = QLineEdit()
+        self.time_edit.setInputMask("99:99")
+        self.time_edit.setPlaceholderText("HH:MM")
+        form_layout.addRow("Saat:", self.time_edit)
+
+        self.medications_edit = QLineEdit()
+        self.medications_edit.setPlaceholderText("Bu zaman diliminde alınacak ilaçlar (her gün aynı)")
+        form_layout.addRow("İlaçlar:", self.medications_edit)
+        layout.addLayout(form_layout)
+
+        days_group = QGroupBox("Uygulanacak Günler")
+        days_layout = QGridLayout(days_group)
+        self.day_checks = []
+        for day, day_name in enumerate(days):
+            check = QCheckBox(day_name)
+            check.setChecked(day == current_day)
+            days_layout.addWidget(check, day // 4, day % 4)
+            self.day_checks.append(check)
+        group_layout = QHBoxLayout()
+        for group_name, group_days in DAY_GROUPS.items():
+            group_button = QPushButton(group_name)
+            group_button.clicked.connect(lambda checked, group_days=group_days: self.select_days(group_days))
+            group_layout.addWidget(group_button)
+        days_layout.addLayout(group_layout, 2, 0, 1, 4)
+        layout.addWidget(days_group)
+
+        button_layout = QHBoxLayout()
+        ok_button = QPushButton("Uygula")
+        cancel_button = QPushButton("İptal")
+        ok_button.clicked.connect(self.accept)
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(ok_button)
+        button_layout.addWidget(cancel_button)
+        layout.addLayout(button_layout)
+
+        self.slot_combo.currentIndexChanged.connect(self.load_slot)
+        self.load_slot(0)
+
+    def load_slot(self, slot):
+        # Seçilen zaman diliminin bugünkü saati ve günlük ilacı başlangıç değeri olarak gösterilir
+        minute = self.schedule.plan.minute(self.current_day, slot)
+        self.time_edit.setText(self.schedule.plan.time_text(self.current_day, slot) if minute != NO_TIME else "")
+        self.medications_edit.setText(self.schedule.daily_medications[slot])
+
+    def select_days(self, days):
+        for day, check in enumerate(self.day_checks):
+            check.setChecked(day in days)
+
+    def accept(self):
+        # Yarım girilmiş saat ve boş gün seçimi kabul edilmez; tamamen silinen saat "saat yok" demektir
+        text = self.time_edit.text()
+        if parse_time(text) is None and text.replace(":", "").strip():
+            QMessageBox.warning(self, "Haftalık Şablon", "Lütfen saati SS:DD biçiminde girin.")
+            return
+        if not self.days():
+            QMessageBox.warning(self, "Haftalık Şablon", "Lütfen en az bir gün seçin.")
+            return
+        super().accept()
+
+    def slot(self):
+        return self.slot_combo.currentIndex()
+
+    def minute(self):
+        minute = parse_time(self.time_edit.text())
+        return NO_TIME if minute is None else minute
+
+    def days(self):
+        return [day for day, check in enumerate(self.day_checks) if check.isChecked()]
+
+    def medications(self):
+        return self.medications_edit.text()
 
 
 class AlarmDialog(QDialog):
@@ -785,13 +911,11 @@ class AlarmDialog(QDialog):
 
         header_layout = QHBoxLayout()
         logo_label = QLabel()
-        logo_path = self.parent().load_resource("hemsirem.png")
-        if logo_path:
-            pixmap = QPixmap(logo_path)
-            scaled_pixmap = pixmap.scaled(96, 96, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            logo_label.setPixmap(scaled_pixmap)
+        logo_pixmap = resources.pixmap("hemsirem.png", LOGO_SIZE)
+        if logo_pixmap is not None:
+            logo_label.setPixmap(logo_pixmap)
         else:
-            logo_label.setFixedSize(96, 96)
+            logo_label.setFixedSize(LOGO_SIZE, LOGO_SIZE)
             logo_label.setStyleSheet("background-color: black;")
         header_layout.addWidget(logo_label)
 
@@ -869,13 +993,11 @@ class DoctorAppointmentAlarmDialog(QDialog):
 
         header_layout = QHBoxLayout()
         logo_label = QLabel()
-        logo_path = self.parent().load_resource("hemsirem.png")
-        if logo_path:
-            pixmap = QPixmap(logo_path)
-            scaled_pixmap = pixmap.scaled(96, 96, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            logo_label.setPixmap(scaled_pixmap)
+        logo_pixmap = resources.pixmap("hemsirem.png", LOGO_SIZE)
+        if logo_pixmap is not None:
+            logo_label.setPixmap(logo_pixmap)
         else:
-            logo_label.setFixedSize(96, 96)
+            logo_label.setFixedSize(LOGO_SIZE, LOGO_SIZE)
             logo_label.setStyleSheet("background-color: black;")
         header_layout.addWidget(logo_label)
 
@@ -935,10 +1057,142 @@ class DoctorAppointmentAlarmDialog(QDialog):
         else:
             self.doctor_label.setText("<span style='font-size: 16px; font-weight: bold;'>Doktor Adı:</span> Tanımlanmadı.")
 
+class AlarmBatchDialog(QDialog):
+    """Aynı anda çalan tüm alarmları (ve kaçırılanları) tek pencerede listeler."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Alarm Zamanı!")
+        self.setMinimumSize(450, 300)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        header_layout = QHBoxLayout()
+        logo_label = QLabel()
+        logo_pixmap = resources.pixmap("hemsirem.png", LOGO_SIZE)
+        if logo_pixmap is not None:
+            logo_label.setPixmap(logo_pixmap)
+        else:
+            logo_label.setFixedSize(LOGO_SIZE, LOGO_SIZE)
+            logo_label.setStyleSheet("background-color: black;")
+        header_layout.addWidget(logo_label)
+
+        self.title_label = QLabel("İlaç saati!")
+        self.title_label.setStyleSheet("font-size: 20px; font-weight: bold;")
+        header_layout.addWidget(self.title_label)
+
+        self.time_label = QLabel("12:00")
+        self.time_label.setStyleSheet("font-size: 24px; font-weight: bold;")
+        header_layout.addWidget(self.time_label, alignment=Qt.AlignRight)
+        layout.addLayout(header_layout)
+
+        self.alarms_label = QLabel()
+        self.alarms_label.setWordWrap(True)
+        self.alarms_label.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Expanding)
+        layout.addWidget(self.alarms_label)
+
+        self.missed_label = QLabel()
+        self.missed_label.setWordWrap(True)
+        self.missed_label.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Expanding)
+        layout.addWidget(self.missed_label)
+
+        layout.addStretch()
+
+        button_layout = QHBoxLayout()
+        ok_button = QPushButton("TAMAM")
+        ok_button.clicked.connect(self.accept)
+        button_layout.addWidget(ok_button)
+        layout.addLayout(button_layout)
+
+    def describe(self, item, multi_patient):
+        if item.get("type") == "appointment":
+            app_data = item.get("appointment_data", {})
+            text = f"Doktor randevusu: {app_data.get('date', '')} {app_data.get('time', '')}"
+            details = [d for d in (app_data.get("hospital", ""), app_data.get("doctor", "")) if d]
+            if details:
+                text += f" ({', '.join(details)})"
+        else:
+            text = item.get("time_slot") or ""
+            meds_list = [m.strip() for m in (item.get("medications") or "").split(',') if m.strip()]
+            text += f": {', '.join(meds_list)}" if meds_list else ": İlaç tanımlanmadı."
+        if multi_patient:
+            text = f"{item.get('patient_name', '')} - {text}"
+        return text
+
+    @staticmethod
+    def missed_count_text(item):
+        # Tekrar kuralının uyku boyunca geçen tekrarları tek satırda; gösterilen an en sonuncusudur
+        count = item.get("missed_count", 1)
+        return f" (toplam {count} doz kaçırıldı, en sonuncusu)" if count > 1 else ""
+
+    def set_batch(self, alarm):
+        multi_patient = alarm.get("multi_patient")
+        alarms = alarm.get("alarms", [])
+        missed = alarm.get("missed", [])
+        self.time_label.setText(alarm.get("time", ""))
+
+        if alarms:
+            if all(item.get("type") == "appointment" for item in alarms):
+                self.title_label.setText("Randevunuz Yaklaşıyor!")
+            else:
+                self.title_label.setText("İlaçlarınızın saati geldi!")
+            rows = [f"<span style='font-size: 16px; font-weight: bold;'>• {self.describe(item, multi_patient)}</span>"
+                    for item in alarms]
+            self.alarms_label.setText("<br>".join(rows))
+        else:
+            self.title_label.setText("Kaçırılan alarmlar var!")
+        self.alarms_label.setVisible(bool(alarms))
+
+        if missed:
+            rows = [f"<span style='font-size: 14px;'><b>• {item.get('date', '')} {item.get('time', '')}</b> "
+                    f"{self.describe(item, multi_patient)}{self.missed_count_text(item)}</span>" for item in missed]
+            self.missed_label.setText("<b>Bilgisayar uykudayken veya program yanıt vermezken çalamayan alarmlar:</b><br>"
+                                      + "<br>".join(rows))
+        self.missed_label.setVisible(bool(missed))
+
+def start_engine(alarm_client=False):
+    # Servis varsa ona bağlanılır, yoksa veri dizini kilitlenerek süreç içi motor açılır. Kilit başka bir süreçteyse
+    # (servis henüz dinlemeye başlamamış ya da servissiz açılmış bir arayüz) veri dosyaları ikinci kez açılmaz;
+    # servise yeniden bağlanılmaya çalışılır, olmazsa None döner.
+    for attempt in range(DAEMON_CONNECT_ATTEMPTS):
+        if attempt:
+            time.sleep(DAEMON_RETRY_DELAY_S)
+        engine = RemoteEngine()
+        if engine.connect_to_daemon():
+            return engine
+        if alarm_client:
+            # Alarm için başlatılan arayüz yalnızca servisle çalışır
+            return None
+        try:
+            return AlarmEngine()
+        except DataDirLocked as e:
+            print(f"Uyarı: {e}. Servise yeniden bağlanılıyor...")
+    return None
+
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
-    ex = HemşiremApp()
-    ex.show()
+
+    # Arka plan servisi (hemsirem --daemon) çalışıyorsa arayüz ona bağlanır; alarmları servis değerlendirir
+    alarm_client = "--alarm-client" in sys.argv
+    with profiler.phase("connect_to_daemon"):
+        engine = start_engine(alarm_client)
+    if engine is None:
+        if not alarm_client:
+            QMessageBox.critical(None, "Hemşirem", "Hemşirem verileri başka bir Hemşirem süreci tarafından kullanılıyor. "
+                                                   "Diğer pencereyi kapatıp yeniden deneyin.")
+        sys.exit(1)
+    if engine.remote and engine.already_running:
+        # Arayüz zaten açık; servis mevcut pencereyi öne getirdi
+        sys.exit(0)
+
+    ex = HemşiremApp(engine, alarm_client=alarm_client)
+    data_dir = ex.engine.data_dir if not ex.engine.remote else default_data_dir()
+    metrics.start("gui", data_dir, app)
+    start_watchdog(data_dir, app)
+    app.aboutToQuit.connect(metrics.stop)
+    if not alarm_client:
+        ex.show()
     sys.exit(app.exec_())
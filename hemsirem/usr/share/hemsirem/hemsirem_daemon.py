@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import json
+import signal
+from contextlib import contextmanager
+from socket import socketpair
+from PyQt5.QtCore import QCoreApplication, QObject, QProcess, QSocketNotifier, QTimer, pyqtSignal
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+from hemsirem_engine import AlarmEngine, DataDirLocked, DAYS, TIME_SLOTS
+from hemsirem_plan import Schedule
+from hemsirem_profile import profiler
+from hemsirem_metrics import metrics
+from hemsirem_watchdog import start_watchdog
+
+# Kullanıcı başına tek servis; soket adı kullanıcı kimliğini içerir
+SOCKET_NAME = f"hemsirem-{os.getuid()}"
+# Alarm için açılan arayüz bu süre içinde bağlanmazsa yeniden başlatılabilir
+GUI_SPAWN_TIMEOUT_MS = 30000
+
+
+def _send(socket, message):
+    socket.write((json.dumps(message, ensure_ascii=False) + "\n").encode('utf-8'))
+    socket.flush()
+
+
+def _read_messages(socket):
+    messages = []
+    while socket.canReadLine():
+        line = bytes(socket.readLine()).decode('utf-8', errors='replace').strip()
+        if not line:
+            continue
+        try:
+            messages.append(json.loads(line))
+        except json.JSONDecodeError:
+            print(f"Uyarı: Geçersiz mesaj yok sayıldı: {line[:80]}")
+    return messages
+
+
+def _patient_state(patient):
+    # Çizelge paketlenmiş olarak (WeeklyPlan.to_json), diğer ayarlar olduğu gibi gönderilir (Schedule.to_state)
+    return {"id": patient.id, "name": patient.name, "schedule": patient.schedule.to_state()}
+
+
+class HemsiremDaemon(QObject):
+    """Arka planda çalışan alarm servisi (/usr/bin/hemsirem --daemon).
+
+    Veri dosyalarının ve alarm çizelgesinin sahibi AlarmEngine'dir; servis
+    yalnızca QtCore ve QtNetwork yükler. Arayüz yerel bir soket üzerinden
+    bağlanır, düzenlemeleri servise iletir ve alarmları servisten alır. Alarm
+    çaldığında bağlı bir arayüz yoksa arayüz yalnızca alarm için başlatılır.
+    """
+
+    def __init__(self, data_dir=None, parent=None):
+        super().__init__(parent)
+        self.engine = AlarmEngine(data_dir, self)
+        self.engine.alarm.connect(self.on_alarm)
+        self.engine.changed.connect(self.on_changed)
+        self.engine.changed_batch.connect(self.on_changed_batch)
+        self.engine.patient_added.connect(self.on_patient_added)
+
+        self.clients = []
+        self.gui_client = None
+        self.pending_alarms = []
+
+        self._spawn_timer = QTimer(self)
+        self._spawn_timer.setSingleShot(True)
+
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self.on_new_connection)
+
+    def listen(self):
+        if self.server.listen(SOCKET_NAME):
+            return True
+        # Önceki servis düzgün kapanmadıysa soket dosyası kalmış olabilir
+        probe = QLocalSocket()
+        probe.connectToServer(SOCKET_NAME)
+        if probe.waitForConnected(500):
+            print("Hata: Hemşirem servisi zaten çalışıyor.")
+            return False
+        QLocalServer.removeServer(SOCKET_NAME)
+        return self.server.listen(SOCKET_NAME)
+
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self.clients.append(socket)
+            socket.readyRead.connect(lambda s=socket: self.on_ready_read(s))
+            socket.disconnected.connect(lambda s=socket: self.on_disconnected(s))
+
+    def on_disconnected(self, socket):
+        if socket in self.clients:
+            self.clients.remove(socket)
+        if socket is self.gui_client:
+            self.gui_client = None
+        socket.deleteLater()
+
+    def on_ready_read(self, socket):
+        for message in _read_messages(socket):
+            self.handle_message(socket, message)
+
+    def handle_message(self, socket, message):
+        op = message.get("op")
+        if op == "hello":
+            if self.gui_client is not None and self.gui_client is not socket:
+                # Arayüz zaten açık; yenisi kapanır, mevcut pencere öne getirilir
+                _send(self.gui_client, {"op": "activate"})
+                _send(socket, {"op": "already_running"})
+                return
+            self.gui_client = socket
+            self._spawn_timer.stop()
+            _send(socket, {
+                "op": "state",
+                "active": self.engine.active_id,
+                "patients": [_patient_state(p) for p in self.engine.patients.values()],
+            })
+            for alarm in self.pending_alarms:
+                _send(socket, {"op": "alarm", "alarm": alarm})
+            self.pending_alarms = []
+        elif op == "set":
+            patient_id = message.get("patient")
+            path = message.get("path")
+            if patient_id in self.engine.patients and path:
+                try:
+                    self.engine.set_value(patient_id, path, message.get("value"))
+                except ValueError as e:
+                    print(f"Uyarı: Geçersiz değişiklik yok sayıldı: {e}")
+        elif op == "set_batch":
+            # Toplu güncelleme bütün olarak uygulanır; geçersiz bir değer varsa hiçbiri uygulanmaz
+            patient_id = message.get("patient")
+            changes = message.get("changes") or []
+            if patient_id in self.engine.patients and changes:
+                try:
+                    with self.engine.batch(patient_id):
+                        for path, value in changes:
+                            self.engine.set_value(patient_id, path, value)
+                except (ValueError, TypeError) as e:
+                    print(f"Uyarı: Geçersiz toplu değişiklik yok sayıldı: {e}")
+        elif op == "set_active":
+            self.engine.set_active(message.get("patient"))
+        elif op == "add_patient":
+            name = (message.get("name") or "").strip()
+            if name:
+                self.engine.add_patient(name)
+        else:
+            print(f"Uyarı: Bilinmeyen istek: {op}")
+
+    def on_changed(self, patient_id, path, value):
+        # Servisin kendi yaptığı değişiklikler (haftalık sıfırlama, randevu işareti) arayüze yansıtılır
+        if self.gui_client is not None:
+            _send(self.gui_client, {"op": "changed", "patient": patient_id, "path": path, "value": value})
+
+    def on_changed_batch(self, patient_id, changes):
+        if self.gui_client is not None:
+            _send(self.gui_client, {"op": "changed_batch", "patient": patient_id, "changes": changes})
+
+    def on_patient_added(self, patient_id):
+        if self.gui_client is not None:
+            _send(self.gui_client, {"op": "patient_added", "patient": _patient_state(self.engine.patients[patient_id])})
+
+    def on_alarm(self, alarm):
+        if self.gui_client is not None:
+            _send(self.gui_client, {"op": "alarm", "alarm": alarm})
+            return
+        self.pending_alarms.append(alarm)
+        if not self._spawn_timer.isActive():
+            self.spawn_gui()
+
+    def spawn_gui(self):
+        # Arayüz yalnızca alarmı göstermek için gizli başlatılır; alarm kapanınca kendiliğinden çıkar
+        gui_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hemsirem.py")
+        if QProcess.startDetached(sys.executable, [gui_script, "--alarm-client"]):
+            self._spawn_timer.start(GUI_SPAWN_TIMEOUT_MS)
+        else:
+            print("Hata: Alarm için arayüz başlatılamadı.")
+            metrics.error("gui_spawn_failed")
+
+    def close(self):
+        self.server.close()
+        self.engine.close()
+
+
+class RemotePatient:
+    """Servisteki bir hastanın arayüz tarafındaki kopyası."""
+
+    def __init__(self, state):
+        self.id = state["id"]
+        self.name = state["name"]
+        self.schedule = Schedule.from_state(state.get("schedule") or {})
+
+
+class RemoteEngine(QObject):
+    """Arayüzün servise bağlandığında kullandığı AlarmEngine vekili.
+
+    AlarmEngine ile aynı sinyal ve metotları sunar; veri yerelde bir kopya
+    olarak tutulur ve her düzenleme servise iletilir.
+    """
+
+    remote = True
+
+    alarm = pyqtSignal(object)
+    changed = pyqtSignal(str, object, object)
+    changed_batch = pyqtSignal(str, object)
+    patient_added = pyqtSignal(str)
+    weekly_reset = pyqtSignal(str)
+    activate_requested = pyqtSignal()
+    disconnected = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.days = DAYS
+        self.time_slots = TIME_SLOTS
+        self.patients = {}
+        self.active_id = None
+        self.already_running = False
+        self._closing = False
+        self._batch = None
+        self.socket = QLocalSocket(self)
+
+    def connect_to_daemon(self, timeout_ms=1000):
+        # Servis çalışmıyorsa False döner; arayüz o zaman kendi motorunu kullanır
+        self.socket.connectToServer(SOCKET_NAME)
+        if not self.socket.waitForConnected(timeout_ms):
+            return False
+        _send(self.socket, {"op": "hello"})
+        while self.active_id is None and not self.already_running:
+            if not self.socket.waitForReadyRead(timeout_ms * 3):
+                self.socket.abort()
+                return False
+            self.on_ready_read()
+        self.socket.readyRead.connect(self.on_ready_read)
+        self.socket.disconnected.connect(self.on_disconnected)
+        return True
+
+    def on_disconnected(self):
+        # Arayüzün kendi kapanışı sırasındaki bağlantı kesilmesi bildirilmez
+        if not self._closing:
+            self.disconnected.emit()
+
+    def on_ready_read(self):
+        for message in _read_messages(self.socket):
+            op = message.get("op")
+            if op == "state":
+                self.patients = {p["id"]: RemotePatient(p) for p in message.get("patients", [])}
+                self.active_id = message.get("active") if message.get("active") in self.patients else next(iter(self.patients))
+            elif op == "already_running":
+                self.already_running = True
+            elif op == "alarm":
+                self.alarm.emit(message.get("alarm", {}))
+            elif op == "changed":
+                patient = self.patients.get(message.get("patient"))
+                if patient is None:
+                    continue
+                path, value = message.get("path"), message.get("value")
+                if self._apply_remote(patient, path, value):
+                    self.changed.emit(patient.id, path, value)
+            elif op == "changed_batch":
+                patient = self.patients.get(message.get("patient"))
+                if patient is None:
+                    continue
+                changes = [[path, value] for path, value in message.get("changes") or []
+                           if self._apply_remote(patient, path, value)]
+                if changes:
+                    self.changed_batch.emit(patient.id, changes)
+            elif op == "patient_added":
+                patient = RemotePatient(message["patient"])
+                self.patients[patient.id] = patient
+                self.patient_added.emit(patient.id)
+            elif op == "activate":
+                self.activate_requested.emit()
+
+    @staticmethod
+    def _apply_remote(patient, path, value):
+        # Servisten gelen değişikliği yerel kopyaya uygular. Arayüzün kendi düzenlemesinin yankısı ise
+        # (değer aynı) ya da değer geçersizse False döner ve sinyal yayınlanmaz.
+        try:
+            if patient.schedule.get(path) == value:
+                return False
+        except (KeyError, TypeError):
+            pass
+        try:
+            patient.schedule.apply(path, value, strict=False)
+        except ValueError:
+            return False
+        return True
+
+    def set_active(self, patient_id):
+        self.active_id = patient_id
+        _send(self.socket, {"op": "set_active", "patient": patient_id})
+
+    def add_patient(self, name):
+        # Hasta servis tarafında oluşturulur; hazır olunca patient_added sinyali gelir
+        _send(self.socket, {"op": "add_patient", "name": name})
+
+    def set_value(self, patient_id, path, value):
+        # Değer yerelde doğrulanır (geçersizse ValueError) ve normalleştirilmiş haliyle gönderilir
+        value = self.patients[patient_id].schedule.set(path, value)
+        if self._batch is not None and self._batch[0] == patient_id:
+            self._batch[1].append([list(path), value])
+        else:
+            _send(self.socket, {"op": "set", "patient": patient_id, "path": list(path), "value": value})
+        return value
+
+    @contextmanager
+    def batch(self, patient_id):
+        # Blok içindeki değişiklikler yerelde uygulanır ve servise tek bir mesajla gönderilir;
+        # blok hatayla biterse yerel kopya geri alınır ve hiçbir şey gönderilmez
+        if self._batch is not None:
+            yield
+            return
+        self._batch = (patient_id, [])
+        try:
+            with self.patients[patient_id].schedule.batch():
+                yield
+            changes = self._batch[1]
+        finally:
+            self._batch = None
+        if changes:
+            _send(self.socket, {"op": "set_batch", "patient": patient_id, "changes": changes})
+            # AlarmEngine gibi toplu güncelleme bir kez bildirilir; servisten gelecek yankı yok sayılır
+            self.changed_batch.emit(patient_id, changes)
+
+    def flush(self):
+        self.socket.flush()
+
+    def close(self):
+        self._closing = True
+        self.socket.flush()
+        self.socket.disconnectFromServer()
+
+
+def _quit_on_signals(app):
+    # SIGTERM/SIGINT geldiğinde bekleyen kayıtlar yazılarak düzgün çıkılır. Sinyal bir soket çiftiyle
+    # olay döngüsüne taşınır; böylece sinyalleri yakalamak için periyodik uyanmaya gerek kalmaz.
+    read_end, write_end = socketpair()
+    write_end.setblocking(False)
+    signal.set_wakeup_fd(write_end.fileno())
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *args: None)
+    notifier = QSocketNotifier(read_end.fileno(), QSocketNotifier.Read, app)
+    notifier.activated.connect(lambda: (read_end.recv(64), app.quit()))
+    return read_end, write_end
+
+
+def main():
+    app = QCoreApplication(sys.argv)
+    app.setApplicationName("Hemşirem")
+    try:
+        daemon = HemsiremDaemon()
+    except DataDirLocked as e:
+        # Servis zaten çalışıyor ya da arayüz servis olmadan kendi motoruyla açık; veri dosyaları ikinci kez açılmaz
+        print(f"Hata: {e}. Önce diğer Hemşirem sürecini kapatın.")
+        return 1
+    if not daemon.listen():
+        return 1
+    profiler.since_start("listen")
+    profiler.report(daemon.engine.data_dir)
+    metrics.start("daemon", daemon.engine.data_dir, app)
+    start_watchdog(daemon.engine.data_dir, app)
+    app.aboutToQuit.connect(daemon.close)
+    app.aboutToQuit.connect(metrics.stop)
+    signal_sockets = _quit_on_signals(app) # olay döngüsü boyunca açık kalmalı
+    return app.exec_()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
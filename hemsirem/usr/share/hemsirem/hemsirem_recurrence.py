@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# İlaç başına tekrar kuralları (RFC 5545 RRULE alt kümesi). Saf Python; PyQt5 gerektirmez.
+
+import itertools
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+
+FREQUENCIES = ("HOURLY", "DAILY", "WEEKLY", "MONTHLY")
+WEEKDAY_CODES = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+WEEKDAY_NAMES = ("pazartesi", "salı", "çarşamba", "perşembe", "cuma", "cumartesi", "pazar")
+ORDINAL_NAMES = {1: "ilk", 2: "ikinci", 3: "üçüncü", 4: "dördüncü", 5: "beşinci", -1: "son"}
+# Sıklık -> ("her ...", "N ... bir")
+FREQUENCY_NAMES = {"HOURLY": ("saat", "saatte"), "DAILY": ("gün", "günde"), "WEEKLY": ("hafta", "haftada"),
+                   "MONTHLY": ("ay", "ayda")}
+START_FORMAT = "%d.%m.%Y %H:%M"
+UNTIL_FORMAT = "%Y%m%dT%H%M%S"
+# Hiç tekrar üretmeyen bu kadar ardışık dönemden sonra kuralın bittiği kabul edilir (ör. her yıl 30 Şubat)
+MAX_EMPTY_PERIODS = 1000
+
+
+def _positive(text, name):
+    try:
+        value = int(text)
+    except ValueError:
+        raise ValueError(f"Geçersiz {name}: {text!r}") from None
+    if value < 1:
+        raise ValueError(f"Geçersiz {name}: {text!r}")
+    return value
+
+
+def _numbers(text, name, low, high, signed=False):
+    # signed: negatif değerler sondan sayılır (BYMONTHDAY=-1 ayın son günü)
+    values = []
+    for part in text.split(","):
+        try:
+            value = int(part)
+        except ValueError:
+            raise ValueError(f"Geçersiz {name}: {text!r}") from None
+        if not low <= (abs(value) if signed else value) <= high:
+            raise ValueError(f"Geçersiz {name}: {text!r}")
+        values.append(value)
+    return tuple(sorted(set(values)))
+
+
+def _weekdays(text):
+    # "MO,WE" -> ((0, 0), (2, 0)); "1SU,-1FR" -> ((6, 1), (4, -1)) (ayın ilk pazarı, son cuması)
+    weekdays = []
+    for part in text.split(","):
+        code, ordinal = part[-2:], part[:-2]
+        if code not in WEEKDAY_CODES:
+            raise ValueError(f"Geçersiz gün: {part!r}")
+        try:
+            ordinal = int(ordinal) if ordinal else 0
+        except ValueError:
+            raise ValueError(f"Geçersiz gün: {part!r}") from None
+        if ordinal not in ORDINAL_NAMES and ordinal != 0:
+            raise ValueError(f"Geçersiz gün: {part!r}")
+        weekdays.append((WEEKDAY_CODES.index(code), ordinal))
+    return tuple(sorted(set(weekdays)))
+
+
+class Recurrence:
+    """Bir ilacın tekrar kuralı: "8 saatte bir", "iki günde bir", "pazartesiden başlayarak 10 gün", "ayın ilk pazarı".
+
+    Kural RRULE metniyle (FREQ=DAILY;INTERVAL=2;BYHOUR=8;BYMINUTE=0) ve bir
+    başlangıç anıyla tanımlanır. Desteklenenler: FREQ (HOURLY, DAILY, WEEKLY,
+    MONTHLY), INTERVAL, COUNT, UNTIL, BYDAY (aylıkta 1SU, -1FR gibi sıralı),
+    BYMONTHDAY, BYHOUR, BYMINUTE. Tekrarlar occurrences() üreteciyle istendikçe
+    hesaplanır; takvim hiçbir zaman bütünüyle oluşturulmaz ve COUNT yoksa
+    aranan ana dönem aritmetiğiyle doğrudan atlanır.
+    """
+
+    __slots__ = ("medication", "start", "freq", "interval", "count", "until", "weekdays", "monthdays", "times")
+
+    def __init__(self, medication, start, rule):
+        if not isinstance(medication, str) or not medication.strip():
+            raise ValueError("İlaç adı boş olamaz")
+        if not isinstance(start, datetime):
+            raise ValueError(f"Geçersiz başlangıç: {start!r}")
+        self.medication = medication.strip()
+        self.start = start.replace(second=0, microsecond=0)
+        self.freq = None
+        self.interval = 1
+        self.count = None
+        self.until = None
+        self.weekdays = ()
+        self.monthdays = ()
+        hours, minutes = (self.start.hour,), (self.start.minute,)
+        for part in (rule or "").strip().upper().split(";"):
+            if not part:
+                continue
+            name, _, value = part.partition("=")
+            if not value:
+                raise ValueError(f"Geçersiz kural: {part!r}")
+            if name == "FREQ" and value in FREQUENCIES:
+                self.freq = value
+            elif name == "INTERVAL":
+                self.interval = _positive(value, "aralık")
+            elif name == "COUNT":
+                self.count = _positive(value, "tekrar sayısı")
+            elif name == "UNTIL":
+                try:
+                    self.until = datetime.strptime(value.rstrip("Z"), UNTIL_FORMAT)
+                except ValueError:
+                    raise ValueError(f"Geçersiz bitiş: {value!r}") from None
+            elif name == "BYDAY":
+                self.weekdays = _weekdays(value)
+            elif name == "BYMONTHDAY":
+                self.monthdays = _numbers(value, "ayın günü", 1, 31, signed=True)
+            elif name == "BYHOUR":
+                hours = _numbers(value, "saat", 0, 23)
+            elif name == "BYMINUTE":
+                minutes = _numbers(value, "dakika", 0, 59)
+            else:
+                raise ValueError(f"Desteklenmeyen kural: {part!r}")
+        if self.freq is None:
+            raise ValueError(f"Kuralda FREQ eksik: {rule!r}")
+        if self.freq != "MONTHLY" and any(ordinal for _, ordinal in self.weekdays):
+            raise ValueError("Sıralı gün (1SU gibi) yalnızca aylık kurallarda kullanılabilir")
+        if self.freq in ("HOURLY", "DAILY") and (self.weekdays or self.monthdays):
+            raise ValueError("Saatlik ve günlük kurallarda BYDAY/BYMONTHDAY kullanılamaz")
+        if self.freq == "WEEKLY" and self.monthdays:
+            raise ValueError("Haftalık kurallarda BYMONTHDAY kullanılamaz")
+        # Gün içindeki saatler (dakika); saatlik kurallarda başlangıç anından itibaren aralıkla ilerlenir
+        self.times = tuple(sorted(hour * 60 + minute for hour in hours for minute in minutes))
+        if self.freq == "HOURLY" and self.times != (self.start.hour * 60 + self.start.minute,):
+            raise ValueError("Saatlik kurallarda BYHOUR/BYMINUTE kullanılamaz")
+
+    @property
+    def rule(self):
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until is not None:
+            parts.append(f"UNTIL={self.until.strftime(UNTIL_FORMAT)}")
+        if self.weekdays:
+            parts.append("BYDAY=" + ",".join(f"{ordinal or ''}{WEEKDAY_CODES[day]}" for day, ordinal in self.weekdays))
+        if self.monthdays:
+            parts.append("BYMONTHDAY=" + ",".join(map(str, self.monthdays)))
+        if self.freq != "HOURLY" and self.times != (self.start.hour * 60 + self.start.minute,):
+            hours = sorted({minute // 60 for minute in self.times})
+            minutes = sorted({minute % 60 for minute in self.times})
+            parts.append("BYHOUR=" + ",".join(map(str, hours)))
+            parts.append("BYMINUTE=" + ",".join(map(str, minutes)))
+        return ";".join(parts)
+
+    def describe(self):
+        # Alarm penceresinde gösterilen kısa açıklama
+        unit, every = FREQUENCY_NAMES[self.freq]
+        text = f"{self.interval} {every} bir" if self.interval > 1 else f"her {unit}"
+        days = [f"{ORDINAL_NAMES[ordinal]} {WEEKDAY_NAMES[day]}" if ordinal else WEEKDAY_NAMES[day]
+                for day, ordinal in self.weekdays]
+        days += [f"{day}." if day > 0 else f"sondan {-day}." for day in self.monthdays]
+        if days:
+            text += " (" + ", ".join(days) + ")"
+        return text
+
+    # --- tekrarların hesaplanması ---
+
+    def _period_of(self, moment):
+        # Anın içinde bulunduğu dönemin sırası (başlangıçtan önceyse negatif)
+        if self.freq == "HOURLY":
+            return int((moment - self.start).total_seconds() // 3600) // self.interval
+        if self.freq == "DAILY":
+            return (moment.date() - self.start.date()).days // self.interval
+        if self.freq == "WEEKLY":
+            weeks = ((moment.date() - timedelta(days=moment.weekday()))
+                     - (self.start.date() - timedelta(days=self.start.weekday()))).days // 7
+            return weeks // self.interval
+        return ((moment.year - self.start.year) * 12 + moment.month - self.start.month) // self.interval
+
+    def _days_of_month(self, year, month):
+        last = monthrange(year, month)[1]
+        monthdays = set()
+        for day in self.monthdays:
+            day = day if day > 0 else last + day + 1
+            if 1 <= day <= last:
+                monthdays.add(day)
+        weekdays = set()
+        for weekday, ordinal in self.weekdays:
+            first = (weekday - date(year, month, 1).weekday()) % 7 + 1
+            candidates = range(first, last + 1, 7)
+            if not ordinal:
+                weekdays.update(candidates)
+            elif -len(candidates) <= (ordinal - 1 if ordinal > 0 else ordinal) < len(candidates):
+                weekdays.add(candidates[ordinal - 1 if ordinal > 0 else ordinal])
+        # İkisi birlikte verilirse BYDAY, BYMONTHDAY'i daraltır (RFC 5545): ör. 13'üne denk gelen cumalar
+        if self.monthdays and self.weekdays:
+            return sorted(monthdays & weekdays)
+        if not self.monthdays and not self.weekdays:
+            return [self.start.day] if self.start.day <= last else []
+        return sorted(monthdays | weekdays)
+
+    def _period(self, index):
+        # Dönemdeki tekrarlar sırayla (başlangıçtan öncekiler atlanır)
+        if self.freq == "HOURLY":
+            return [self.start + timedelta(hours=index * self.interval)]
+        if self.freq == "DAILY":
+            days = [self.start.date() + timedelta(days=index * self.interval)]
+        elif self.freq == "WEEKLY":
+            monday = self.start.date() - timedelta(days=self.start.weekday()) + timedelta(weeks=index * self.interval)
+            weekdays = sorted(day for day, _ in self.weekdays) or [self.start.weekday()]
+            days = [monday + timedelta(days=day) for day in weekdays]
+        else:
+            year, month = divmod(self.start.month - 1 + index * self.interval, 12)
+            year += self.start.year
+            days = [date(year, month + 1, day) for day in self._days_of_month(year, month + 1)]
+        midnight = datetime.min.time()
+        return [moment for day in days for moment in
+                (datetime.combine(day, midnight) + timedelta(minutes=minute) for minute in self.times)
+                if moment >= self.start]
+
+    def _skip_to(self, after):
+        # Aranan dönemin hemen öncesi ve o döneme kadar sayılmış tekrar sayısı. İlk dönemden sonra her
+        # dönemdeki tekrar sayısı saatlik, günlük ve haftalık kurallarda sabittir; COUNT olsa da sayım
+        # için dönemler tek tek dolaşılmaz. Aylık kurallarda ay uzunluğu değiştiğinden baştan sayılır.
+        index = max(0, self._period_of(after) - 1)
+        if self.count is None or index == 0:
+            return index, 0
+        if self.freq == "MONTHLY":
+            return 0, 0
+        return index, len(self._period(0)) + (index - 1) * len(self._period(1))
+
+    def occurrences(self, after=None):
+        # 'after' anından sonraki (dahil değil) tekrarları sırayla üretir
+        if after is not None and self.until is not None and after >= self.until:
+            return
+        index, counted = self._skip_to(after) if after is not None else (0, 0)
+        empty = 0
+        while empty < MAX_EMPTY_PERIODS:
+            moments = self._period(index)
+            empty = 0 if moments else empty + 1
+            for moment in moments:
+                if self.until is not None and moment > self.until:
+                    return
+                if self.count is not None:
+                    if counted >= self.count:
+                        return
+                    counted += 1
+                if after is None or moment > after:
+                    yield moment
+            index += 1
+
+    def next_after(self, after):
+        return next(self.occurrences(after), None)
+
+    def next_occurrences(self, after, limit):
+        return list(itertools.islice(self.occurrences(after), limit))
+
+    # --- seri hale getirme ---
+
+    def to_dict(self):
+        return {"medication": self.medication, "start": self.start.strftime(START_FORMAT), "rule": self.rule}
+
+    @classmethod
+    def from_dict(cls, data):
+        if not isinstance(data, dict):
+            raise ValueError(f"Geçersiz tekrar kuralı: {data!r}")
+        try:
+            start = datetime.strptime(str(data.get("start", "")).strip(), START_FORMAT)
+        except ValueError:
+            raise ValueError(f"Geçersiz başlangıç: {data.get('start')!r}") from None
+        return cls(data.get("medication", ""), start, data.get("rule", ""))
+
+    @property
+    def key(self):
+        # Kuralın kalıcı kimliği (alarm anahtarı); listedeki sırası değişse de aynı kalır
+        return self.to_line()
+
+    def to_line(self):
+        # Ayarlar penceresindeki satır biçimi: "İlaç | GG.AA.YYYY SS:DD | RRULE"
+        return f"{self.medication} | {self.start.strftime(START_FORMAT)} | {self.rule}"
+
+    @classmethod
+    def from_line(cls, line):
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) != 3:
+            raise ValueError(f"Satır 'İlaç | GG.AA.YYYY SS:DD | FREQ=...' biçiminde olmalı: {line!r}")
+        return cls.from_dict({"medication": parts[0], "start": parts[1], "rule": parts[2]})
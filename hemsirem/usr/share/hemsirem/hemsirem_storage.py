@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import shutil
+import threading
+
+from hemsirem_metrics import metrics
+from hemsirem_plan import (Schedule, WeeklyPlan, SCHEMA_VERSION, PLAN_WEEK_PATH, STATUS_FIELD, WEEK_FIELD, DAY_COUNT,
+                           SLOT_COUNT, STATUS_LABELS, is_slot_path, upgrade_change, migrate_legacy)
+
+# Günlükte bu kadar kayıt birikince arka planda yeni bir anlık görüntü (snapshot) alınır
+COMPACT_THRESHOLD = 500
+
+
+def _fsync_dir(path):
+    # Yeniden adlandırmanın kalıcı olması için dizin girdisini de diske yaz
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class JournalStorage:
+    """hemsiremdata.json anlık görüntüsü + yalnızca eklemeli değişiklik günlüğü.
+
+    Her düzenleme günlüğe tek satırlık bir kayıt olarak eklenir. Açılışta anlık
+    görüntü okunur ve günlük üzerine yeniden oynatılır. Günlük büyüdüğünde
+    anlık görüntü geçici bir dosyaya yazılıp atomik olarak yeniden adlandırılır,
+    böylece yazma sırasında elektrik kesilse bile veri dosyası bozulmaz.
+    Anlık görüntü sürümlüdür ({"schema": 2, "plan": ..., "settings": ...});
+    çizelge paketlenmiş WeeklyPlan olarak, diğer anahtarlar ayarlar olarak
+    tutulur. Eski (adlarla anahtarlanmış) dosya açılışta dönüştürülür ve
+    <ad>.json.v1 olarak saklanır. load() bir Schedule döndürür; depolama ona
+    abone olur ve her değişikliği günlüğe ekler.
+    """
+
+    def __init__(self, data_dir, name="hemsiremdata"):
+        self.data_dir = data_dir
+        self.snapshot_file = os.path.join(data_dir, f"{name}.json")
+        self.journal_file = os.path.join(data_dir, f"{name}.journal")
+        self.backup_file = self.snapshot_file + ".v1"
+        self.path = self.snapshot_file
+        # Sıkıştırma sürerken devreden günlük bu adla saklanır
+        self.compacting_file = self.journal_file + ".compacting"
+        self.schedule = Schedule()
+        # Eski biçimden dönüştürülürken haftası bulunan durumlar; motor bunları geçmişe aktarır
+        self.migrated_statuses = []
+        self._pending = []
+        # Diske yapılan yazma (ekleme + fsync) sayısı; toplu güncellemenin tek yazma yaptığını doğrulamak için
+        self.writes = 0
+        self._journal_records = 0
+        self._compact_thread = None
+
+    def load(self):
+        self.schedule = Schedule()
+        legacy = False
+        if os.path.exists(self.snapshot_file):
+            try:
+                with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                legacy = self._load_snapshot(data)
+            except (json.JSONDecodeError, UnicodeDecodeError, ValueError, TypeError):
+                print(f"Hata: {self.snapshot_file} dosyası bozuk. Günlükteki kayıtlarla devam ediliyor.")
+                metrics.error("snapshot_corrupt")
+                self.schedule = Schedule()
+
+        # Yarıda kalmış bir sıkıştırmanın günlüğü de yeniden oynatılır (kayıtlar idempotent)
+        self._replay(self.compacting_file)
+        self._journal_records = self._replay(self.journal_file)
+
+        if legacy:
+            # Eski dosya olduğu gibi saklanır; yeni biçim hemen yazılır
+            if not os.path.exists(self.backup_file):
+                shutil.copy2(self.snapshot_file, self.backup_file)
+            self.compact(background=False)
+            print(f"Bilgi: {self.snapshot_file} yeni veri biçimine (sürüm {SCHEMA_VERSION}) dönüştürüldü; "
+                  f"eski dosya {self.backup_file} olarak saklandı.")
+        elif self._journal_records >= COMPACT_THRESHOLD or os.path.exists(self.compacting_file):
+            self.compact(background=False)
+        self.schedule.subscribe(self.record)
+        return self.schedule
+
+    def _load_snapshot(self, data):
+        # Eski biçimli bir anlık görüntüyse True döner
+        if not isinstance(data, dict):
+            raise ValueError(data)
+        schema = data.get("schema")
+        if schema is None:
+            self.migrated_statuses = migrate_legacy(data, self._apply)
+            return True
+        if schema > SCHEMA_VERSION:
+            print(f"Uyarı: {self.snapshot_file} daha yeni bir sürüme (biçim {schema}) ait; tanınan alanlar okunuyor.")
+        self.schedule = Schedule.from_state(data)
+        return False
+
+    def _apply(self, path, value):
+        # Yükleme sırasında: bildirim yok, eski sürümde kaydedilmiş geçersiz alanlar boş bırakılır
+        self.schedule.apply(path, value, strict=False)
+
+    def _replay(self, path):
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            raw = f.read()
+
+        # Elektrik kesintisinde yarım kalmış son satır atılır; aksi halde sonraki kayıt ona yapışırdı
+        complete_len = raw.rfind(b"\n") + 1
+        if complete_len < len(raw):
+            with open(path, 'r+b') as f:
+                f.truncate(complete_len)
+
+        count = 0
+        for line in raw[:complete_len].splitlines():
+            try:
+                record = json.loads(line.decode('utf-8'))
+                # Eski sürümün günlüğündeki kayıtlar da yeni biçime çevrilerek uygulanır
+                for path, value in record["b"] if "b" in record else [(record["p"], record["v"])]:
+                    for change in upgrade_change(path, value):
+                        self._apply(*change)
+            except (ValueError, KeyError, TypeError, IndexError, OverflowError):
+                continue
+            count += 1
+        return count
+
+    def snapshot(self):
+        return {"schema": SCHEMA_VERSION, **self.schedule.to_state()}
+
+    def record(self, changes):
+        # Schedule aboneliği: değişiklik bellekte zaten uygulanmıştır, yalnızca günlüğe eklenir.
+        # Toplu güncelleme tek satırdır; yarım kalan satır atıldığı için ya tamamı ya hiçbiri uygulanır.
+        if len(changes) == 1:
+            (path, value), = changes
+            record = {"p": list(path), "v": value}
+        else:
+            record = {"b": [[list(path), value] for path, value in changes]}
+        self._pending.append(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+
+    def has_pending(self):
+        return bool(self._pending)
+
+    def flush(self):
+        # Bekleyen tüm kayıtlar tek bir ekleme ve tek bir fsync ile diske yazılır
+        self._append_pending()
+        if self._journal_records >= COMPACT_THRESHOLD:
+            self.compact()
+
+    def _append_pending(self):
+        if not self._pending:
+            return
+        lines = self._pending
+        self._pending = []
+        text = "\n".join(lines) + "\n"
+        with open(self.journal_file, 'a', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_records += len(lines)
+        self.writes += 1
+        metrics.count("storage_writes", backend="journal")
+        if metrics.enabled:
+            metrics.count("bytes_written", len(text.encode('utf-8')), file="journal")
+
+    def compact(self, background=True):
+        if self._compact_thread is not None and self._compact_thread.is_alive():
+            return
+        self._append_pending()
+
+        # Anlık görüntü bu iş parçacığında seri hale getirilir; böylece tutarlı bir kopya alınır
+        snapshot_text = json.dumps(self.snapshot(), ensure_ascii=False, separators=(',', ':'))
+        if metrics.enabled:
+            metrics.count("bytes_written", len(snapshot_text.encode('utf-8')), file="snapshot")
+        if os.path.exists(self.journal_file):
+            if os.path.exists(self.compacting_file):
+                # Önceki sıkıştırma tamamlanamamış; günlüğü onun devreden dosyasına ekle
+                with open(self.journal_file, 'rb') as src, open(self.compacting_file, 'ab') as dst:
+                    dst.write(src.read())
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.remove(self.journal_file)
+            else:
+                os.replace(self.journal_file, self.compacting_file)
+        self._journal_records = 0
+
+        if background:
+            self._compact_thread = threading.Thread(target=self._write_snapshot, args=(snapshot_text,), daemon=True)
+            self._compact_thread.start()
+        else:
+            self._write_snapshot(snapshot_text)
+
+    def _write_snapshot(self, snapshot_text):
+        tmp_file = self.snapshot_file + ".tmp"
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(snapshot_text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.snapshot_file)
+            _fsync_dir(self.data_dir)
+            if os.path.exists(self.compacting_file):
+                os.remove(self.compacting_file)
+        except OSError as e:
+            print(f"Hata: Veri dosyası sıkıştırılamadı: {e}")
+            metrics.error("compact_failed")
+
+    def close(self):
+        self.flush()
+        if self._compact_thread is not None:
+            self._compact_thread.join()
+
+
+class SqliteStorage:
+    """Aynı veriyi SQLite (WAL kipi) içinde satır bazında saklayan depolama.
+
+    Haftalık çizelge (gün, zaman dilimi) başına bir satırdır ve
+    (weekday, minute_of_day) üzerinden indekslenir; durum ve haftası tamsayı
+    kod olarak tutulur. Durum değişiklikleri status_log tablosunda birikir;
+    diğer üst düzey anahtarlar (appointment_data, daily_medications, ...)
+    settings tablosunda JSON olarak tutulur. Biçim sürümü PRAGMA user_version
+    ile saklanır; eski (metin durumlu) veritabanı açılışta dönüştürülür.
+    """
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS schedule (
+            weekday INTEGER NOT NULL,
+            slot INTEGER NOT NULL,
+            minute_of_day INTEGER,
+            status INTEGER,
+            week INTEGER,
+            PRIMARY KEY (weekday, slot)
+        )""",
+        "CREATE INDEX IF NOT EXISTS schedule_by_minute ON schedule (weekday, minute_of_day)",
+        """CREATE TABLE IF NOT EXISTS status_log (
+            id INTEGER PRIMARY KEY,
+            changed_at TEXT NOT NULL,
+            weekday INTEGER NOT NULL,
+            slot INTEGER NOT NULL,
+            status INTEGER
+        )""",
+        "CREATE INDEX IF NOT EXISTS status_log_by_slot ON status_log (weekday, slot, changed_at)",
+        """CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )""",
+    )
+
+    def __init__(self, data_dir, days, time_slots, name="hemsiremdata"):
+        self.data_dir = data_dir
+        self.days = days
+        self.time_slots = time_slots
+        self.path = os.path.join(data_dir, f"{name}.sqlite3")
+        self.backup_file = self.path + ".v1"
+        self.json_source = JournalStorage(data_dir, name)
+        self.schedule = Schedule()
+        self.migrated_statuses = []
+        self._pending = []
+        # Tamamlanan yazma işlemi (transaction) sayısı
+        self.writes = 0
+        self._conn = None
+
+    def _connect(self):
+        import sqlite3
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        legacy = conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION and conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schedule'").fetchone() is not None
+        if legacy:
+            # Dönüştürmeden önce eski veritabanının kopyası alınır
+            backup = sqlite3.connect(self.backup_file)
+            conn.backup(backup)
+            backup.close()
+        # Dönüştürme ve şema tek bir işlemde uygulanır; yarıda kalırsa eski veritabanı olduğu gibi kalır
+        with conn:
+            conn.execute("BEGIN")
+            if legacy:
+                self._migrate_v1(conn)
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return conn
+
+    def _migrate_v1(self, conn):
+        # Sürüm 1: saat metin, durum arayüzdeki adıyla, hafta "YYYY-MM-DD" olarak saklanıyordu
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(schedule)")]
+        week_column = "week" if "week" in columns else "NULL"
+        legacy = {}
+        for key, value in conn.execute("SELECT key, value FROM settings WHERE key NOT LIKE '\\_%' ESCAPE '\\'"):
+            try:
+                legacy[key] = json.loads(value)
+            except json.JSONDecodeError:
+                continue
+        for weekday, slot, time_str, status, week in conn.execute(
+                f"SELECT weekday, slot, time, status, {week_column} FROM schedule"):
+            if weekday < len(self.days) and slot < len(self.time_slots):
+                slot_data = {field: value for field, value in (('time', time_str), ('status', status), ('week', week))
+                             if value is not None}
+                legacy.setdefault(self.days[weekday], {})[self.time_slots[slot]] = slot_data
+        self.schedule = Schedule()
+        self.migrated_statuses = migrate_legacy(legacy, self._apply)
+
+        conn.execute("DROP INDEX IF EXISTS schedule_by_minute")
+        conn.execute("DROP TABLE schedule")
+        conn.execute("DELETE FROM settings WHERE key NOT LIKE '\\_%' ESCAPE '\\'")
+        conn.execute("DROP INDEX IF EXISTS status_log_by_slot")
+        conn.execute("ALTER TABLE status_log RENAME TO status_log_v1")
+        for statement in self.SCHEMA:
+            conn.execute(statement)
+        cases = " ".join(f"WHEN ? THEN {code}" for code in range(len(STATUS_LABELS)))
+        conn.execute("INSERT INTO status_log (id, changed_at, weekday, slot, status) SELECT id, changed_at, weekday, slot, "
+                     f"CASE status {cases} ELSE 0 END FROM status_log_v1", STATUS_LABELS)
+        conn.execute("DROP TABLE status_log_v1")
+        for sql, params in self._all_statements():
+            conn.execute(sql, params)
+        print(f"Bilgi: {self.path} yeni veri biçimine (sürüm {SCHEMA_VERSION}) dönüştürüldü; "
+              f"eski veritabanı {self.backup_file} olarak saklandı.")
+
+    def load(self):
+        if self._conn is None:
+            self._conn = self._connect()
+        if self._conn.execute("SELECT 1 FROM settings WHERE key = '_migrated'").fetchone() is None:
+            self.migrate_from_json()
+
+        settings = {}
+        for key, value in self._conn.execute("SELECT key, value FROM settings WHERE key NOT LIKE '\\_%' ESCAPE '\\'"):
+            try:
+                settings[key] = json.loads(value)
+            except json.JSONDecodeError:
+                continue
+        plan = WeeklyPlan()
+        plan.week = settings.pop(PLAN_WEEK_PATH[0], None) or 0
+        for weekday, slot, minute, status, week in self._conn.execute(
+                "SELECT weekday, slot, minute_of_day, status, week FROM schedule"):
+            if weekday >= DAY_COUNT or slot >= SLOT_COUNT:
+                continue
+            i = weekday * SLOT_COUNT + slot
+            if minute is not None:
+                plan.minutes[i] = minute
+            plan.statuses[i] = status or 0
+            plan.weeks[i] = week or 0
+        self.schedule = Schedule.from_state({"settings": settings})
+        self.schedule.plan = plan
+        self.schedule.subscribe(self.record)
+        return self.schedule
+
+    def migrate_from_json(self):
+        # Mevcut hemsiremdata.json (ve günlüğü) bir kez okunup tablolara aktarılır
+        source = self.json_source
+        if os.path.exists(source.snapshot_file) or os.path.exists(source.journal_file):
+            source.load()
+            source.close()
+            self.migrated_statuses = source.migrated_statuses
+        self.schedule = Schedule.from_state(source.snapshot())
+        self._pending.extend(self._all_statements())
+        self._pending.append(("INSERT OR REPLACE INTO settings (key, value) VALUES ('_migrated', ?)",
+                              (source.snapshot_file,)))
+        self.flush()
+        if os.path.exists(source.snapshot_file):
+            print(f"Bilgi: {source.snapshot_file} SQLite veritabanına aktarıldı.")
+
+    def _all_statements(self):
+        # Bellekteki ayarların ve çizelgenin tamamını yazan satırlar
+        plan = self.schedule.plan
+        for key, value in self.schedule.settings().items():
+            yield "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, json.dumps(value, ensure_ascii=False))
+        yield ("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (PLAN_WEEK_PATH[0], json.dumps(plan.week)))
+        for i, minute in enumerate(plan.minutes):
+            weekday, slot = divmod(i, SLOT_COUNT)
+            yield ("INSERT OR REPLACE INTO schedule (weekday, slot, minute_of_day, status, week) VALUES (?, ?, ?, ?, ?)",
+                   (weekday, slot, minute if minute >= 0 else None, plan.statuses[i], plan.weeks[i] or None))
+
+    def _apply(self, path, value):
+        self.schedule.apply(path, value, strict=False)
+
+    def record(self, changes):
+        # Schedule aboneliği: değişen satır(lar) bir sonraki flush'ta yazılır
+        for path, value in changes:
+            self._pending.extend(self._statements(path, value))
+
+    def _statements(self, path, value):
+        if is_slot_path(path):
+            weekday, slot, field = path
+            yield "INSERT OR IGNORE INTO schedule (weekday, slot) VALUES (?, ?)", (weekday, slot)
+            if field == STATUS_FIELD:
+                yield ("UPDATE schedule SET status = ?, week = ? WHERE weekday = ? AND slot = ?",
+                       (value, self.schedule.plan.week, weekday, slot))
+                yield ("INSERT INTO status_log (changed_at, weekday, slot, status) VALUES (datetime('now', 'localtime'), ?, ?, ?)",
+                       (weekday, slot, value))
+            elif field == WEEK_FIELD:
+                yield "UPDATE schedule SET week = ? WHERE weekday = ? AND slot = ?", (value, weekday, slot)
+            else:
+                minute = self.schedule.plan.minute(weekday, slot)
+                yield ("UPDATE schedule SET minute_of_day = ? WHERE weekday = ? AND slot = ?",
+                       (minute if minute >= 0 else None, weekday, slot))
+        elif path == PLAN_WEEK_PATH:
+            yield "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (path[0], json.dumps(value))
+        else:
+            # Çizelge dışı anahtarlar üst düzey değerin tamamıyla tek satırda saklanır
+            key = path[0]
+            yield ("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                   (key, json.dumps(self.schedule.get((key,)), ensure_ascii=False)))
+
+    def has_pending(self):
+        return bool(self._pending)
+
+    def flush(self):
+        # Bekleyen satır güncellemeleri tek bir işlemde (transaction) uygulanır
+        if not self._pending:
+            return
+        statements = self._pending
+        self._pending = []
+        with self._conn:
+            for sql, params in statements:
+                self._conn.execute(sql, params)
+        self.writes += 1
+        metrics.count("storage_writes", backend="sqlite")
+        metrics.count("rows_written", len(statements), backend="sqlite")
+
+    def close(self):
+        if self._conn is None:
+            return
+        self.flush()
+        self._conn.close()
+        self._conn = None
+
+
+STORAGE_BACKENDS = ("journal", "sqlite")
+
+
+def open_storage(data_dir, days, time_slots, backend=None):
+    # Depolama arka ucu HEMSIREM_STORAGE ortam değişkeniyle seçilir (journal | sqlite)
+    backend = (backend or os.environ.get("HEMSIREM_STORAGE") or "journal").lower()
+    if backend == "sqlite":
+        return SqliteStorage(data_dir, days, time_slots)
+    if backend != "journal":
+        print(f"Uyarı: Bilinmeyen depolama türü '{backend}'. Varsayılan (journal) kullanılıyor.")
+    return JournalStorage(data_dir)
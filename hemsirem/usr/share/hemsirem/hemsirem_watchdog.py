@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import threading
+import traceback
+from datetime import datetime
+from PyQt5.QtCore import QObject, QTimer, Qt
+
+from hemsirem_metrics import metrics
+
+# Ana iş parçacığındaki kalp atışı aralığı; gecikme beklenen ve gerçek atış arasındaki farktır
+HEARTBEAT_MS = 100
+# Bu süreden uzun gecikmeler takılma sayılır ve kaydedilir
+STALL_THRESHOLD_MS = 250
+# Bir takılma boyunca alınan en fazla yığın örneği
+MAX_STALL_SAMPLES = 5
+
+
+class EventLoopWatchdog(QObject):
+    """Qt olay döngüsünün takılmalarını ölçen bekçi.
+
+    Ana iş parçacığında HEARTBEAT_MS aralıklı bir zamanlayıcı çalışır; her
+    atışta beklenen ve gerçek zaman arasındaki fark (gecikme) ölçülür.
+    Yardımcı bir iş parçacığı son atıştan bu yana STALL_THRESHOLD_MS geçtiğini
+    görürse ana iş parçacığının Python yığınından örnek alır. Döngü yeniden
+    işlemeye başladığında takılma süresi ve örnekler günlüğe yazılır; böylece
+    alarmları hangi kodun geciktirdiği yavaş makinelerde de bulunabilir.
+    """
+
+    def __init__(self, log_path, threshold_ms=STALL_THRESHOLD_MS, parent=None):
+        super().__init__(parent)
+        self.log_path = log_path
+        self.threshold = threshold_ms / 1000
+        self.interval = HEARTBEAT_MS / 1000
+        self.stalls = 0
+        self.max_lag = 0.0
+        self._main_ident = threading.get_ident()
+        self._lock = threading.Lock()
+        self._samples = []
+        self._beat_at = time.monotonic()
+        self._stopped = threading.Event()
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.setInterval(HEARTBEAT_MS)
+        self._timer.timeout.connect(self._beat)
+        self._thread = threading.Thread(target=self._watch, name="hemsirem-watchdog", daemon=True)
+
+    def start(self):
+        self._beat_at = time.monotonic()
+        self._timer.start()
+        self._thread.start()
+
+    def stop(self):
+        self._timer.stop()
+        self._stopped.set()
+
+    def _beat(self):
+        now = time.monotonic()
+        with self._lock:
+            lag = now - self._beat_at - self.interval
+            self._beat_at = now
+            samples, self._samples = self._samples, []
+        lag = max(0.0, lag)
+        self.max_lag = max(self.max_lag, lag)
+        metrics.observe("event_loop_lag", lag)
+        if lag >= self.threshold:
+            self._report(lag, samples)
+
+    def _watch(self):
+        # Yardımcı iş parçacığı: takılma sürerken her eşik süresinde bir ana iş parçacığının yığınını örnekler
+        while not self._stopped.wait(self.threshold / 4):
+            with self._lock:
+                stalled = time.monotonic() - self._beat_at - self.interval
+                last_sample = self._samples[-1][0] if self._samples else 0.0
+                if (stalled < self.threshold or len(self._samples) >= MAX_STALL_SAMPLES
+                        or stalled - last_sample < self.threshold):
+                    continue
+            frame = sys._current_frames().get(self._main_ident)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+            with self._lock:
+                self._samples.append((stalled, stack))
+
+    def _report(self, lag, samples):
+        self.stalls += 1
+        metrics.count("event_loop_stalls")
+        lines = [f"# {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} pid={os.getpid()} "
+                 f"olay döngüsü {lag * 1000:.0f} ms takıldı (eşik {self.threshold * 1000:.0f} ms)"]
+        previous = None
+        for stalled, stack in samples:
+            if stack == previous:
+                lines.append(f"--- {stalled * 1000:.0f} ms: aynı yığın")
+                continue
+            previous = stack
+            lines.append(f"--- {stalled * 1000:.0f} ms:")
+            lines.append(stack.rstrip())
+        try:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n\n")
+        except OSError as e:
+            print(f"Hata: Takılma günlüğü yazılamadı: {e}")
+            return
+        print(f"Uyarı: Olay döngüsü {lag * 1000:.0f} ms takıldı; ayrıntılar {self.log_path} dosyasında.")
+
+
+def start_watchdog(data_dir, parent=None, setting=None):
+    # HEMSIREM_WATCHDOG "1" ise günlük veri dizinindeki stalls.log dosyasına, bir dosya yolu ise o dosyaya yazılır;
+    # ayarlı değilse bekçi hiç oluşturulmaz (ek zamanlayıcı ve iş parçacığı yok)
+    setting = setting if setting is not None else os.environ.get("HEMSIREM_WATCHDOG", "")
+    if setting in ("", "0"):
+        return None
+    log_path = os.path.join(data_dir, "stalls.log") if setting in ("1", "true", "yes") else os.path.expanduser(setting)
+    watchdog = EventLoopWatchdog(log_path, parent=parent)
+    watchdog.start()
+    print(f"Bilgi: Olay döngüsü bekçisi çalışıyor; takılmalar {log_path} dosyasına yazılıyor.")
+    return watchdog
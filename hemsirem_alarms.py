@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import time
+from collections import deque
+
+# Onaylanmış alarmlardan hata ayıklama için saklanan en fazla kayıt
+ACKNOWLEDGED_HISTORY = 50
+
+
+def alarm_key(alarm):
+    # Aynı zaman dilimi (veya aynı hastanın randevusu) için gelen alarmlar aynı anahtarı paylaşır
+    if alarm.get("type") == "appointment":
+        return ("appointment", alarm.get("patient"))
+    if alarm.get("type") == "missed":
+        return ("missed",)
+    if alarm.get("type") == "batch":
+        return ("batch", alarm.get("deadline"))
+    if alarm.get("recurrence") is not None:
+        # Tekrar kuralının anahtarı kuralın kendisidir; listedeki sırası değişse de aynı kalır
+        return ("recurrence", alarm.get("patient"), alarm.get("recurrence"))
+    return (alarm.get("type"), alarm.get("patient"), alarm.get("day"), alarm.get("time_slot"))
+
+
+class PendingAlarm:
+    """Kuyruktaki tek bir alarm ve onay durumu."""
+
+    __slots__ = ("key", "alarm", "count", "received_at", "acknowledged_at")
+
+    def __init__(self, key, alarm, received_at):
+        self.key = key
+        self.alarm = alarm
+        self.count = 1
+        self.received_at = received_at
+        self.acknowledged_at = None
+
+    @property
+    def acknowledged(self):
+        return self.acknowledged_at is not None
+
+
+class AlarmQueue:
+    """Gösterilmeyi ya da onaylanmayı bekleyen alarmlar.
+
+    Alarmlar engellemeden kuyruğa alınır; kullanıcı bir alarmı onaylayana
+    kadar aynı anahtarla gelen yeni alarmlar ayrı bir pencere açmak yerine
+    bekleyen alarmla birleştirilir (count artar, yük güncellenir).
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._pending = {}
+        self.acknowledged = deque(maxlen=ACKNOWLEDGED_HISTORY)
+
+    def push(self, alarm):
+        # (bekleyen alarm, yeni mi) döndürür
+        key = alarm_key(alarm)
+        pending = self._pending.get(key)
+        if pending is not None:
+            if alarm.get("type") == "missed":
+                # Onaylanmamış özete yeni kaçırılan dozlar eklenir
+                alarm = dict(alarm, missed=pending.alarm.get("missed", []) + alarm.get("missed", []))
+            pending.alarm = alarm
+            pending.count += 1
+            return pending, False
+        pending = PendingAlarm(key, alarm, self.clock())
+        self._pending[key] = pending
+        return pending, True
+
+    def acknowledge(self, key):
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            pending.acknowledged_at = self.clock()
+            self.acknowledged.append(pending)
+        return pending
+
+    def get(self, key):
+        return self._pending.get(key)
+
+    def pending(self):
+        return list(self._pending.values())
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __bool__(self):
+        return bool(self._pending)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+
+import time
+from PyQt5.QtCore import QObject, QTimer, QBuffer, QByteArray, QIODevice, QUrl
+
+# Alarm türü -> ses dosyası
+ALARM_SOUNDS = {"medication": "alarm.mp3", "appointment": "alarm1.mp3"}
+# Ses kısıktan başlayıp bu sürede ALARM_VOLUME düzeyine çıkar
+VOLUME_RAMP_MS = 5000
+VOLUME_RAMP_STEP_MS = 100
+VOLUME_RAMP_START = 0.2
+ALARM_VOLUME = 0.5
+# Alarm anından ilk duyulan örneğe kadar hedeflenen en uzun süre
+LATENCY_TARGET_MS = 100
+
+
+def _multimedia():
+    # QtMultimedia yalnızca ses gerektiğinde yüklenir; yüklenemezse None
+    try:
+        from PyQt5 import QtMultimedia
+    except ImportError as e:
+        print(f"Uyarı: Ses altyapısı yüklenemedi ({e}). Alarmlar sessiz gösterilecek.")
+        return None
+    return QtMultimedia
+
+
+class AlarmAudio(QObject):
+    """Alarm seslerini önceden PCM'e çözüp düşük gecikmeyle çalan ses motoru.
+
+    preload() her alarm türünün sesini QAudioDecoder ile bir kez çözer ve
+    bellekte tutar; çalma QAudioOutput ile bellekteki tampondan yapılır, yani
+    alarm anında dosya açılmaz ve çözme yapılmaz. Ses kısık başlar ve
+    VOLUME_RAMP_MS içinde yükselir. Çözme bitmemişse ya da başarısız olduysa
+    eski yol (QMediaPlayer ile dosyadan çalma) kullanılır.
+    Alarm anından (deadline) ilk örneğin çalınmasına kadar geçen süre
+    last_latency_ms içinde tutulur.
+    """
+
+    def __init__(self, resources, parent=None):
+        super().__init__(parent)
+        self.resources = resources
+        self._qtm = None
+        self._loaded = False
+        self._decoders = {}
+        self._pcm = {} # alarm türü -> (QAudioFormat, bytes)
+        self._output = None
+        self._output_format = None
+        self._buffer = None
+        self._player = None
+        self._deadline = None
+        self._volume = VOLUME_RAMP_START
+        self.last_latency_ms = None
+
+        self._ramp_timer = QTimer(self)
+        self._ramp_timer.setInterval(VOLUME_RAMP_STEP_MS)
+        self._ramp_timer.timeout.connect(self._ramp_volume)
+
+    def _load_multimedia(self):
+        if not self._loaded:
+            self._loaded = True
+            self._qtm = _multimedia()
+        return self._qtm
+
+    def preload(self):
+        # Açılıştan sonra (boşta) çağrılır; çözme olay döngüsünde, arayüzü bekletmeden sürer
+        qtm = self._load_multimedia()
+        if qtm is None:
+            return
+        for alarm_type, filename in ALARM_SOUNDS.items():
+            if alarm_type in self._pcm or alarm_type in self._decoders:
+                continue
+            sound_path = self.resources.path(filename)
+            if sound_path is None:
+                continue
+            decoder = qtm.QAudioDecoder(self)
+            decoder.setAudioFormat(self._pcm_format(qtm))
+            decoder.setSourceFilename(sound_path)
+            chunks = []
+            decoder.bufferReady.connect(lambda d=decoder, c=chunks: self._on_buffer_ready(d, c))
+            decoder.finished.connect(lambda t=alarm_type, d=decoder, c=chunks: self._on_decoded(t, d, c))
+            decoder.error.connect(lambda error, t=alarm_type, d=decoder: self._on_decode_error(t, d))
+            self._decoders[alarm_type] = decoder
+            decoder.start()
+
+    def _pcm_format(self, qtm):
+        audio_format = qtm.QAudioFormat()
+        audio_format.setCodec("audio/pcm")
+        audio_format.setSampleRate(44100)
+        audio_format.setChannelCount(2)
+        audio_format.setSampleSize(16)
+        audio_format.setSampleType(qtm.QAudioFormat.SignedInt)
+        audio_format.setByteOrder(qtm.QAudioFormat.LittleEndian)
+        return audio_format
+
+    def _on_buffer_ready(self, decoder, chunks):
+        buffer = decoder.read()
+        if buffer.isValid():
+            chunks.append(buffer.constData().asstring(buffer.byteCount()))
+
+    def _on_decoded(self, alarm_type, decoder, chunks):
+        self._decoders.pop(alarm_type, None)
+        self._pcm[alarm_type] = (decoder.audioFormat(), b"".join(chunks))
+        decoder.deleteLater()
+
+    def _on_decode_error(self, alarm_type, decoder):
+        print(f"Uyarı: {ALARM_SOUNDS[alarm_type]} çözülemedi ({decoder.errorString()}). Dosyadan çalınacak.")
+        self._decoders.pop(alarm_type, None)
+        decoder.deleteLater()
+
+    def is_playing(self):
+        if self._output is not None and self._output.state() == self._qtm.QAudio.ActiveState:
+            return True
+        return self._player is not None and self._player.state() == self._qtm.QMediaPlayer.PlayingState
+
+    def play(self, alarm_type, deadline=None):
+        # deadline: alarmın zamanlandığı an (epoch saniye); gecikme ölçümü için
+        qtm = self._load_multimedia()
+        if qtm is None:
+            return False
+        if self.is_playing():
+            return True
+        self._deadline = deadline if deadline is not None else time.time()
+        self.last_latency_ms = None
+        if alarm_type not in ALARM_SOUNDS:
+            alarm_type = "medication"
+
+        pcm = self._pcm.get(alarm_type)
+        if pcm is not None:
+            self._play_pcm(qtm, *pcm)
+        elif self._play_file(qtm, alarm_type):
+            # Çözülmüş ses henüz yoksa sonraki alarmlar için hazırlanır
+            self.preload()
+        else:
+            return False
+
+        self._volume = VOLUME_RAMP_START
+        self._apply_volume()
+        self._ramp_timer.start()
+        return True
+
+    def _play_pcm(self, qtm, audio_format, data):
+        if self._output is None or self._output_format != audio_format:
+            if self._output is not None:
+                self._output.stop()
+                self._output.deleteLater()
+            self._output = qtm.QAudioOutput(audio_format, self)
+            self._output.stateChanged.connect(self._on_output_state_changed)
+            self._output_format = audio_format
+        else:
+            self._output.stop()
+        self._buffer = QBuffer(self)
+        self._buffer.setData(QByteArray(data))
+        self._buffer.open(QIODevice.ReadOnly)
+        self._output.start(self._buffer)
+
+    def _play_file(self, qtm, alarm_type):
+        sound_path = self.resources.path(ALARM_SOUNDS[alarm_type])
+        if sound_path is None:
+            print(f"Uyarı: {ALARM_SOUNDS[alarm_type]} bulunamadı. Alarm sesi çalınamıyor.")
+            return False
+        if self._player is None:
+            self._player = qtm.QMediaPlayer(self)
+            self._player.stateChanged.connect(self._on_player_state_changed)
+        self._player.setMedia(qtm.QMediaContent(QUrl.fromLocalFile(sound_path)))
+        self._player.play()
+        return True
+
+    def _on_output_state_changed(self, state):
+        if state == self._qtm.QAudio.ActiveState:
+            self._record_latency()
+
+    def _on_player_state_changed(self, state):
+        if state == self._qtm.QMediaPlayer.PlayingState:
+            self._record_latency()
+
+    def _record_latency(self):
+        if self._deadline is None or self.last_latency_ms is not None:
+            return
+        self.last_latency_ms = (time.time() - self._deadline) * 1000
+        if self.last_latency_ms > LATENCY_TARGET_MS:
+            print(f"Uyarı: Alarm sesi {self.last_latency_ms:.0f} ms gecikmeyle başladı (hedef {LATENCY_TARGET_MS} ms).")
+        else:
+            print(f"Bilgi: Alarm sesi {self.last_latency_ms:.0f} ms gecikmeyle başladı.")
+
+    def _ramp_volume(self):
+        self._volume = min(1.0, self._volume + (1.0 - VOLUME_RAMP_START) * VOLUME_RAMP_STEP_MS / VOLUME_RAMP_MS)
+        self._apply_volume()
+        if self._volume >= 1.0:
+            self._ramp_timer.stop()
+
+    def _apply_volume(self):
+        volume = self._volume * ALARM_VOLUME
+        if self._output is not None:
+            self._output.setVolume(volume)
+        if self._player is not None:
+            self._player.setVolume(int(volume * 100))
+
+    def stop(self):
+        self._ramp_timer.stop()
+        if self._output is not None:
+            self._output.stop()
+        if self._player is not None:
+            self._player.stop()
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import fcntl
+from functools import partial
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+from hemsirem_schedule import AlarmScheduler, TimingWheel, MINUTES_PER_WEEK, minute_of_week, next_occurrence
+from hemsirem_plan import (DAYS, TIME_SLOTS, TIME_FIELD, STATUS_FIELD, PLAN_WEEK_PATH, NO_TIME, Status,
+                           is_slot_path, day_from_number, week_number)
+from hemsirem_patients import PatientRegistry, default_data_dir
+from hemsirem_profile import profiler
+from hemsirem_metrics import metrics
+
+# Kayıtlar bellekte biriktirilir; son değişiklikten bu kadar süre sonra diske yazılır
+SAVE_QUIET_PERIOD_MS = 1500
+# Sürekli düzenleme yapılsa bile kayıt en geç bu kadar süre ertelenir
+SAVE_MAX_DELAY_MS = 10000
+# Alarm zamanlayıcısı en fazla bu kadar uyur; saat ayarı değişse bile sıradaki alarm yeniden hesaplanır
+ALARM_MAX_SLEEP_MS = 60 * 60 * 1000
+# Bundan daha geç fark edilen alarm anı kaçırılmış sayılır
+ALARM_GRACE_SECONDS = 60
+# Veri dizinine tek yazar: motoru açan süreç (servis ya da süreç içi arayüz) bu dosyayı kilitler
+LOCK_FILE_NAME = "hemsirem.lock"
+
+
+class DataDirLocked(RuntimeError):
+    """Veri dizini başka bir Hemşirem süreci (servis ya da arayüz) tarafından kullanılıyor."""
+
+
+def lock_data_dir(data_dir):
+    # Kilit dosyası üzerinde özel ve beklemesiz flock; süreç çökse bile çekirdek kilidi bırakır.
+    # İki süreç aynı günlüğe ekleme yapıp birbirinin altından sıkıştırma yapmasın diye motor açılırken alınır.
+    lock_file = open(os.path.join(data_dir, LOCK_FILE_NAME), 'a+', encoding='utf-8')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.seek(0)
+        owner = lock_file.read().strip()
+        lock_file.close()
+        raise DataDirLocked(f"{data_dir} başka bir Hemşirem süreci tarafından kullanılıyor"
+                            + (f" (PID {owner})" if owner else "")) from None
+    # Kilidi tutan sürecin kimliği yalnızca bilgi içindir
+    lock_file.truncate(0)
+    lock_file.write(f"{os.getpid()}\n")
+    lock_file.flush()
+    return lock_file
+
+
+class AlarmEngine(QObject):
+    """Veri dosyalarının ve alarm çizelgesinin sahibi; yalnızca QtCore kullanır.
+
+    Arayüz (HemşiremApp) veya arka plan servisi (hemsirem_daemon) bu sınıfı
+    kullanır. Zamanı gelen alarmlar 'alarm' sinyaliyle, JSON'a çevrilebilir bir
+    sözlük olarak yayınlanır; böylece aynı yük yerel soket üzerinden de
+    gönderilebilir.
+    """
+
+    remote = False
+
+    alarm = pyqtSignal(object)
+    # (hasta kimliği, anahtar yolu, değer) — her veri değişikliğinde
+    changed = pyqtSignal(str, object, object)
+    # (hasta kimliği, [[anahtar yolu, değer], ...]) — toplu güncellemede bir kez
+    changed_batch = pyqtSignal(str, object)
+    patient_added = pyqtSignal(str)
+    weekly_reset = pyqtSignal(str)
+
+    def __init__(self, data_dir=None, parent=None, clock=None):
+        super().__init__(parent)
+        # Saat dışarıdan verilebilir (ör. ileri atlayan sahte bir saatle deneme için)
+        self.clock = clock or datetime.now
+        self.data_dir = data_dir or default_data_dir()
+        os.makedirs(self.data_dir, exist_ok=True)
+        # Dosyalar açılmadan önce; dizin başka bir süreçteyse DataDirLocked
+        self._lock_file = lock_data_dir(self.data_dir)
+        self.days = DAYS
+        self.time_slots = TIME_SLOTS
+
+        # Gecikmeli (write-behind) kayıt zamanlayıcısı
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.timeout.connect(self.flush)
+        self._dirty_since = None
+        # engine.batch içindeki değişiklikler (tek bir değişiklik de olsa) changed_batch ile bildirilir
+        self._batching = 0
+
+        # Hasta profilleri: her hastanın kendi veri dosyası ve çizelgesi vardır
+        self.patient_registry = PatientRegistry(self.data_dir)
+        self.patients = {}
+        for patient_info in self.patient_registry.load():
+            patient = self.patient_registry.open(patient_info, self.days, self.time_slots)
+            with profiler.phase("load_medications"):
+                self.load_medications(patient)
+            self.patients[patient.id] = patient
+
+        with profiler.phase("check_and_reset_weekly"):
+            for patient in self.patients.values():
+                self.check_and_reset_weekly(patient)
+        self._last_reset_check = self.clock().date()
+
+        with profiler.phase("alarm_schedule"):
+            self.setup_alarm_timer()
+
+    @property
+    def active_id(self):
+        return self.patient_registry.active_id
+
+    def set_active(self, patient_id):
+        if patient_id in self.patients and patient_id != self.patient_registry.active_id:
+            self.patient_registry.active_id = patient_id
+            self.patient_registry.save()
+
+    def add_patient(self, name):
+        patient = self.patient_registry.open(self.patient_registry.add(name), self.days, self.time_slots)
+        self.load_medications(patient)
+        self.patients[patient.id] = patient
+        self.check_and_reset_weekly(patient)
+        self.compile_patient_schedule(patient)
+        self.arm_alarm_timer()
+        self.patient_added.emit(patient.id)
+        return patient
+
+    @metrics.timed("load_medications")
+    def load_medications(self, patient):
+        # Seçilen arka uç (günlük veya SQLite) verinin tamamını Schedule olarak döndürür;
+        # motor depolamadan sonra abone olur, böylece değişiklik kaydedildikten sonra işlenir
+        schedule = patient.load()
+        schedule.subscribe(partial(self._on_schedule_changed, patient))
+        return schedule
+
+    def set_value(self, patient_id, path, value):
+        # Çizelge yolları (gün sırası, zaman dilimi sırası, TIME_FIELD | STATUS_FIELD), değerler dakika veya
+        # Status kodudur. Değer Schedule tarafından doğrulanır; geçersizse ValueError.
+        return self.patients[patient_id].schedule.set(path, value)
+
+    @contextmanager
+    def batch(self, patient_id):
+        # with engine.batch(hasta): ... — içerideki set_value çağrıları tek kayıt, tek alarm güncellemesi ve
+        # tek changed_batch sinyaliyle uygulanır; blok hatayla biterse hiçbiri uygulanmaz
+        self._batching += 1
+        try:
+            with self.patients[patient_id].schedule.batch():
+                yield
+        finally:
+            self._batching -= 1
+
+    def _on_schedule_changed(self, patient, changes):
+        # Her düzenleme (veya toplu güncelleme) günlüğe tek bir kayıt olarak eklenir (depolama aboneliği)
+        self.save_medications()
+
+        # Alarm çizelgesi yalnızca etkilenen girdiler için güncellenir; birden çok saat birlikte
+        # değiştiyse (ör. şablonun günlere kopyalanması) dizin bir kez yeniden derlenir
+        times = [path for path, _ in changes if is_slot_path(path) and path[2] == TIME_FIELD]
+        if len(times) > 1:
+            patient.schedule_index.compile(patient.schedule)
+        elif times:
+            day, slot, _ = times[0]
+            patient.schedule_index.update(day, slot, patient.schedule.plan.minute(day, slot))
+        rearm = bool(times)
+        for path, value in changes:
+            if is_slot_path(path) and path[2] == STATUS_FIELD:
+                # Durum geçmişe de eklenir; haftalık sıfırlama geçmişi silmez
+                slot_date = day_from_number(patient.schedule.plan.week) + timedelta(days=path[0])
+                patient.history.append(slot_date, path[1], value, self.clock().timestamp())
+            elif path[0] == "appointment_data":
+                self.schedule_appointment_alarm(patient, arm=False)
+                rearm = True
+            elif path[0] == "recurrences":
+                self.schedule_recurrence_alarms(patient, arm=False)
+                rearm = True
+        if rearm:
+            self.arm_alarm_timer()
+        if len(changes) == 1 and not self._batching:
+            (path, value), = changes
+            self.changed.emit(patient.id, list(path), value)
+        else:
+            self.changed_batch.emit(patient.id, [[list(path), value] for path, value in changes])
+
+    @metrics.timed("save_medications")
+    def save_medications(self):
+        # Değişiklik yalnızca bellekte işaretlenir; dosya sessiz bir aralıktan sonra tek seferde yazılır
+        now = time.monotonic()
+        if self._dirty_since is None:
+            self._dirty_since = now
+        remaining_ms = SAVE_MAX_DELAY_MS - int((now - self._dirty_since) * 1000)
+        self._save_timer.start(max(0, min(SAVE_QUIET_PERIOD_MS, remaining_ms)))
+
+    @metrics.timed("flush")
+    def flush(self):
+        # Bekleyen değişiklikleri hemen diske yazar (çıkışta, alarmda ve zamanlayıcı dolduğunda)
+        self._save_timer.stop()
+        if self._dirty_since is None:
+            return
+        self._dirty_since = None
+        for patient in self.patients.values():
+            patient.storage.flush()
+            patient.history.flush()
+
+    def close(self):
+        # Çıkışta bekleyen kayıtları yaz ve arka plandaki sıkıştırmanın bitmesini bekle
+        self._save_timer.stop()
+        self._dirty_since = None
+        for patient in self.patients.values():
+            patient.storage.close()
+            patient.history.close()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def check_and_reset_weekly(self, patient):
+        # Sıfırlama yalnızca güncel hafta işaretçisini ilerletir; önceki haftanın durumları geçersiz sayılır
+        current_week = week_number(self.clock().date())
+        if not patient.schedule.plan.week:
+            self.set_value(patient.id, PLAN_WEEK_PATH, current_week)
+            print("İlk çalıştırma: Haftalık sıfırlama başlangıç tarihi ayarlandı.")
+        elif patient.schedule.plan.week != current_week:
+            print("Haftalık sıfırlama yapılıyor...")
+            if patient.schedule.plan.week < current_week:
+                self.record_unmarked_doses(patient)
+            self.set_value(patient.id, PLAN_WEEK_PATH, current_week)
+            self.weekly_reset.emit(patient.id)
+
+    def record_unmarked_doses(self, patient):
+        # Biten haftada saati olan ama işaretlenmemiş dozlar geçmişe "Bilinmiyor" olarak eklenir; geçmiş yalnızca
+        # tıklanan durumları içerdiğinden rapor bunları aksi halde hiç saymaz
+        plan = patient.schedule.plan
+        monday = day_from_number(plan.week)
+        changed_at = self.clock().timestamp()
+        for day in range(len(self.days)):
+            for slot in range(len(self.time_slots)):
+                if plan.minute(day, slot) != NO_TIME and plan.status(day, slot) == Status.UNKNOWN:
+                    patient.history.append(monday + timedelta(days=day), slot, Status.UNKNOWN, changed_at)
+
+    def setup_alarm_timer(self):
+        # Saniyede bir yoklamak yerine yalnızca sıradaki alarm anı için tek atımlık zamanlayıcı kurulur.
+        # İlaç alarmları tüm hastalar için ortak zamanlama çarkında, randevular ve tekrar kuralları yığında tutulur.
+        self.alarm_wheel = TimingWheel()
+        self.alarm_scheduler = AlarmScheduler()
+        self._fired_alarms = {} # Aynı randevu hatırlatmasının yeniden zamanlanıp tekrar çalmasını önler
+        self._recurrence_keys = {} # hasta -> yığındaki tekrar kurallarının anahtarları (silinen kurallar için)
+        # İçinde bulunulan dakika da değerlendirilsin diye bir önceki dakikadan başlanır
+        self._last_evaluated_minute = self.clock().replace(second=0, microsecond=0) - timedelta(minutes=1)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.check_for_alarms)
+
+        self.rebuild_alarm_schedule()
+
+    def _alarm_search_start(self):
+        # İçinde bulunulan dakikaya denk gelen alarmlar da kaçırılmasın diye dakika başının hemen öncesi
+        return self.clock().replace(second=0, microsecond=0) - timedelta(microseconds=1)
+
+    def rebuild_alarm_schedule(self):
+        self.alarm_wheel.clear()
+        self.alarm_scheduler.clear()
+        self._recurrence_keys.clear()
+        after = self._alarm_search_start()
+        for patient in self.patients.values():
+            self.compile_patient_schedule(patient, after)
+        self.arm_alarm_timer()
+
+    def compile_patient_schedule(self, patient, after=None):
+        patient.schedule_index.wheel = self.alarm_wheel
+        patient.schedule_index.compile(patient.schedule)
+        if os.environ.get("HEMSIREM_DEBUG_SCHEDULE"):
+            print(f"[{patient.name}]\n{patient.schedule_index.dump()}")
+        self.schedule_appointment_alarm(patient, after, arm=False)
+        self.schedule_recurrence_alarms(patient, after, arm=False)
+
+    def schedule_appointment_alarm(self, patient, after=None, arm=True):
+        if after is None:
+            after = self._alarm_search_start()
+        key = ("appointment", patient.id)
+        # Sadece hem gerçek randevu bilgileri hem de hatırlatma bilgileri geçerliyse zamanla
+        when = patient.schedule.appointment.reminder_at
+        if when is not None:
+            # Geçmişteki veya zaten çalmış bir hatırlatma tekrar zamanlanmaz
+            if when <= after or self._fired_alarms.get(key) == when:
+                when = None
+        self.alarm_scheduler.schedule(key, when)
+        if arm:
+            self.arm_alarm_timer()
+
+    def schedule_recurrence_alarms(self, patient, after=None, arm=True):
+        # Her kuralın yalnızca sıradaki tekrarı yığına konur; çaldığında bir sonraki hesaplanır
+        if after is None:
+            after = self._alarm_search_start()
+        # Anahtar kuralın sırası değil kendisidir; önceki bir kural silinince bekleyen alarm başka ilaca kaymaz
+        keys = {recurrence.key: recurrence for recurrence in patient.schedule.recurrences}
+        for key in self._recurrence_keys.get(patient.id, set()) - keys.keys():
+            self.alarm_scheduler.schedule(("recurrence", patient.id, key), None)
+        self._recurrence_keys[patient.id] = set(keys)
+        for key, recurrence in keys.items():
+            self.alarm_scheduler.schedule(("recurrence", patient.id, key), recurrence.next_after(after))
+        if arm:
+            self.arm_alarm_timer()
+
+    def arm_alarm_timer(self):
+        deadlines = []
+        appointment_deadline = self.alarm_scheduler.next_deadline()
+        if appointment_deadline is not None:
+            deadlines.append(appointment_deadline)
+
+        start = self._last_evaluated_minute + timedelta(minutes=1)
+        next_minute = self.alarm_wheel.next_due_minute(minute_of_week(start))
+        if next_minute is not None:
+            deadlines.append(next_occurrence(next_minute, start - timedelta(microseconds=1)))
+
+        delay_ms = ALARM_MAX_SLEEP_MS
+        if deadlines:
+            delay_ms = int((min(deadlines) - self.clock()).total_seconds() * 1000)
+            delay_ms = max(0, min(ALARM_MAX_SLEEP_MS, delay_ms))
+        self.timer.start(delay_ms)
+
+    def _alarm_payload(self, alarm_type, patient, when, entry=None, days_left=None, recurrence=None, missed_count=1):
+        # Alarm penceresinin ihtiyaç duyduğu her şey; soket üzerinden JSON olarak da gönderilir.
+        # recurrence: tekrar kuralı; gün olarak haftanın günü, zaman dilimi olarak kuralın açıklaması gösterilir.
+        # missed_count: uyku boyunca kaçırılan tekrar sayısı (yük en sonuncusunu anlatır)
+        if recurrence is not None:
+            return dict(self._alarm_payload(alarm_type, patient, when, days_left=days_left),
+                        day=self.days[when.weekday()], time_slot=recurrence.describe(),
+                        medications=recurrence.medication, recurrence=recurrence.key, missed_count=missed_count)
+        return {
+            "type": alarm_type,
+            "patient": patient.id,
+            "patient_name": patient.name,
+            "multi_patient": len(self.patients) > 1,
+            "time": when.strftime("%H:%M"),
+            "date": when.strftime("%d.%m.%Y"),
+            "deadline": when.timestamp(),
+            # Alarm penceresi için gün ve zaman dilimi adları
+            "day": self.days[entry.day] if entry is not None else None,
+            "time_slot": self.time_slots[entry.slot] if entry is not None else None,
+            "medications": entry.medications if entry is not None else "",
+            "days_left": days_left,
+            "appointment_data": patient.schedule.appointment.to_dict(),
+        }
+
+    def _due_between(self, after, until):
+        # (after, until] aralığındaki dakikalarda çalması gereken girdiler, (an, girdi) çiftleri olarak.
+        # Çarkta yalnızca dolu dakikalar ziyaret edilir; bir haftadan uzun aralıklarda her girdi bir kez sayılır.
+        found = []
+        cursor = max(after, until - timedelta(days=7))
+        while cursor < until:
+            start = cursor + timedelta(minutes=1)
+            week_minute = minute_of_week(start)
+            next_minute = self.alarm_wheel.next_due_minute(week_minute)
+            if next_minute is None:
+                break
+            moment = start + timedelta(minutes=(next_minute - week_minute) % MINUTES_PER_WEEK)
+            if moment > until:
+                break
+            found.extend((moment, entry) for entry in self.alarm_wheel.due(next_minute))
+            cursor = moment
+        return found
+
+    @metrics.timed("check_for_alarms")
+    def check_for_alarms(self):
+        now = self.clock()
+        minute_start = now.replace(second=0, microsecond=0)
+
+        if minute_start < self._last_evaluated_minute:
+            # Saat geri alındı; bundan sonraki dakikalar yeniden değerlendirilir
+            self._last_evaluated_minute = minute_start - timedelta(minutes=1)
+
+        # Son değerlendirilen dakikadan bu yana geçen aralığın tamamı değerlendirilir. Bilgisayar uykudaysa,
+        # saat ileri atladıysa veya olay döngüsü durduysa arada kalan alarmlar kaçırılmış sayılır.
+        due_entries = []
+        missed_entries = []
+        if minute_start > self._last_evaluated_minute:
+            for moment, entry in self._due_between(self._last_evaluated_minute, minute_start):
+                if (now - moment).total_seconds() < ALARM_GRACE_SECONDS:
+                    due_entries.append(entry)
+                else:
+                    missed_entries.append((moment, entry))
+            self._last_evaluated_minute = minute_start
+
+        # Geçen haftadan kalan kaçırılmış dozların durumu haftalık sıfırlamadan önce okunur
+        monday = datetime.combine(now.date() - timedelta(days=now.weekday()), datetime.min.time())
+        missed = [(moment, entry) for moment, entry in missed_entries
+                  if moment < monday and entry.status != Status.TAKEN]
+
+        # Servis günlerce açık kalabilir; gün değiştiğinde haftalık sıfırlama da denetlenir
+        if self._last_reset_check != now.date():
+            self._last_reset_check = now.date()
+            for patient in list(self.patients.values()):
+                self.check_and_reset_weekly(patient)
+
+        missed.extend((moment, entry) for moment, entry in missed_entries
+                      if moment >= monday and entry.status != Status.TAKEN)
+
+        # Alarmlar tetiklenmeden önce sıradaki tekrarlar zamanlanır; böylece çizelge tutarlı kalır
+        due_appointments = self.alarm_scheduler.pop_due(now)
+        due_recurrences = []
+        for key, when in due_appointments:
+            if key[0] == "recurrence":
+                # Uzun bir uykudan sonra aradaki tekrarların her biri ayrı bildirilmez: en sonuncusu ve
+                # kaç tekrarın geçtiği bildirilir, sıradaki tekrar ondan sonra aranır
+                recurrence = next((r for r in self.patients[key[1]].schedule.recurrences if r.key == key[2]), None)
+                if recurrence is None:
+                    continue
+                moments = [when]
+                for moment in recurrence.occurrences(when):
+                    if moment > now:
+                        break
+                    moments.append(moment)
+                due_recurrences.append((self.patients[key[1]], recurrence, moments))
+                self.alarm_scheduler.schedule(key, recurrence.next_after(moments[-1]))
+                continue
+            self._fired_alarms[key] = when
+            self.schedule_appointment_alarm(self.patients[key[1]], when, arm=False)
+        self.arm_alarm_timer()
+
+        # Aynı anda çalması gereken tüm alarmlar (tüm hastalar, tüm zaman dilimleri, randevular) tek bir
+        # bildirimde toplanır; biri diğerini bastırmaz
+        alarms = []
+        missed_items = []
+        for key, when in due_appointments:
+            if key[0] == "recurrence":
+                continue
+            # --- Doktor Randevusu Alarmı ---
+            patient = self.patients[key[1]]
+            appointment_date_py = patient.schedule.appointment.appointment_date
+            if appointment_date_py is None:
+                continue
+            # Gerçek randevuya kaç gün kaldığını hesapla
+            days_until_actual_appointment = (appointment_date_py - when.date()).days
+
+            # Aynı hatırlatma için tekrar tetiklemeyi önle
+            when_str = when.strftime("%Y-%m-%d %H:%M")
+            if patient.schedule.extras.get("appointment_reminder_last_triggered_datetime", "") == when_str:
+                continue
+            self.set_value(patient.id, ("appointment_reminder_last_triggered_datetime",), when_str)
+            payload = self._alarm_payload("appointment", patient, when, days_left=days_until_actual_appointment)
+            if (now - when).total_seconds() >= ALARM_GRACE_SECONDS:
+                # Bilgisayar uykudaydı veya olay döngüsü durmuştu; hatırlatma özet olarak bildirilir
+                missed_items.append(payload)
+                continue
+            alarms.append(payload)
+
+        # --- Tekrar kuralıyla verilen ilaçlar: zamanı gelen tekrar çalar, öncekiler tek satırda özetlenir ---
+        for patient, recurrence, moments in due_recurrences:
+            if (now - moments[-1]).total_seconds() < ALARM_GRACE_SECONDS:
+                alarms.append(self._alarm_payload("medication", patient, moments[-1], recurrence=recurrence))
+                moments.pop()
+            if moments:
+                missed_items.append(self._alarm_payload("medication", patient, moments[-1], recurrence=recurrence,
+                                                        missed_count=len(moments)))
+
+        # --- İlaç Alarmları (hasta sırası, gün içi sırası) ---
+        patient_rank = {patient_id: rank for rank, patient_id in enumerate(self.patients)}
+        for entry in sorted(due_entries, key=lambda e: (patient_rank[e.owner.id], e.slot)):
+            if entry.status != Status.TAKEN: # Sadece 'İçtim' durumunda değilse tetikle
+                alarms.append(self._alarm_payload("medication", entry.owner, minute_start, entry=entry))
+
+        # --- Kaçırılan dozlar ---
+        for moment, entry in missed:
+            missed_items.append(self._alarm_payload("medication", entry.owner, moment, entry=entry))
+        missed_items.sort(key=lambda item: item["deadline"])
+
+        if not alarms and not missed_items:
+            return
+        if metrics.enabled:
+            for state, items in (("on_time", alarms), ("missed", missed_items)):
+                for item in items:
+                    metrics.count("alarms", type=item["type"], state=state)
+                    metrics.lateness("alarm_lateness", now.timestamp() - item["deadline"])
+        # Alarm penceresi açılmadan önce bekleyen kayıtları diske yaz
+        self.flush()
+        if len(alarms) == 1 and not missed_items:
+            self.alarm.emit(alarms[0])
+        else:
+            self.alarm.emit(self._batch_payload(alarms, missed_items, now))
+
+    def _batch_payload(self, alarms, missed_items, now):
+        # Tek alarm penceresi ve tek ses: o an çalan alarmlar ve (varsa) kaçırılanların özeti
+        return {
+            "type": "batch" if alarms else "missed",
+            "patient": None,
+            "multi_patient": len(self.patients) > 1,
+            "time": now.strftime("%H:%M"),
+            "deadline": min(alarm["deadline"] for alarm in alarms) if alarms else now.timestamp(),
+            "alarms": alarms,
+            "missed": missed_items,
+        }
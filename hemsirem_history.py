@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+import os
+import struct
+from datetime import date, timedelta
+
+from hemsirem_plan import STATUS_LABELS, day_number, day_from_number
+from hemsirem_metrics import metrics
+
+# Kayıt: gün numarası (1970-01-01'den beri, uint16), zaman dilimi sırası (uint8),
+# durum kodu (uint8, Status), değişiklik anı (epoch saniye, uint32) — 8 bayt
+RECORD = struct.Struct("<HBBI")
+# Her blok bu kadar kayıt içerir (4 KB); dizin dosyasında blok başına en küçük ve en büyük gün tutulur
+BLOCK_RECORDS = 512
+BLOCK_SIZE = RECORD.size * BLOCK_RECORDS
+INDEX_ENTRY = struct.Struct("<HH")
+
+class HistoryRecord:
+    """Geçmişteki tek bir durum değişikliği."""
+
+    __slots__ = ("day", "slot", "status", "changed_at")
+
+    def __init__(self, day, slot, status, changed_at):
+        self.day = day
+        self.slot = slot
+        self.status = status
+        self.changed_at = changed_at
+
+    @property
+    def status_text(self):
+        return STATUS_LABELS[self.status] if self.status < len(STATUS_LABELS) else STATUS_LABELS[0]
+
+
+class AdherenceHistory:
+    """Bir hastanın ilaç durumu geçmişi: yalnızca eklemeli, sabit genişlikli kayıtlar.
+
+    Her durum değişikliği adherence.bin dosyasına 8 baytlık bir kayıt olarak
+    eklenir; haftalık sıfırlama bu dosyaya dokunmaz. adherence.idx dosyası
+    her 4 KB'lık blok için kapsadığı gün aralığını tutar, böylece hafta, ay
+    veya zaman dilimi sorguları yalnızca ilgili blokları okur. Kayıtlar
+    motorun kayıt zamanlayıcısıyla birlikte, toplu olarak diske yazılır.
+    readonly=True ile açılan geçmiş (ör. rapor üretimi) dosyalara hiç yazmaz;
+    servis aynı anda kayıt eklerken de güvenle okunabilir.
+    """
+
+    def __init__(self, data_dir, name="adherence", readonly=False):
+        self.readonly = readonly
+        self.data_file = os.path.join(data_dir, f"{name}.bin")
+        self.index_file = os.path.join(data_dir, f"{name}.idx")
+        self._pending = []
+        self._record_count = None
+        self._index = None
+
+    def _load(self):
+        if self._index is not None:
+            return
+        size = os.path.getsize(self.data_file) if os.path.exists(self.data_file) else 0
+        if size % RECORD.size:
+            # Yarım kalmış son kayıt atılır
+            size -= size % RECORD.size
+            if not self.readonly:
+                with open(self.data_file, 'r+b') as f:
+                    f.truncate(size)
+        self._record_count = size // RECORD.size
+
+        self._index = []
+        if os.path.exists(self.index_file):
+            with open(self.index_file, 'rb') as f:
+                raw = f.read()
+            if len(raw) % INDEX_ENTRY.size == 0:
+                self._index = list(INDEX_ENTRY.iter_unpack(raw))
+        block_count = -(-self._record_count // BLOCK_RECORDS)
+        if len(self._index) != block_count:
+            self._rebuild_index()
+        elif block_count:
+            # Son bloğa dizin güncellenmeden önce kayıt eklenmiş olabilir; aralığı yeniden okunur
+            with open(self.data_file, 'rb') as f:
+                f.seek((block_count - 1) * BLOCK_SIZE)
+                days = [record[0] for record in RECORD.iter_unpack(f.read(size - (block_count - 1) * BLOCK_SIZE))]
+            self._index[-1] = (min(days), max(days))
+
+    def _rebuild_index(self):
+        self._index = []
+        if self._record_count:
+            with open(self.data_file, 'rb') as f:
+                while len(self._index) * BLOCK_RECORDS < self._record_count:
+                    block = f.read(min(BLOCK_SIZE, (self._record_count - len(self._index) * BLOCK_RECORDS) * RECORD.size))
+                    days = [record[0] for record in RECORD.iter_unpack(block)]
+                    self._index.append((min(days), max(days)))
+        if self.readonly:
+            return
+        with open(self.index_file, 'wb') as f:
+            f.write(b"".join(INDEX_ENTRY.pack(*entry) for entry in self._index))
+
+    def append(self, day, slot, status, changed_at):
+        # day: durumun ait olduğu tarih, slot: zaman dilimi sırası, status: durum kodu; kayıt flush() ile diske yazılır
+        self._pending.append((day_number(day), slot, int(status), int(changed_at)))
+
+    def has_pending(self):
+        return bool(self._pending)
+
+    def flush(self):
+        if not self._pending or self.readonly:
+            return
+        self._load()
+        records = self._pending
+        self._pending = []
+        with open(self.data_file, 'ab') as f:
+            f.write(b"".join(RECORD.pack(*record) for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        metrics.count("bytes_written", len(records) * RECORD.size, file="history")
+
+        # Dizinde yalnızca değişen son blok(lar) güncellenir
+        first_block = self._record_count // BLOCK_RECORDS
+        position = self._record_count
+        for record in records:
+            block = position // BLOCK_RECORDS
+            if block == len(self._index):
+                self._index.append((record[0], record[0]))
+            else:
+                low, high = self._index[block]
+                self._index[block] = (min(low, record[0]), max(high, record[0]))
+            position += 1
+        self._record_count = position
+        with open(self.index_file, 'r+b' if os.path.exists(self.index_file) else 'wb') as f:
+            f.seek(first_block * INDEX_ENTRY.size)
+            f.write(b"".join(INDEX_ENTRY.pack(*entry) for entry in self._index[first_block:]))
+
+    def records(self, start, end, slot=None):
+        # [start, end] tarih aralığındaki (ve istenirse tek zaman dilimindeki) kayıtları sırayla üretir
+        self.flush()
+        self._load()
+        low_day, high_day = day_number(start), day_number(end)
+        if not self._record_count:
+            return
+        with open(self.data_file, 'rb') as f:
+            for block, (block_low, block_high) in enumerate(self._index):
+                if block_high < low_day or block_low > high_day:
+                    continue
+                f.seek(block * BLOCK_SIZE)
+                length = min(BLOCK_RECORDS, self._record_count - block * BLOCK_RECORDS) * RECORD.size
+                for number, slot_code, status, changed_at in RECORD.iter_unpack(f.read(length)):
+                    if low_day <= number <= high_day and (slot is None or slot_code == slot):
+                        yield HistoryRecord(day_from_number(number), slot_code, status, changed_at)
+
+    def week(self, week_start, slot=None):
+        return self.records(week_start, week_start + timedelta(days=6), slot)
+
+    def month(self, year, month, slot=None):
+        start = date(year, month, 1)
+        end = (date(year + month // 12, month % 12 + 1, 1)) - timedelta(days=1)
+        return self.records(start, end, slot)
+
+    def final_statuses(self, start, end, slot=None):
+        # (gün, zaman dilimi) -> o doz için son kaydedilen durum kodu
+        statuses = {}
+        for record in self.records(start, end, slot):
+            statuses[(record.day, record.slot)] = record.status
+        return statuses
+
+    def __len__(self):
+        self._load()
+        return self._record_count + len(self._pending)
+
+    def close(self):
+        self.flush()
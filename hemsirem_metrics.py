@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# Ölçümleri çalışan bir Hemşirem sürecinden okur.
+# Kullanım: python3 hemsirem_metrics.py [daemon|gui]
+
+import os
+import sys
+import time
+from functools import wraps
+
+# Dışa aktarma aralığı; Prometheus textfile toplayıcısı dosyayı kendi aralığıyla okur
+METRICS_EXPORT_INTERVAL_MS = 15000
+# Alarm gecikmesi histogramının sınırları (saniye)
+LATENESS_BUCKETS = (0.1, 0.5, 1, 5, 30, 60, 300, 3600)
+
+HELP = {
+    "check_for_alarms_seconds": "check_for_alarms çağrılarının süresi",
+    "trigger_alarm_seconds": "Alarm penceresinin açılma süresi (trigger_alarm)",
+    "save_medications_seconds": "save_medications çağrılarının süresi",
+    "load_medications_seconds": "load_medications çağrılarının süresi",
+    "flush_seconds": "Bekleyen kayıtların diske yazılma süresi",
+    "alarm_lateness_seconds": "Alarmın zamanından motorun alarmı üretmesine kadar geçen süre",
+    "alarm_display_lateness_seconds": "Alarmın zamanından pencerenin açılmasına kadar geçen süre",
+    "alarms_total": "Üretilen alarm sayısı (tür ve zamanında/kaçırılmış olarak)",
+    "bytes_written_total": "Veri dosyalarına yazılan bayt",
+    "rows_written_total": "SQLite veritabanına yazılan satır",
+    "storage_writes_total": "Depolamaya yapılan yazma işlemleri (günlük eklemesi veya SQLite işlemi)",
+    "ui_updates_total": "Çizelge görünümlerine gönderilen güncelleme bildirimleri",
+    "errors_total": "Hata sayısı (tür olarak)",
+    "event_loop_lag_seconds": "Olay döngüsü kalp atışının gecikmesi",
+    "event_loop_stalls_total": "Eşiği aşan olay döngüsü takılmaları",
+}
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class Metrics:
+    """HEMSIREM_METRICS ayarlıysa sıcak yollardaki çağrı sayısını, süreyi, yazılan baytı ve alarm gecikmesini toplar.
+
+    Değişken "1" ise ölçümler veri dizinindeki hemsirem-<süreç>.prom dosyasına,
+    bir dizin yolu ise o dizine (ör. node_exporter textfile dizini) Prometheus
+    metin biçiminde periyodik olarak yazılır; ayrıca hemsirem-metrics-<süreç>
+    yerel soketinden okunabilir. Kapalıyken timed() işlevi değiştirmeden
+    döndürür, diğer çağrılar tek bir koşul denetiminden ibarettir.
+    """
+
+    def __init__(self, setting=None):
+        self.setting = setting if setting is not None else os.environ.get("HEMSIREM_METRICS", "")
+        self.enabled = self.setting not in ("", "0")
+        self.process = None
+        self.path = None
+        self.summaries = {} # ad -> [sayı, toplam, en büyük]
+        self.histograms = {} # ad -> [kova sayıları..., sayı, toplam]
+        self.counters = {} # (ad, etiketler) -> değer
+        self._timer = None
+        self._server = None
+
+    def timed(self, name):
+        # Yöntem süresini ölçen bezeyici; ölçüm kapalıysa işlev olduğu gibi kalır
+        def decorate(function):
+            if not self.enabled:
+                return function
+
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - started)
+            return wrapper
+        return decorate
+
+    def timer(self, name):
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        summary = self.summaries.get(name)
+        if summary is None:
+            summary = self.summaries[name] = [0, 0.0, 0.0]
+        summary[0] += 1
+        summary[1] += seconds
+        if seconds > summary[2]:
+            summary[2] = seconds
+
+    def lateness(self, name, seconds):
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = [0] * len(LATENESS_BUCKETS) + [0, 0.0]
+        for i, bound in enumerate(LATENESS_BUCKETS):
+            if seconds <= bound:
+                histogram[i] += 1
+        histogram[-2] += 1
+        histogram[-1] += seconds
+
+    def count(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def error(self, kind):
+        self.count("errors", kind=kind)
+
+    def render(self):
+        # Prometheus metin biçimi (0.0.4)
+        process = self.process or "hemsirem"
+        lines = []
+
+        def header(name, metric_type, base):
+            lines.append(f"# HELP hemsirem_{name} {HELP.get(base, base)}")
+            lines.append(f"# TYPE hemsirem_{name} {metric_type}")
+
+        def labels(pairs):
+            pairs = (("process", process),) + tuple(pairs)
+            return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+        for name, (count, total, largest) in sorted(self.summaries.items()):
+            header(f"{name}_seconds", "summary", f"{name}_seconds")
+            lines.append(f"hemsirem_{name}_seconds_count{labels(())} {count}")
+            lines.append(f"hemsirem_{name}_seconds_sum{labels(())} {total:.6f}")
+            header(f"{name}_seconds_max", "gauge", f"{name}_seconds")
+            lines.append(f"hemsirem_{name}_seconds_max{labels(())} {largest:.6f}")
+        for name, histogram in sorted(self.histograms.items()):
+            header(f"{name}_seconds", "histogram", f"{name}_seconds")
+            for bound, bucket in zip(LATENESS_BUCKETS, histogram):
+                lines.append(f"hemsirem_{name}_seconds_bucket{labels((('le', bound),))} {bucket}")
+            lines.append(f"hemsirem_{name}_seconds_bucket{labels((('le', '+Inf'),))} {histogram[-2]}")
+            lines.append(f"hemsirem_{name}_seconds_count{labels(())} {histogram[-2]}")
+            lines.append(f"hemsirem_{name}_seconds_sum{labels(())} {histogram[-1]:.6f}")
+        seen = set()
+        for (name, pairs), value in sorted(self.counters.items()):
+            if name not in seen:
+                seen.add(name)
+                header(f"{name}_total", "counter", f"{name}_total")
+            lines.append(f"hemsirem_{name}_total{labels(pairs)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export_path(self, data_dir):
+        directory = data_dir if self.setting in ("1", "true", "yes") else os.path.expanduser(self.setting)
+        return os.path.join(directory, f"hemsirem-{self.process}.prom")
+
+    def export(self):
+        if not self.enabled or self.path is None:
+            return
+        # Toplayıcı yarım yazılmış bir dosya görmesin diye geçici dosya üzerinden yazılır
+        tmp_file = self.path + ".tmp"
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(self.render())
+            os.replace(tmp_file, self.path)
+        except OSError as e:
+            print(f"Hata: Ölçümler yazılamadı: {e}")
+            self.path = None
+
+    def start(self, process, data_dir, parent=None):
+        # Periyodik dışa aktarmayı ve sorgu soketini başlatır; ölçüm kapalıysa hiçbir şey yapmaz
+        if not self.enabled:
+            return
+        from PyQt5.QtCore import QTimer
+        from PyQt5.QtNetwork import QLocalServer
+        self.process = process
+        self.path = self.export_path(data_dir)
+        self._timer = QTimer(parent)
+        self._timer.setInterval(METRICS_EXPORT_INTERVAL_MS)
+        self._timer.timeout.connect(self.export)
+        self._timer.start()
+
+        self._server = QLocalServer(parent)
+        self._server.setSocketOptions(QLocalServer.UserAccessOption)
+        QLocalServer.removeServer(socket_name(process))
+        if self._server.listen(socket_name(process)):
+            self._server.newConnection.connect(self._on_new_connection)
+        else:
+            print(f"Uyarı: Ölçüm soketi açılamadı: {self._server.errorString()}")
+        print(f"Bilgi: Ölçümler {self.path} dosyasına yazılıyor.")
+
+    def _on_new_connection(self):
+        # Bağlanan istemciye güncel ölçümler gönderilir ve bağlantı kapatılır
+        while self._server.hasPendingConnections():
+            connection = self._server.nextPendingConnection()
+            connection.disconnected.connect(connection.deleteLater)
+            connection.write(self.render().encode('utf-8'))
+            connection.disconnectFromServer()
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.stop()
+        if self._server is not None:
+            self._server.close()
+        self.export()
+
+
+def socket_name(process):
+    return f"hemsirem-metrics-{process}-{os.getuid()}"
+
+
+def query(process="daemon", timeout_ms=1000):
+    # Çalışan süreçten ölçüm metnini okur; süreç yoksa ya da ölçüm kapalıysa None
+    from PyQt5.QtNetwork import QLocalSocket
+    connection = QLocalSocket()
+    connection.connectToServer(socket_name(process))
+    if not connection.waitForConnected(timeout_ms):
+        return None
+    chunks = []
+    while connection.state() == QLocalSocket.ConnectedState and connection.waitForReadyRead(timeout_ms):
+        chunks.append(bytes(connection.readAll()))
+    chunks.append(bytes(connection.readAll()))
+    return b"".join(chunks).decode('utf-8')
+
+
+# Süreç genelinde tek ölçüm nesnesi; motor, depolama ve arayüz aynı kayda yazar
+metrics = Metrics()
+
+
+if __name__ == '__main__':
+    from PyQt5.QtCore import QCoreApplication
+    app = QCoreApplication(sys.argv)
+    text = query(sys.argv[1] if len(sys.argv) > 1 else "daemon")
+    if text is None:
+        print("Hata: Ölçüm soketine bağlanılamadı. Süreç çalışıyor ve HEMSIREM_METRICS ayarlı mı?")
+        sys.exit(1)
+    sys.stdout.write(text)
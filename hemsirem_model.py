@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from hemsirem_plan import (WeeklyPlan, Status, STATUS_LABELS, TIME_FIELD, STATUS_FIELD, PLAN_WEEK_PATH, NO_TIME,
+                           is_slot_path, parse_time)
+from hemsirem_metrics import metrics
+
+FIELDS = (TIME_FIELD, STATUS_FIELD)
+FIELD_TITLES = ("Saat", "Durum")
+
+
+class WeeklyScheduleModel(QAbstractTableModel):
+    """Haftalık çizelgeyi ilaç verisi üzerinden sunan tablo modeli.
+
+    Satırlar zaman dilimleri, sütunlar gün başına iki alandır (saat, durum);
+    sütun = gün sırası * 2 + alan. Her gün sekmesi aynı modeli gösterir ve
+    yalnızca kendi iki sütununu açık bırakır. Model veriyi kopyalamaz, canlı
+    çizelgeden (WeeklyPlan) okur; düzenlemeler 'writer' ile motora iletilir.
+    Saatler ve durum kodları metne yalnızca burada çevrilir: DisplayRole
+    "08:30" / "İçtim", EditRole saat metni (saat yoksa boş) / Status kodudur.
+    """
+
+    def __init__(self, days, time_slots, writer, parent=None):
+        super().__init__(parent)
+        self.days = days
+        self.time_slots = time_slots
+        self.writer = writer
+        self._plan = WeeklyPlan()
+        # Görünümlere gönderilen güncelleme bildirimi sayısı (dataChanged ve sıfırlama)
+        self.updates = 0
+
+    def set_plan(self, plan):
+        # Hasta değiştiğinde tüm görünümler yeni veriye bağlanır
+        self.beginResetModel()
+        self._plan = plan
+        self.endResetModel()
+        self._count_update()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.time_slots)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.days) * len(FIELDS)
+
+    def column(self, day, field):
+        return day * len(FIELDS) + field
+
+    def cell(self, index):
+        # Model dizini -> (gün sırası, zaman dilimi sırası, alan)
+        day, field = divmod(index.column(), len(FIELDS))
+        return day, index.row(), field
+
+    def value(self, index):
+        day, slot, field = self.cell(index)
+        if field == TIME_FIELD:
+            return self._plan.time_text(day, slot)
+        return int(self._plan.status(day, slot))
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            value = self.value(index)
+            if index.column() % len(FIELDS) == STATUS_FIELD:
+                return STATUS_LABELS[value]
+            return value or "00:00"
+        if role == Qt.EditRole:
+            return self.value(index)
+        if role == Qt.TextAlignmentRole and index.column() % len(FIELDS) == TIME_FIELD:
+            return Qt.AlignCenter
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        path = self.cell(index)
+        if path[2] == TIME_FIELD:
+            # Yazılmakta olan yarım saat kaydedilmez; tamamen silinen saat "saat yok" olarak kaydedilir
+            minute = parse_time(value)
+            if minute is None:
+                if value.replace(":", "").strip():
+                    return False
+                minute = NO_TIME
+            value = minute
+        else:
+            value = Status(value)
+        if value == self._plan.get(path):
+            return False
+        self.writer(path, int(value))
+        self._emit_changed(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsEditable
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Vertical:
+            return self.time_slots[section]
+        return FIELD_TITLES[section % len(FIELDS)]
+
+    def _count_update(self):
+        self.updates += 1
+        metrics.count("ui_updates")
+
+    def _emit_changed(self, top_left, bottom_right, roles=()):
+        self.dataChanged.emit(top_left, bottom_right, list(roles))
+        self._count_update()
+
+    def refresh(self, path=None):
+        # Tek bir hücre değiştiyse yalnızca o hücre, aksi halde tüm tablo yeniden çizdirilir
+        self.refresh_batch([path] if path is not None else None)
+
+    def refresh_batch(self, paths=None):
+        # Toplu güncelleme tek bildirimle yansıtılır: değişen hücreleri kapsayan dikdörtgen
+        # (çizelge dışı değişiklikler tabloyu etkilemez; hafta işaretçisi tüm durumları etkiler)
+        paths = [tuple(path) for path in paths] if paths is not None else None
+        if paths is None or PLAN_WEEK_PATH in paths:
+            self._emit_changed(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1))
+            return
+        cells = [(path[1], self.column(path[0], path[2])) for path in paths if is_slot_path(path) and path[2] in FIELDS]
+        if cells:
+            rows, columns = [row for row, _ in cells], [column for _, column in cells]
+            self._emit_changed(self.index(min(rows), min(columns)), self.index(max(rows), max(columns)))
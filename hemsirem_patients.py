@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import time
+from datetime import timedelta
+
+from hemsirem_storage import open_storage
+from hemsirem_schedule import ScheduleIndex
+from hemsirem_history import AdherenceHistory
+from hemsirem_plan import Schedule, day_from_number
+from hemsirem_metrics import metrics
+
+DEFAULT_PATIENT_ID = "default"
+DEFAULT_PATIENT_NAME = "Varsayılan"
+
+
+def default_data_dir():
+    return os.path.join(os.path.expanduser("~"), ".Hemşirem")
+
+
+class Patient:
+    """Bir hastanın verisi, depolaması ve derlenmiş çizelge dizini."""
+
+    def __init__(self, patient_id, name, data_dir, days, time_slots):
+        self.id = patient_id
+        self.name = name
+        self.data_dir = data_dir
+        self.storage = open_storage(data_dir, days, time_slots)
+        self.history = AdherenceHistory(data_dir)
+        self.schedule = Schedule()
+        self.schedule_index = ScheduleIndex(days, time_slots, owner=self)
+
+    def load(self):
+        self.schedule = self.storage.load()
+        # Eski biçimden dönüştürülen durumlar geçmişte yoksa eklenir
+        for week, day, slot, status in self.storage.migrated_statuses:
+            self.history.append(day_from_number(week) + timedelta(days=day), slot, status, time.time())
+        self.storage.migrated_statuses = []
+        return self.schedule
+
+
+class PatientRegistry:
+    """Hasta listesini ~/.Hemşirem/patients.json dosyasında tutar.
+
+    Varsayılan hasta eski kurulumlarla uyumlu kalmak için doğrudan ana veri
+    dizinini kullanır; eklenen her hasta hastalar/<kimlik> altında kendi
+    veri dosyasına sahiptir.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self.registry_file = os.path.join(root_dir, "patients.json")
+        self.patients = []
+        self.active_id = DEFAULT_PATIENT_ID
+
+    def load(self):
+        self.patients = []
+        if os.path.exists(self.registry_file):
+            try:
+                with open(self.registry_file, 'r', encoding='utf-8') as f:
+                    registry = json.load(f)
+                self.patients = [p for p in registry.get("patients", []) if p.get("id")]
+                self.active_id = registry.get("active", DEFAULT_PATIENT_ID)
+            except (json.JSONDecodeError, AttributeError):
+                print("Hata: patients.json dosyası bozuk. Yalnızca varsayılan hasta yükleniyor.")
+                metrics.error("registry_corrupt")
+        if not any(p["id"] == DEFAULT_PATIENT_ID for p in self.patients):
+            self.patients.insert(0, {"id": DEFAULT_PATIENT_ID, "name": DEFAULT_PATIENT_NAME})
+        if not any(p["id"] == self.active_id for p in self.patients):
+            self.active_id = DEFAULT_PATIENT_ID
+        return self.patients
+
+    def save(self):
+        tmp_file = self.registry_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"patients": self.patients, "active": self.active_id}, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_file, self.registry_file)
+
+    def data_dir(self, patient_id):
+        if patient_id == DEFAULT_PATIENT_ID:
+            return self.root_dir
+        return os.path.join(self.root_dir, "hastalar", patient_id)
+
+    def add(self, name):
+        existing = {p["id"] for p in self.patients}
+        number = len(self.patients)
+        while f"hasta-{number}" in existing:
+            number += 1
+        patient = {"id": f"hasta-{number}", "name": name}
+        os.makedirs(self.data_dir(patient["id"]), exist_ok=True)
+        self.patients.append(patient)
+        self.save()
+        return patient
+
+    def open(self, patient, days, time_slots):
+        data_dir = self.data_dir(patient["id"])
+        os.makedirs(data_dir, exist_ok=True)
+        return Patient(patient["id"], patient["name"], data_dir, days, time_slots)
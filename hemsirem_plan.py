@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+# Hemşirem'in alan modeli: haftalık çizelge, randevu ve günlük ilaçlar.
+# Yalnızca standart kütüphaneyi kullanır; PyQt5 olmadan da içe aktarılabilir.
+
+import re
+import struct
+import base64
+from array import array
+from contextlib import contextmanager
+from enum import IntEnum
+from datetime import date, datetime, timedelta
+
+from hemsirem_recurrence import Recurrence
+
+# Gün ve zaman dilimi adları yalnızca arayüzde (ve eski biçimli verinin dönüştürülmesinde) kullanılır;
+# veri dosyalarında ve bellekte gün ve zaman dilimi bu listelerdeki sıralarıyla tutulur
+DAYS = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
+TIME_SLOTS = ["Sabah", "Öğleden önce", "Öğle", "İkindi", "Akşam", "Gece"]
+DAY_COUNT = len(DAYS)
+SLOT_COUNT = len(TIME_SLOTS)
+
+# Veri dosyası biçimi; 1 = gün ve zaman dilimi adlarıyla anahtarlanmış eski JSON
+SCHEMA_VERSION = 2
+
+
+class Status(IntEnum):
+    """İlaç durumu kodu; geçmiş dosyasında da aynı kodlar kullanılır."""
+
+    UNKNOWN = 0
+    TAKEN = 1
+    NOT_TAKEN = 2
+    FORGOT = 3
+
+
+# Durum kodlarının arayüzdeki karşılıkları, arayüzdeki sıralarıyla
+STATUS_LABELS = ["Bilinmiyor", "İçtim", "İçmedim", "Hatırlamıyorum"]
+
+# Çizelge yolu: (gün sırası, zaman dilimi sırası, alan)
+TIME_FIELD, STATUS_FIELD, WEEK_FIELD = 0, 1, 2
+LEGACY_FIELDS = ('time', 'status', 'week')
+# Güncel haftanın (durumların geçerli olduğu haftanın pazartesisi) yolu
+PLAN_WEEK_PATH = ("status_week",)
+# Saati girilmemiş zaman dilimi
+NO_TIME = -1
+# Saat "SS:DD", tarih "GG.AA.YYYY"; her parça tam basamak sayısıyla yazılmış olmalı
+_TIME_RE = re.compile(r"([0-9]{2}):([0-9]{2})")
+_DATE_RE = re.compile(r"[0-9]{2}\.[0-9]{2}\.[0-9]{4}")
+
+EPOCH = date(1970, 1, 1)
+
+# Paketlenmiş haftalık çizelge: güncel hafta (uint16), 42 saat (dakika, int16),
+# 42 durum kodu (uint8), 42 durum haftası (uint16) — 212 bayt
+PLAN = struct.Struct(f"<H{DAY_COUNT * SLOT_COUNT}h{DAY_COUNT * SLOT_COUNT}B{DAY_COUNT * SLOT_COUNT}H")
+
+
+def day_number(day):
+    # 1970-01-01'den beri geçen gün sayısı
+    return (day - EPOCH).days
+
+
+def day_from_number(number):
+    return EPOCH + timedelta(days=number)
+
+
+def week_number(day):
+    # Tarihin içinde bulunduğu haftanın pazartesisi, gün numarası olarak
+    return day_number(day) - day.weekday()
+
+
+def parse_time(time_str):
+    # "08:30" -> 510; boş, "  :  ", yarım yazılmış ("08:3 ") veya geçersiz saatler için None.
+    # Saat ve dakika iki basamaklı olmalı (QTime "HH:mm" gibi); maskeli alan her tuşta yazılsa da "08:3" 08:03 olmaz.
+    match = _TIME_RE.fullmatch(time_str.strip()) if isinstance(time_str, str) else None
+    if match is None:
+        return None
+    hour, minute = int(match[1]), int(match[2])
+    if 0 <= hour < 24 and 0 <= minute < 60:
+        return hour * 60 + minute
+    return None
+
+
+def time_text(minute):
+    return f"{minute // 60:02d}:{minute % 60:02d}" if minute >= 0 else ""
+
+
+def parse_date(date_str):
+    # "31.07.2025" -> date; ".. . .", yarım yazılmış ("31.07.202 ") veya geçersiz tarihler için None (GG.AA.YYYY)
+    if not isinstance(date_str, str) or _DATE_RE.fullmatch(date_str.strip()) is None:
+        return None
+    try:
+        return datetime.strptime(date_str.strip(), "%d.%m.%Y").date()
+    except ValueError:
+        return None
+
+
+def is_slot_path(path):
+    return (len(path) == 3 and isinstance(path[0], int) and isinstance(path[1], int)
+            and 0 <= path[0] < DAY_COUNT and 0 <= path[1] < SLOT_COUNT and path[2] in (TIME_FIELD, STATUS_FIELD, WEEK_FIELD))
+
+
+class WeeklyPlan:
+    """Bir hastanın haftalık çizelgesi: gün x zaman dilimi başına saat ve durum.
+
+    Değerler sıra numarası (gün * 6 + zaman dilimi) ile dizilerde tutulur.
+    Her durum işaretlendiği haftayla birlikte saklanır ve yalnızca o hafta
+    güncel haftaysa geçerlidir; haftalık sıfırlama yalnızca 'week'
+    işaretçisini ilerletir.
+    """
+
+    __slots__ = ("week", "minutes", "statuses", "weeks")
+
+    def __init__(self):
+        size = DAY_COUNT * SLOT_COUNT
+        self.week = 0
+        self.minutes = array('h', [NO_TIME]) * size
+        self.statuses = bytearray(size)
+        self.weeks = array('H', [0]) * size
+
+    def minute(self, day, slot):
+        return self.minutes[day * SLOT_COUNT + slot]
+
+    def time_text(self, day, slot):
+        return time_text(self.minutes[day * SLOT_COUNT + slot])
+
+    def status(self, day, slot):
+        i = day * SLOT_COUNT + slot
+        if self.weeks[i] != self.week or not self.week:
+            return Status.UNKNOWN
+        return Status(self.statuses[i]) if self.statuses[i] < len(Status) else Status.UNKNOWN
+
+    def get(self, path):
+        day, slot, field = path
+        return self.minute(day, slot) if field == TIME_FIELD else int(self.status(day, slot))
+
+    def set(self, path, value):
+        day, slot, field = path
+        i = day * SLOT_COUNT + slot
+        if field == TIME_FIELD:
+            self.minutes[i] = value if value is not None and 0 <= value < 24 * 60 else NO_TIME
+        elif field == STATUS_FIELD:
+            self.statuses[i] = value
+            self.weeks[i] = self.week
+        elif field == WEEK_FIELD:
+            self.weeks[i] = value
+
+    def pack(self):
+        return PLAN.pack(self.week, *self.minutes, *self.statuses, *self.weeks)
+
+    @classmethod
+    def unpack(cls, raw):
+        values = PLAN.unpack(raw)
+        size = DAY_COUNT * SLOT_COUNT
+        plan = cls()
+        plan.week = values[0]
+        plan.minutes = array('h', values[1:1 + size])
+        plan.statuses = bytearray(values[1 + size:1 + 2 * size])
+        plan.weeks = array('H', values[1 + 2 * size:])
+        return plan
+
+    def to_json(self):
+        return base64.b64encode(self.pack()).decode('ascii')
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.unpack(base64.b64decode(text)) if text else cls()
+
+
+def _legacy_week(date_str, monday=False):
+    # "YYYY-MM-DD" -> gün numarası (istenirse haftanın pazartesisi); geçersizse None
+    try:
+        day = datetime.strptime(date_str, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+    return week_number(day) if monday else day_number(day)
+
+
+def upgrade_change(path, value):
+    # Eski (sürüm 1) biçimdeki bir değişiklik kaydını yeni biçimdeki kayıt(lar)a çevirir:
+    # ("Pazartesi", "Sabah", "status") -> (0, 0, STATUS_FIELD), "İçtim" -> Status.TAKEN vb.
+    path = tuple(path)
+    if len(path) == 3 and path[0] in DAYS and path[1] in TIME_SLOTS and path[2] in LEGACY_FIELDS:
+        field = LEGACY_FIELDS.index(path[2])
+        if field == TIME_FIELD:
+            value = parse_time(value)
+            value = NO_TIME if value is None else value
+        elif field == STATUS_FIELD:
+            value = STATUS_LABELS.index(value) if value in STATUS_LABELS else Status.UNKNOWN
+        else:
+            value = _legacy_week(value)
+            if value is None:
+                return []
+        return [((DAYS.index(path[0]), TIME_SLOTS.index(path[1]), field), int(value))]
+    if path == PLAN_WEEK_PATH and isinstance(value, str):
+        value = _legacy_week(value)
+        return [] if value is None else [(PLAN_WEEK_PATH, value)]
+    if path == ("last_reset_date",):
+        # Güncel hafta eskiden son sıfırlama tarihinden bulunuyordu
+        value = _legacy_week(value, monday=True)
+        return [] if value is None else [(PLAN_WEEK_PATH, value)]
+    if path == ("daily_medications",) and isinstance(value, dict):
+        return [(path, [value.get(time_slot, "") for time_slot in TIME_SLOTS])]
+    if path[0] in DAYS:
+        return []
+    return [(path, value)]
+
+
+def migrate_legacy(data, apply):
+    # Eski biçimli veri sözlüğünü apply(path, value) ile yeni biçime aktarır. Haftası olmayan
+    # (hafta etiketinden önceki sürümden kalan) durumlar son sıfırlama haftasına yazılır;
+    # geçmişe de aktarılabilmeleri için (hafta, gün, zaman dilimi, durum) listesi döndürülür.
+    reset_week = _legacy_week(data.get("last_reset_date"), monday=True)
+    for key in ("last_reset_date", "status_week"):
+        if key in data:
+            for change in upgrade_change((key,), data[key]):
+                apply(*change)
+    untagged = []
+    for key, value in data.items():
+        if key in ("last_reset_date", "status_week"):
+            continue
+        if key not in DAYS:
+            for change in upgrade_change((key,), value):
+                apply(*change)
+            continue
+        if not isinstance(value, dict):
+            continue
+        for time_slot, slot_data in value.items():
+            if not isinstance(slot_data, dict):
+                continue
+            for field in LEGACY_FIELDS:
+                if field in slot_data:
+                    for change in upgrade_change((key, time_slot, field), slot_data[field]):
+                        apply(*change)
+            status = slot_data.get('status')
+            if 'week' not in slot_data and status in STATUS_LABELS[1:] and reset_week is not None \
+                    and time_slot in TIME_SLOTS:
+                day, slot = DAYS.index(key), TIME_SLOTS.index(time_slot)
+                apply((day, slot, WEEK_FIELD), reset_week)
+                untagged.append((reset_week, day, slot, STATUS_LABELS.index(status)))
+    return untagged
+
+
+# Şablon düzenlemede hazır gün seçimleri (gün sıraları)
+DAY_GROUPS = {
+    "Hafta içi": (0, 1, 2, 3, 4),
+    "Hafta sonu": (5, 6),
+    "Tüm hafta": tuple(range(DAY_COUNT)),
+}
+
+
+def template_changes(schedule, slot, minute, days, medications=None):
+    # Bir zaman diliminin saatini (ve verilmişse günlük ilacını) seçilen günlere kopyalayan değişiklikler;
+    # zaten aynı olanlar atlanır. Engine.batch içinde uygulanır.
+    changes = [((day, slot, TIME_FIELD), minute) for day in sorted(set(days))
+               if schedule.plan.minute(day, slot) != minute]
+    if medications is not None and medications != schedule.daily_medications[slot]:
+        items = schedule.daily_medications.to_list()
+        items[slot] = medications
+        changes.append((("daily_medications",), items))
+    return changes
+
+
+def _blank(text, separator):
+    # Giriş maskesinin boş hali ("  :  ", "  .  .    ") boş metin sayılır
+    return not text.replace(separator, "").strip()
+
+
+def _text_value(value):
+    if not isinstance(value, str):
+        raise ValueError(f"Metin bekleniyordu: {value!r}")
+    return value
+
+
+def _clock_value(value):
+    # Doğrulanmış "SS:DD" saati; boşsa ""
+    if _blank(_text_value(value), ":"):
+        return ""
+    minute = parse_time(value)
+    if minute is None:
+        raise ValueError(f"Geçersiz saat: {value!r}")
+    return time_text(minute)
+
+
+def _date_value(value):
+    # Doğrulanmış "GG.AA.YYYY" tarihi; boşsa ""
+    if _blank(_text_value(value), "."):
+        return ""
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f"Geçersiz tarih: {value!r}")
+    return day.strftime("%d.%m.%Y")
+
+
+class Appointment:
+    """Doktor randevusu ve hatırlatması; atanan her alan doğrulanır (geçersizse ValueError)."""
+
+    FIELDS = ("hospital", "doctor", "time", "date", "reminder_time", "reminder_date")
+    _VALIDATORS = {"time": _clock_value, "reminder_time": _clock_value,
+                   "date": _date_value, "reminder_date": _date_value}
+
+    __slots__ = FIELDS
+
+    def __init__(self, **fields):
+        for name in self.FIELDS:
+            setattr(self, name, fields.get(name, ""))
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, self._VALIDATORS.get(name, _text_value)(value))
+
+    @staticmethod
+    def _moment(day_text, clock_text):
+        day, minute = parse_date(day_text), parse_time(clock_text)
+        if day is None or minute is None:
+            return None
+        return datetime.combine(day, datetime.min.time()) + timedelta(minutes=minute)
+
+    @property
+    def appointment_date(self):
+        return parse_date(self.date)
+
+    @property
+    def appointment_at(self):
+        return self._moment(self.date, self.time)
+
+    @property
+    def reminder_at(self):
+        # Hatırlatma yalnızca randevunun kendisi de tam girilmişse geçerlidir
+        if self.appointment_at is None:
+            return None
+        return self._moment(self.reminder_date, self.reminder_time)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data, strict=True):
+        # strict=False: geçersiz alanlar (ör. eski sürümde kaydedilmiş yarım saatler) boş bırakılır
+        appointment = cls()
+        for name in cls.FIELDS:
+            try:
+                setattr(appointment, name, (data or {}).get(name, ""))
+            except ValueError:
+                if strict:
+                    raise
+        return appointment
+
+
+class DailyMedications:
+    """Zaman dilimi başına, her gün aynı olan ilaç listesi (metin)."""
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items=()):
+        self._items = [""] * SLOT_COUNT
+        for slot, text in enumerate(list(items)[:SLOT_COUNT]):
+            self[slot] = text
+
+    def __getitem__(self, slot):
+        return self._items[slot]
+
+    def __setitem__(self, slot, text):
+        if not 0 <= slot < SLOT_COUNT:
+            raise ValueError(f"Geçersiz zaman dilimi: {slot!r}")
+        self._items[slot] = _text_value(text)
+
+    def __len__(self):
+        return SLOT_COUNT
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def to_list(self):
+        return list(self._items)
+
+    @classmethod
+    def from_list(cls, items, strict=True):
+        if strict:
+            return cls(items or ())
+        return cls(text if isinstance(text, str) else "" for text in (items or ()))
+
+
+class DoseSlot:
+    """Çizelgedeki tek bir doz (gün, zaman dilimi); değerler Schedule üzerinden okunur ve yazılır."""
+
+    __slots__ = ("schedule", "day", "slot")
+
+    def __init__(self, schedule, day, slot):
+        self.schedule = schedule
+        self.day = day
+        self.slot = slot
+
+    @property
+    def time(self):
+        return self.schedule.plan.minute(self.day, self.slot)
+
+    @time.setter
+    def time(self, minute):
+        self.schedule.set((self.day, self.slot, TIME_FIELD), minute)
+
+    @property
+    def time_text(self):
+        return self.schedule.plan.time_text(self.day, self.slot)
+
+    @property
+    def status(self):
+        return self.schedule.plan.status(self.day, self.slot)
+
+    @status.setter
+    def status(self, status):
+        self.schedule.set((self.day, self.slot, STATUS_FIELD), status)
+
+    @property
+    def medications(self):
+        return self.schedule.daily_medications[self.slot]
+
+
+def _recurrences(items, strict=True):
+    # strict=False: geçersiz kurallar atlanır (ör. elle düzenlenmiş veri dosyası)
+    if not isinstance(items, list):
+        raise ValueError(f"Liste bekleniyordu: {items!r}")
+    recurrences = []
+    for item in items:
+        try:
+            recurrences.append(Recurrence.from_dict(item))
+        except ValueError:
+            if strict:
+                raise
+    return tuple(recurrences)
+
+
+def _slot_value(field, value):
+    if field == STATUS_FIELD:
+        return int(Status(value))
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"Tamsayı bekleniyordu: {value!r}")
+    if field == TIME_FIELD and not (value == NO_TIME or 0 <= value < 24 * 60):
+        raise ValueError(f"Geçersiz saat (dakika): {value!r}")
+    if field == WEEK_FIELD and not 0 <= value < 1 << 16:
+        raise ValueError(f"Geçersiz hafta: {value!r}")
+    return value
+
+
+class Schedule:
+    """Bir hastanın tüm verisi: haftalık çizelge (WeeklyPlan), randevu, günlük ilaçlar, tekrar kuralları ve diğer ayarlar.
+
+    Değişiklikler yol/değer çiftleriyle yapılır (set); değer doğrulanıp
+    normalleştirilir ve abonelere (depolama, motor) bildirilir. apply aynı
+    değişikliği bildirimsiz uygular; depolama yükleme sırasında bunu kullanır.
+    batch() içindeki değişiklikler biriktirilir ve sonunda tek bildirimle
+    iletilir; blok hatayla biterse hepsi geri alınır.
+    """
+
+    __slots__ = ("plan", "appointment", "daily_medications", "recurrences", "extras", "_listeners", "_batch")
+
+    def __init__(self, plan=None, appointment=None, daily_medications=None, recurrences=(), extras=None):
+        self.plan = plan or WeeklyPlan()
+        self.appointment = appointment or Appointment()
+        self.daily_medications = daily_medications or DailyMedications()
+        # Haftalık çizelgenin dışındaki ilaçlar ("8 saatte bir" gibi); Recurrence demeti
+        self.recurrences = tuple(recurrences)
+        # Alan modelinde karşılığı olmayan ayarlar (ör. son tetiklenen hatırlatma) olduğu gibi saklanır
+        self.extras = extras or {}
+        self._listeners = []
+        self._batch = None
+
+    def slot(self, day, slot):
+        return DoseSlot(self, day, slot)
+
+    def slots(self):
+        for i in range(DAY_COUNT * SLOT_COUNT):
+            yield DoseSlot(self, *divmod(i, SLOT_COUNT))
+
+    def subscribe(self, listener):
+        # listener([(path, value), ...]) her değişiklikten (ya da toplu güncellemeden) sonra bir kez çağrılır
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def get(self, path):
+        # Yoldaki güncel değer; yoksa KeyError
+        path = tuple(path)
+        if is_slot_path(path):
+            return self.plan.get(path) if path[2] != WEEK_FIELD else self.plan.weeks[path[0] * SLOT_COUNT + path[1]]
+        if path == PLAN_WEEK_PATH:
+            return self.plan.week
+        if path == ("appointment_data",):
+            return self.appointment.to_dict()
+        if path == ("daily_medications",):
+            return self.daily_medications.to_list()
+        if path == ("recurrences",):
+            return [recurrence.to_dict() for recurrence in self.recurrences]
+        node = self.extras
+        for key in path:
+            node = node[key]
+        return node
+
+    def apply(self, path, value, strict=True):
+        # Değişikliği doğrulayıp uygular ve normalleştirilmiş değeri döndürür; geçersizse ValueError
+        path = tuple(path)
+        if is_slot_path(path):
+            value = _slot_value(path[2], value)
+            self.plan.set(path, value)
+        elif path == PLAN_WEEK_PATH:
+            value = _slot_value(WEEK_FIELD, value)
+            self.plan.week = value
+        elif path == ("appointment_data",):
+            self.appointment = Appointment.from_dict(value, strict)
+            value = self.appointment.to_dict()
+        elif path == ("daily_medications",):
+            self.daily_medications = DailyMedications.from_list(value, strict)
+            value = self.daily_medications.to_list()
+        elif path == ("recurrences",):
+            self.recurrences = _recurrences(value, strict)
+            value = [recurrence.to_dict() for recurrence in self.recurrences]
+        elif len(path) == 1 and isinstance(path[0], str) and path[0] not in DAYS:
+            self.extras[path[0]] = value
+        else:
+            raise ValueError(f"Geçersiz yol: {list(path)!r}")
+        return value
+
+    def set(self, path, value):
+        path = tuple(path)
+        value = self.apply(path, value)
+        if self._batch is not None:
+            self._batch.append((path, value))
+        else:
+            self._notify([(path, value)])
+        return value
+
+    def _notify(self, changes):
+        for listener in self._listeners:
+            listener(changes)
+
+    @contextmanager
+    def batch(self):
+        # İç içe toplu güncelleme dıştakine katılır. Yalnızca set() ile yapılanlar kaydedilir ve geri alınır:
+        # randevu ve günlük ilaç nesnelerini apply() yenisiyle değiştirir, bu yüzden blok içinde
+        # schedule.daily_medications[slot] ya da randevu alanlarına doğrudan atama ne bildirilir ne de geri alınır
+        if self._batch is not None:
+            yield self
+            return
+        saved = (self.plan.pack(), self.appointment, self.daily_medications, self.recurrences, dict(self.extras))
+        self._batch = []
+        try:
+            yield self
+        except BaseException:
+            self._batch = None
+            self._restore(*saved)
+            raise
+        changes, self._batch = self._batch, None
+        if changes:
+            self._notify(changes)
+
+    def _restore(self, packed, appointment, daily_medications, recurrences, extras):
+        # Görünümler aynı WeeklyPlan nesnesini tuttuğu için çizelge yerinde geri yüklenir
+        plan = WeeklyPlan.unpack(packed)
+        self.plan.week, self.plan.minutes, self.plan.statuses, self.plan.weeks = \
+            plan.week, plan.minutes, plan.statuses, plan.weeks
+        self.appointment = appointment
+        self.daily_medications = daily_medications
+        self.recurrences = recurrences
+        self.extras = extras
+
+    def settings(self):
+        # Çizelge dışındaki ayarlar, veri dosyasındaki adlarıyla
+        return {"appointment_data": self.appointment.to_dict(),
+                "daily_medications": self.daily_medications.to_list(),
+                "recurrences": [recurrence.to_dict() for recurrence in self.recurrences], **self.extras}
+
+    def to_state(self):
+        return {"plan": self.plan.to_json(), "settings": self.settings()}
+
+    @classmethod
+    def from_state(cls, state, strict=False):
+        schedule = cls(WeeklyPlan.from_json(state.get("plan")))
+        for key, value in (state.get("settings") or {}).items():
+            try:
+                schedule.apply((key,), value, strict)
+            except ValueError:
+                if strict:
+                    raise
+        return schedule
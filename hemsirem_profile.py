@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Modülün ilk içe aktarıldığı an; açılışın başlangıcı kabul edilir
+_STARTED = time.perf_counter()
+
+
+class StartupProfiler:
+    """HEMSIREM_PROFILE_STARTUP ayarlıysa açılış aşamalarının süresini ölçer.
+
+    Değişken "1" ise rapor veri dizinindeki startup-profile.log dosyasına,
+    bir dosya yolu ise o dosyaya eklenir. Aynı adlı aşamalar (ör. her hasta
+    için load_medications) toplanır. Kapalıyken her çağrı hiçbir şey yapmaz.
+    """
+
+    def __init__(self, setting=None):
+        self.setting = setting if setting is not None else os.environ.get("HEMSIREM_PROFILE_STARTUP", "")
+        self.enabled = self.setting not in ("", "0")
+        self.started = _STARTED
+        self.phases = {}
+        self.reported = False
+
+    def add(self, name, seconds):
+        total, count = self.phases.get(name, (0.0, 0))
+        self.phases[name] = (total + seconds, count + 1)
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def since_start(self, name):
+        # Açılışın başından bu ana kadar geçen süre tek bir aşama olarak kaydedilir
+        if self.enabled:
+            self.add(name, time.perf_counter() - self.started)
+
+    def report_path(self, data_dir):
+        if self.setting in ("1", "true", "yes"):
+            return os.path.join(data_dir, "startup-profile.log")
+        return os.path.expanduser(self.setting)
+
+    def report(self, data_dir):
+        if not self.enabled or self.reported:
+            return None
+        self.reported = True
+        lines = [f"# {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} pid={os.getpid()}"]
+        for name, (seconds, count) in self.phases.items():
+            suffix = f"  (x{count})" if count > 1 else ""
+            lines.append(f"{name:<24} {seconds * 1000:9.2f} ms{suffix}")
+        path = self.report_path(data_dir)
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n\n")
+        except OSError as e:
+            print(f"Hata: Açılış profili yazılamadı: {e}")
+            return None
+        print(f"Bilgi: Açılış profili {path} dosyasına yazıldı.")
+        return path
+
+
+# Süreç genelinde tek profil nesnesi; arayüz, motor ve servis aynı raporu doldurur
+profiler = StartupProfiler()
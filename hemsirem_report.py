@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# İlaç uyum raporu: geçmişten hafta ve zaman dilimi başına durum tabloları (CSV, HTML, PDF).
+# Kullanım: python3 hemsirem_report.py [--month YYYY-AA] [--format csv|html|pdf] [--patient KİMLİK ...] [--out DİZİN] [--jobs N]
+
+import os
+import sys
+import csv
+import html
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+from hemsirem_plan import STATUS_LABELS, TIME_SLOTS
+from hemsirem_history import AdherenceHistory
+from hemsirem_patients import PatientRegistry, default_data_dir
+
+REPORT_FORMATS = ("csv", "html", "pdf")
+# Rapor sütunları: önce içilen dozlar, en sonda işaretlenmemiş olanlar
+REPORT_STATUSES = STATUS_LABELS[1:] + STATUS_LABELS[:1]
+_COLUMNS = {STATUS_LABELS.index(status): column for column, status in enumerate(REPORT_STATUSES)}
+
+_gui_app = None
+
+
+def percentages(counts):
+    total = sum(counts)
+    return [100.0 * count / total if total else 0.0 for count in counts]
+
+
+def month_range(year, month):
+    start = date(year, month, 1)
+    return start, date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+
+
+class AdherenceReport:
+    """Bir hastanın tarih aralığındaki ilaç uyumu: hafta ve zaman dilimi başına durum sayıları.
+
+    Geçmiş dosyası belleğe alınmaz; kayıtlar blok blok okunurken her doz için
+    yalnızca son durumu tutulur. Bellek kullanımı geçmişin uzunluğuna değil
+    rapor aralığındaki doz sayısına bağlıdır (bir ay için en fazla 31 x 6).
+    Saati olup işaretlenmemiş dozlar hafta kapanırken (haftalık sıfırlama)
+    geçmişe "Bilinmiyor" olarak eklendiğinden payda planlı dozların tamamıdır;
+    içinde bulunulan haftanın işaretlenmemiş dozları hafta bitince sayılır.
+    """
+
+    def __init__(self, history, start, end, patient_name="", time_slots=TIME_SLOTS):
+        self.start = start
+        self.end = end
+        self.patient_name = patient_name
+        self.time_slots = time_slots
+
+        final = {}
+        for record in history.records(start, end):
+            final[(record.day, record.slot)] = record.status
+        self.weeks = {} # haftanın pazartesisi -> sayılar
+        self.slots = [[0] * len(REPORT_STATUSES) for _ in time_slots]
+        self.total = [0] * len(REPORT_STATUSES)
+        for (day, slot), status in final.items():
+            column = _COLUMNS.get(status, _COLUMNS[0])
+            monday = day - timedelta(days=day.weekday())
+            self.weeks.setdefault(monday, [0] * len(REPORT_STATUSES))[column] += 1
+            if slot < len(self.slots):
+                self.slots[slot][column] += 1
+            self.total[column] += 1
+
+    @property
+    def dose_count(self):
+        return sum(self.total)
+
+    def tables(self):
+        # (başlık, ilk sütun adı, satırlar) üçlüleri; satırlar (etiket, sayılar) olarak üretilir
+        weeks = ((f"{monday:%d.%m.%Y} - {monday + timedelta(days=6):%d.%m.%Y}", self.weeks[monday])
+                 for monday in sorted(self.weeks))
+        yield "Haftalık Uyum", "Hafta", self._with_total(weeks)
+        slots = ((time_slot, counts) for time_slot, counts in zip(self.time_slots, self.slots) if sum(counts))
+        yield "Zaman Dilimine Göre Uyum", "Zaman Dilimi", self._with_total(slots)
+
+    def _with_total(self, rows):
+        yield from rows
+        yield "Toplam", self.total
+
+
+def write_csv(report, f):
+    writer = csv.writer(f)
+    writer.writerow(["Hasta", report.patient_name])
+    writer.writerow(["Dönem", f"{report.start:%d.%m.%Y}", f"{report.end:%d.%m.%Y}"])
+    for title, label, rows in report.tables():
+        writer.writerow([])
+        writer.writerow([title])
+        writer.writerow([label, *REPORT_STATUSES, *(f"% {status}" for status in REPORT_STATUSES), "Toplam"])
+        for name, counts in rows:
+            writer.writerow([name, *counts, *(f"{share:.1f}" for share in percentages(counts)), sum(counts)])
+
+
+def html_chunks(report):
+    # Belge parça parça üretilir; dosyaya yazılırken tamamı bellekte birleştirilmez
+    title = html.escape(f"İlaç Uyum Raporu - {report.patient_name}")
+    yield (f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{title}</title>"
+           "<style>body{font-family:sans-serif} table{border-collapse:collapse;margin-bottom:16px}"
+           "th,td{border:1px solid #888;padding:4px 8px;text-align:right} th:first-child,td:first-child{text-align:left}"
+           "</style></head><body>\n")
+    yield f"<h2>{title}</h2>\n<p>Dönem: {report.start:%d.%m.%Y} - {report.end:%d.%m.%Y}</p>\n"
+    if not report.dose_count:
+        yield "<p>Bu dönem için kayıtlı ilaç durumu yok.</p>\n"
+    for table_title, label, rows in report.tables():
+        yield f"<h3>{html.escape(table_title)}</h3>\n<table cellspacing=\"0\" cellpadding=\"4\" border=\"1\">\n<tr>"
+        yield "".join(f"<th>{html.escape(name)}</th>" for name in (label, *REPORT_STATUSES, "Uyum %", "Toplam"))
+        yield "</tr>\n"
+        for name, counts in rows:
+            cells = [html.escape(name), *(str(count) for count in counts), f"{percentages(counts)[0]:.1f}", str(sum(counts))]
+            yield "<tr>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>\n"
+        yield "</table>\n"
+    yield f"<p><small>Oluşturulma: {datetime.now():%d.%m.%Y %H:%M}</small></p>\n</body></html>\n"
+
+
+def write_html(report, f):
+    for chunk in html_chunks(report):
+        f.write(chunk)
+
+
+def _gui_application():
+    # QPrinter ve QTextDocument bir QGuiApplication ister; rapor süreçlerinde ekransız oluşturulur
+    global _gui_app
+    from PyQt5.QtGui import QGuiApplication
+    if QGuiApplication.instance() is None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        _gui_app = QGuiApplication(["hemsirem-report"])
+    return QGuiApplication.instance()
+
+
+def write_pdf(report, output_path):
+    _gui_application()
+    from PyQt5.QtGui import QTextDocument
+    from PyQt5.QtPrintSupport import QPrinter
+    document = QTextDocument()
+    document.setHtml("".join(html_chunks(report)))
+    printer = QPrinter(QPrinter.HighResolution)
+    printer.setOutputFormat(QPrinter.PdfFormat)
+    printer.setPageSize(QPrinter.A4)
+    printer.setOutputFileName(output_path)
+    document.print_(printer)
+
+
+def write_report(report, output_path, report_format=None):
+    report_format = report_format or os.path.splitext(output_path)[1].lstrip(".").lower()
+    if report_format == "pdf":
+        write_pdf(report, output_path)
+    elif report_format == "html":
+        with open(output_path, 'w', encoding='utf-8') as f:
+            write_html(report, f)
+    elif report_format == "csv":
+        # Elektronik tablo programları Türkçe karakterleri BOM ile tanır
+        with open(output_path, 'w', encoding='utf-8-sig', newline='') as f:
+            write_csv(report, f)
+    else:
+        raise ValueError(f"Bilinmeyen rapor biçimi: {report_format}")
+
+
+def render_report(job):
+    # job: (veri dizini, hasta adı, başlangıç, bitiş, biçim, çıktı yolu); süreç havuzunda da çalışır
+    data_dir, patient_name, start, end, report_format, output_path = job
+    history = AdherenceHistory(data_dir, readonly=True)
+    report = AdherenceReport(history, start, end, patient_name)
+    write_report(report, output_path, report_format)
+    return output_path, report.dose_count
+
+
+def render_patient_report(root_dir, patient_id, patient_name, start, end, output_path):
+    # Arayüzden tek hasta için; biçim dosya uzantısından seçilir
+    report_format = os.path.splitext(output_path)[1].lstrip(".").lower()
+    return render_report((PatientRegistry(root_dir).data_dir(patient_id), patient_name, start, end, report_format, output_path))
+
+
+def _init_worker():
+    # İşçi süreçler hiçbir zaman pencere açmaz
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+
+
+def render_reports(jobs, processes=None):
+    # Birden çok hastanın raporu ayrı süreçlerde paralel üretilir; sonuçlar iş sırasıyla döner
+    jobs = list(jobs)
+    if len(jobs) <= 1 or processes == 1:
+        return [render_report(job) for job in jobs]
+    workers = min(processes or os.cpu_count() or 1, len(jobs))
+    # Qt yüklü bir süreçten çatallanmak (fork) güvenli değildir; işçiler sıfırdan başlatılır
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+        return list(pool.map(render_report, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def report_jobs(registry, patient_ids, start, end, report_format, out_dir):
+    jobs = []
+    for patient in registry.patients:
+        if patient_ids and patient["id"] not in patient_ids:
+            continue
+        output_path = os.path.join(out_dir, f"{patient['id']}_{start:%Y%m%d}-{end:%Y%m%d}.{report_format}")
+        jobs.append((registry.data_dir(patient["id"]), patient["name"], start, end, report_format, output_path))
+    return jobs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="hemsirem_report", description="Hemşirem ilaç uyum raporu")
+    parser.add_argument("--month", help="YYYY-AA (varsayılan: içinde bulunulan ay)")
+    parser.add_argument("--from", dest="start", help="başlangıç tarihi, YYYY-AA-GG")
+    parser.add_argument("--to", dest="end", help="bitiş tarihi, YYYY-AA-GG")
+    parser.add_argument("--format", choices=REPORT_FORMATS, default="pdf")
+    parser.add_argument("--patient", action="append", help="hasta kimliği (varsayılan: tüm hastalar)")
+    parser.add_argument("--out", default=".", help="raporların yazılacağı dizin")
+    parser.add_argument("--jobs", type=int, default=None, help="paralel süreç sayısı")
+    parser.add_argument("--data-dir", default=default_data_dir())
+    args = parser.parse_args(argv)
+
+    try:
+        if args.start or args.end:
+            today = date.today()
+            start = date.fromisoformat(args.start) if args.start else today.replace(day=1)
+            end = date.fromisoformat(args.end) if args.end else today
+        else:
+            year, month = map(int, args.month.split("-")) if args.month else (date.today().year, date.today().month)
+            start, end = month_range(year, month)
+    except ValueError as e:
+        print(f"Hata: Geçersiz tarih ({e}).")
+        return 2
+
+    registry = PatientRegistry(args.data_dir)
+    registry.load()
+    for patient_id in args.patient or []:
+        if not any(p["id"] == patient_id for p in registry.patients):
+            print(f"Uyarı: '{patient_id}' kimlikli hasta bulunamadı.")
+    os.makedirs(args.out, exist_ok=True)
+    jobs = report_jobs(registry, set(args.patient or []), start, end, args.format, args.out)
+
+    started = time.perf_counter()
+    results = render_reports(jobs, args.jobs)
+    for output_path, dose_count in results:
+        print(f"{output_path}: {dose_count} doz")
+    print(f"Bilgi: {len(results)} rapor {time.perf_counter() - started:.2f} sn içinde yazıldı.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
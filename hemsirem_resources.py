@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import os
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QIcon, QPixmap, QPixmapCache, QImageReader
+
+# Pencere ve pencerelerdeki logo boyutu; simge bundan büyük tek bir kopyadan üretilir
+LOGO_SIZE = 96
+ICON_SIZE = 256
+# Hemşirem'in QPixmapCache'e eklediği pay (KB); Qt'nin kendi stil önbelleğinin üzerine eklenir
+RESOURCE_CACHE_BUDGET_KB = 1024
+
+
+class ResourceRegistry:
+    """Program dosyalarının (logo, simge, alarm sesleri) süreç genelindeki kaydı.
+
+    Dosya yolları bir kez çözülür; bulunamayan dosya için uyarı bir kez
+    yazılır. Ölçeklenmiş görüntüler QPixmapCache içinde ayrılmış bir payla
+    saklanır, simgeler (QIcon) ayrıca tutulur. Açılışta bir kez yüklendikten
+    sonra alarm pencereleri diske gitmeden ve ölçekleme yapmadan açılır.
+    hits/misses sayaçları önbelleğin işe yarayıp yaramadığını gösterir.
+    """
+
+    def __init__(self, base_dir, budget_kb=RESOURCE_CACHE_BUDGET_KB):
+        self.base_dir = base_dir
+        self.budget_kb = budget_kb
+        self._paths = {}
+        self._icons = {}
+        self._budget_applied = False
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, filename):
+        if filename not in self._paths:
+            resource_path = os.path.join(self.base_dir, filename)
+            if os.path.exists(resource_path):
+                self._paths[filename] = resource_path
+            else:
+                print(f"Uyarı: {filename} bulunamadı. Lütfen {filename} dosyasının programla aynı dizinde olduğundan emin olun.")
+                self._paths[filename] = None
+        return self._paths[filename]
+
+    def _apply_budget(self):
+        if not self._budget_applied:
+            QPixmapCache.setCacheLimit(QPixmapCache.cacheLimit() + self.budget_kb)
+            self._budget_applied = True
+
+    def pixmap(self, filename, size=LOGO_SIZE):
+        # size x size kutusuna en-boy oranı korunarak sığdırılmış görüntü; dosya yoksa None
+        self._apply_budget()
+        key = f"hemsirem/{filename}/{size}"
+        pixmap = QPixmapCache.find(key)
+        if pixmap is not None and not pixmap.isNull():
+            self.hits += 1
+            return pixmap
+        self.misses += 1
+        resource_path = self.path(filename)
+        if resource_path is None:
+            return None
+        # Görüntü doğrudan hedef boyutta çözülür; tam boyutlu kopya bellekte tutulmaz
+        reader = QImageReader(resource_path)
+        reader.setScaledSize(reader.size().scaled(size, size, Qt.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            print(f"Uyarı: {filename} okunamadı: {reader.errorString()}")
+            return None
+        pixmap = QPixmap.fromImage(image)
+        QPixmapCache.insert(key, pixmap)
+        return pixmap
+
+    def icon(self, filename):
+        icon = self._icons.get(filename)
+        if icon is not None:
+            self.hits += 1
+            return icon
+        icon = QIcon()
+        for size in (ICON_SIZE, LOGO_SIZE):
+            pixmap = self.pixmap(filename, size)
+            if pixmap is not None:
+                icon.addPixmap(pixmap)
+        self._icons[filename] = icon
+        return icon
+
+    def preload(self, *filenames):
+        # Açılışta çağrılır; sonraki pencereler yalnızca önbellekten okur
+        for filename in filenames:
+            self.pixmap(filename, LOGO_SIZE)
+            self.icon(filename)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "paths": len(self._paths),
+            "cache_limit_kb": QPixmapCache.cacheLimit(),
+        }
+
+
+resources = ResourceRegistry(os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+
+import heapq
+import itertools
+from datetime import timedelta
+
+from hemsirem_plan import Schedule, NO_TIME, SLOT_COUNT
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def minute_of_week(moment):
+    # Pazartesi 00:00 = 0, Pazar 23:59 = 10079
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def next_weekly_occurrence(weekday, hour, minute, after):
+    # 'after' anından sonraki (dahil değil) ilk haftalık tekrar; weekday 0 = Pazartesi
+    candidate = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    candidate += timedelta(days=(weekday - after.weekday()) % 7)
+    if candidate <= after:
+        candidate += timedelta(days=7)
+    return candidate
+
+
+def next_occurrence(week_minute, after):
+    day, minute = divmod(week_minute, MINUTES_PER_DAY)
+    return next_weekly_occurrence(day, minute // 60, minute % 60, after)
+
+
+class ScheduleEntry:
+    """Dizindeki tek bir zaman dilimi; durum ve ilaç bilgisi canlı veriden okunur."""
+
+    __slots__ = ("day", "slot", "week_minute", "owner", "_schedule")
+
+    def __init__(self, day, slot, week_minute, schedule, owner=None):
+        self.day = day
+        self.slot = slot
+        self.week_minute = week_minute
+        self.owner = owner
+        self._schedule = schedule
+
+    @property
+    def status(self):
+        return self._schedule.plan.status(self.day, self.slot)
+
+    @property
+    def medications(self):
+        return self._schedule.daily_medications[self.slot]
+
+    @property
+    def time_str(self):
+        minute = self.week_minute % MINUTES_PER_DAY
+        return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+class ScheduleIndex:
+    """Haftanın dakikası -> o dakikada çalacak zaman dilimleri.
+
+    Veri yüklendiğinde bir kez derlenir, saat düzenlendiğinde yalnızca ilgili
+    zaman dilimi güncellenir. "Şu an ne çalıyor" ve "bu alarm hangi zaman
+    dilimine ait" soruları böylece tek bir sözlük erişimiyle yanıtlanır.
+    Gün ve zaman dilimi sıra numaralarıyla tutulur; adlar yalnızca dökümde kullanılır.
+    Bir zamanlama çarkı (wheel) bağlanmışsa girdiler ona da eklenip çıkarılır.
+    """
+
+    def __init__(self, days, time_slots, owner=None):
+        self.days = days
+        self.time_slots = time_slots
+        self.owner = owner
+        self.wheel = None
+        self._schedule = Schedule()
+        self._by_minute = {}
+        self._by_slot = {}
+        # Tam derleme sayısı; toplu değişikliklerin dizini bir kez yeniden kurduğunu doğrulamak için
+        self.compiles = 0
+
+    def compile(self, schedule):
+        self.compiles += 1
+        if self.wheel is not None:
+            for entry in self._by_slot.values():
+                self.wheel.remove(entry)
+        self._schedule = schedule
+        self._by_minute = {}
+        self._by_slot = {}
+        for i, minute in enumerate(schedule.plan.minutes):
+            if minute != NO_TIME:
+                self.update(*divmod(i, SLOT_COUNT), minute)
+
+    def update(self, day, slot, minute):
+        old_entry = self._by_slot.pop((day, slot), None)
+        if old_entry is not None:
+            entries = self._by_minute[old_entry.week_minute]
+            entries.remove(old_entry)
+            if not entries:
+                del self._by_minute[old_entry.week_minute]
+            if self.wheel is not None:
+                self.wheel.remove(old_entry)
+        if minute is None or not 0 <= minute < MINUTES_PER_DAY:
+            return None
+
+        week_minute = day * MINUTES_PER_DAY + minute
+        entry = ScheduleEntry(day, slot, week_minute, self._schedule, self.owner)
+        self._by_slot[(day, slot)] = entry
+        if self.wheel is not None:
+            self.wheel.add(entry)
+        entries = self._by_minute.setdefault(week_minute, [])
+        entries.append(entry)
+        # Aynı dakikadaki zaman dilimleri gün içindeki sıralarına göre tutulur
+        entries.sort(key=lambda e: e.slot)
+        return entry
+
+    def at(self, week_minute):
+        return self._by_minute.get(week_minute, [])
+
+    def entry(self, day, slot):
+        return self._by_slot.get((day, slot))
+
+    def entries(self):
+        return self._by_slot.values()
+
+    def dump(self):
+        # Hata ayıklama için dizinin okunabilir dökümü
+        lines = []
+        for week_minute in sorted(self._by_minute):
+            for entry in self._by_minute[week_minute]:
+                lines.append(f"{week_minute:5d}  {self.days[entry.day]:<10} {entry.time_str}  "
+                             f"{self.time_slots[entry.slot]:<13} {entry.status.name}")
+        return "\n".join(lines)
+
+
+class TimingWheel:
+    """İki kademeli zamanlama çarkı: haftanın 168 saati + içinde bulunulan saatin 60 dakikası.
+
+    Girdiler saat kovalarına eklenir; bir saate girildiğinde o saatin girdileri
+    dakika kovalarına dağıtılır (cascade). Böylece "bu dakika kimin alarmı var"
+    sorusu hasta sayısından bağımsız olarak tek bir kova erişimiyle yanıtlanır.
+    Doluluk sayaçları sayesinde sıradaki dolu dakika da sabit sürede bulunur.
+    """
+
+    HOURS_PER_WEEK = 7 * 24
+
+    def __init__(self):
+        self._hours = [set() for _ in range(self.HOURS_PER_WEEK)]
+        self._minutes = [set() for _ in range(60)]
+        self._hour_counts = [0] * self.HOURS_PER_WEEK
+        self._minute_counts = [0] * MINUTES_PER_WEEK
+        self._current_hour = None
+        self._count = 0
+
+    def add(self, entry):
+        hour = entry.week_minute // 60
+        bucket = self._hours[hour]
+        if entry in bucket:
+            return
+        bucket.add(entry)
+        self._hour_counts[hour] += 1
+        self._minute_counts[entry.week_minute] += 1
+        self._count += 1
+        if hour == self._current_hour:
+            self._minutes[entry.week_minute % 60].add(entry)
+
+    def remove(self, entry):
+        hour = entry.week_minute // 60
+        bucket = self._hours[hour]
+        if entry not in bucket:
+            return
+        bucket.discard(entry)
+        self._hour_counts[hour] -= 1
+        self._minute_counts[entry.week_minute] -= 1
+        self._count -= 1
+        if hour == self._current_hour:
+            self._minutes[entry.week_minute % 60].discard(entry)
+
+    def clear(self):
+        self.__init__()
+
+    def _cascade(self, hour):
+        if hour == self._current_hour:
+            return
+        for bucket in self._minutes:
+            bucket.clear()
+        for entry in self._hours[hour]:
+            self._minutes[entry.week_minute % 60].add(entry)
+        self._current_hour = hour
+
+    def due(self, week_minute):
+        # Haftanın bu dakikasında çalacak tüm girdiler
+        if not self._minute_counts[week_minute]:
+            return []
+        self._cascade(week_minute // 60)
+        return list(self._minutes[week_minute % 60])
+
+    def next_due_minute(self, week_minute):
+        # week_minute dahil, hafta boyunca ileriye doğru ilk dolu dakika (yoksa None)
+        if not self._count:
+            return None
+        hour, minute = divmod(week_minute, 60)
+        base = hour * 60
+        for m in range(minute, 60):
+            if self._minute_counts[base + m]:
+                return base + m
+        for step in range(1, self.HOURS_PER_WEEK + 1):
+            h = (hour + step) % self.HOURS_PER_WEEK
+            if self._hour_counts[h]:
+                base = h * 60
+                for m in range(60):
+                    if self._minute_counts[base + m]:
+                        return base + m
+        return None
+
+    def __len__(self):
+        return self._count
+
+
+class AlarmScheduler:
+    """Yaklaşan alarm anlarını tutan en-küçük yığın (min-heap).
+
+    Her alarm bir anahtarla (ör. ("appointment", "default")) bir kez
+    bulunur. Bir anahtar yeniden zamanlandığında eski yığın girdisi silinmez,
+    yalnızca geçersiz sayılır ve sıradaki ana bakılırken atlanır.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._deadlines = {}
+        self._counter = itertools.count()
+
+    def schedule(self, key, when):
+        # when None ise anahtarın alarmı kaldırılır
+        if when is None:
+            self._deadlines.pop(key, None)
+            return
+        self._deadlines[key] = when
+        heapq.heappush(self._heap, (when, next(self._counter), key))
+
+    def clear(self):
+        self._heap = []
+        self._deadlines = {}
+
+    def _discard_stale(self):
+        while self._heap:
+            when, _, key = self._heap[0]
+            if self._deadlines.get(key) == when:
+                return
+            heapq.heappop(self._heap)
+
+    def next_deadline(self):
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        # Zamanı gelmiş tüm alarmları (anahtar, an) çiftleri olarak sırayla döndürür
+        due = []
+        self._discard_stale()
+        while self._heap and self._heap[0][0] <= now:
+            when, _, key = heapq.heappop(self._heap)
+            del self._deadlines[key]
+            due.append((key, when))
+            self._discard_stale()
+        return due
+
+    def __len__(self):
+        return len(self._deadlines)
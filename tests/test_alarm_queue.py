@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# Alarm kuyruğu: üst üste gelen alarmlar engellemeden gösterilir, aynı alarmlar birleştirilir,
+# son alarm onaylanınca ses durur ve yalnızca alarm için açılan arayüz kapanır.
+# Kullanım: python3 -m unittest discover tests
+
+import os
+import sys
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from hemsirem_alarms import AlarmQueue, alarm_key
+from hemsirem_plan import TIME_FIELD
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+import hemsirem
+from hemsirem_engine import AlarmEngine
+
+
+def medication_alarm(day="Pazartesi", time_slot="Sabah", patient="default"):
+    return {"type": "medication", "patient": patient, "patient_name": "Hasta", "multi_patient": False,
+            "time": "08:00", "date": "04.08.2025", "deadline": time.time(), "day": day,
+            "time_slot": time_slot, "medications": "Aspirin", "days_left": None, "appointment_data": {}}
+
+
+class AlarmQueueTest(unittest.TestCase):
+    def test_duplicate_key_merges(self):
+        queue = AlarmQueue()
+        first, is_new = queue.push(medication_alarm())
+        self.assertTrue(is_new)
+        again, is_new = queue.push(medication_alarm())
+        self.assertFalse(is_new)
+        self.assertIs(again, first)
+        self.assertEqual(first.count, 2)
+        queue.push(medication_alarm(time_slot="Öğle"))
+        self.assertEqual(len(queue), 2)
+
+    def test_missed_summaries_accumulate(self):
+        queue = AlarmQueue()
+        queue.push({"type": "missed", "missed": [medication_alarm()]})
+        pending, _ = queue.push({"type": "missed", "missed": [medication_alarm(time_slot="Öğle")]})
+        self.assertEqual(len(pending.alarm["missed"]), 2)
+
+    def test_acknowledge(self):
+        clock = iter((10.0, 25.0))
+        queue = AlarmQueue(clock=lambda: next(clock))
+        pending, _ = queue.push(medication_alarm())
+        self.assertIs(queue.acknowledge(pending.key), pending)
+        self.assertTrue(pending.acknowledged)
+        self.assertEqual(pending.acknowledged_at - pending.received_at, 15.0)
+        self.assertFalse(queue)
+        self.assertIsNone(queue.acknowledge(pending.key))
+
+
+class TriggerAlarmTest(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.now = datetime(2025, 8, 4, 7, 59, 30) # Pazartesi
+        self.engine = AlarmEngine(self.data_dir, clock=lambda: self.now)
+        self.window = hemsirem.HemşiremApp(self.engine, alarm_client=True)
+        self.window.audio = mock.Mock()
+
+    def tearDown(self):
+        for dialog in list(self.window._alarm_dialogs.values()):
+            dialog.close()
+        self.engine.close()
+        self.window.deleteLater()
+        app.processEvents()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_overlapping_alarms_are_not_delayed(self):
+        # 08:00 alarmı onaylanmadan 08:01 alarmı da zamanında gösterilmeli
+        self.engine.set_value("default", (0, 0, TIME_FIELD), 8 * 60)
+        self.engine.set_value("default", (0, 1, TIME_FIELD), 8 * 60 + 1)
+        shown = []
+        self.engine.alarm.connect(lambda alarm: shown.append(time.monotonic()))
+        for minute in (0, 1):
+            self.now = datetime(2025, 8, 4, 8, minute, 1)
+            started = time.monotonic()
+            self.engine.check_for_alarms()
+            self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(len(shown), 2)
+        self.assertEqual(len(self.window.alarm_queue), 2)
+        dialogs = list(self.window._alarm_dialogs.values())
+        self.assertEqual(len(dialogs), 2)
+        for dialog in dialogs:
+            self.assertTrue(dialog.isVisible())
+            self.assertFalse(dialog.isModal())
+
+    def test_duplicate_alarm_updates_open_dialog(self):
+        self.window.trigger_alarm(medication_alarm())
+        dialog = next(iter(self.window._alarm_dialogs.values()))
+        self.window.trigger_alarm(medication_alarm())
+        self.assertEqual(list(self.window._alarm_dialogs.values()), [dialog])
+        self.assertEqual(self.window.alarm_queue.get(alarm_key(medication_alarm())).count, 2)
+        self.assertIn("2. kez", dialog.windowTitle())
+        self.window.audio.play.assert_called_once()
+
+    def test_last_acknowledge_stops_audio_and_quits_client(self):
+        self.window.trigger_alarm(medication_alarm())
+        self.window.trigger_alarm(medication_alarm(time_slot="Öğle"))
+        first, second = list(self.window._alarm_dialogs.values())
+        with mock.patch.object(QApplication, "quit") as quit_app:
+            first.close()
+            self.window.audio.stop.assert_not_called()
+            quit_app.assert_not_called()
+            second.close()
+            self.window.audio.stop.assert_called_once()
+            quit_app.assert_called_once()
+        self.assertFalse(self.window.alarm_queue)
+        self.assertEqual(len(self.window.alarm_queue.acknowledged), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
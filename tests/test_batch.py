@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# Toplu güncelleme: tüm çizelgenin yenilenmesi tek bildirim, tek kayıt ve tek dizin derlemesi yapar;
+# blok hatayla biterse çizelge, randevu ve ilaçlar önceki haline döner.
+# Kullanım: python3 -m unittest discover tests
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QCoreApplication
+
+from hemsirem_engine import AlarmEngine
+from hemsirem_plan import DAYS, TIME_SLOTS, TIME_FIELD, STATUS_FIELD, NO_TIME, Schedule, Status
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+APPOINTMENT = {"hospital": "Devlet", "doctor": "Dr. A", "time": "10:30", "date": "15.08.2025",
+               "reminder_time": "", "reminder_date": ""}
+
+
+class ScheduleBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.schedule = Schedule()
+        self.schedule.set((0, 0, TIME_FIELD), 8 * 60)
+        self.schedule.set(("appointment_data",), APPOINTMENT)
+        self.schedule.set(("daily_medications",), ["Aspirin"] + [""] * (len(TIME_SLOTS) - 1))
+        self.notified = []
+        self.schedule.subscribe(self.notified.append)
+
+    def test_changes_are_notified_once(self):
+        with self.schedule.batch():
+            self.schedule.set((0, 1, TIME_FIELD), 9 * 60)
+            with self.schedule.batch():
+                self.schedule.set((0, 1, STATUS_FIELD), Status.TAKEN)
+            self.assertEqual(self.notified, [])
+        self.assertEqual(self.notified, [[((0, 1, TIME_FIELD), 9 * 60), ((0, 1, STATUS_FIELD), Status.TAKEN)]])
+
+    def test_exception_restores_everything(self):
+        before = self.schedule.to_state()
+        plan = self.schedule.plan
+        with self.assertRaises(RuntimeError):
+            with self.schedule.batch():
+                for day in range(len(DAYS)):
+                    self.schedule.set((day, 0, TIME_FIELD), 7 * 60)
+                    self.schedule.set((day, 0, STATUS_FIELD), Status.FORGOT)
+                self.schedule.set(("appointment_data",), dict(APPOINTMENT, doctor="Dr. B"))
+                self.schedule.set(("daily_medications",), ["Parol"] * len(TIME_SLOTS))
+                self.schedule.set(("recurrences",), [{"medication": "B12", "start": "01.08.2025 09:00",
+                                                      "rule": "FREQ=MONTHLY;BYDAY=1MO"}])
+                self.schedule.set(("last_reminder",), "x")
+                raise RuntimeError
+        self.assertEqual(self.notified, [])
+        self.assertEqual(self.schedule.to_state(), before)
+        # Görünümlerin tuttuğu çizelge nesnesi aynı kalır
+        self.assertIs(self.schedule.plan, plan)
+        self.assertEqual(self.schedule.appointment.doctor, "Dr. A")
+        self.assertEqual(self.schedule.daily_medications[0], "Aspirin")
+        self.assertEqual(self.schedule.recurrences, ())
+
+    def test_invalid_value_rolls_back_batch(self):
+        with self.assertRaises(ValueError):
+            with self.schedule.batch():
+                self.schedule.set((0, 0, TIME_FIELD), 9 * 60)
+                self.schedule.set((0, 1, TIME_FIELD), 25 * 60)
+        self.assertEqual(self.schedule.plan.minute(0, 0), 8 * 60)
+        self.assertEqual(self.notified, [])
+
+
+class EngineBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.engine = AlarmEngine(self.data_dir, clock=lambda: datetime(2025, 8, 4, 7, 0))
+        self.patient = self.engine.patients["default"]
+        self.signals = []
+        self.engine.changed.connect(lambda *args: self.signals.append(("changed", args)))
+        self.engine.changed_batch.connect(lambda *args: self.signals.append(("changed_batch", args)))
+        self.engine.flush()
+
+    def tearDown(self):
+        self.engine.close()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def counters(self):
+        return self.patient.storage.writes, self.patient.schedule_index.compiles
+
+    def test_full_refresh_is_one_write(self):
+        writes, compiles = self.counters()
+        with self.engine.batch(self.patient.id):
+            for day in range(len(DAYS)):
+                for slot in range(len(TIME_SLOTS)):
+                    self.engine.set_value(self.patient.id, (day, slot, TIME_FIELD), 7 * 60 + slot * 150)
+                    self.engine.set_value(self.patient.id, (day, slot, STATUS_FIELD), Status.TAKEN)
+        self.engine.flush()
+        self.assertEqual([name for name, _ in self.signals], ["changed_batch"])
+        self.assertEqual(len(self.signals[0][1][1]), 2 * len(DAYS) * len(TIME_SLOTS))
+        self.assertEqual(self.counters(), (writes + 1, compiles + 1))
+        self.assertEqual(len(self.patient.history), len(DAYS) * len(TIME_SLOTS))
+
+    def test_failed_batch_writes_nothing(self):
+        writes, compiles = self.counters()
+        with self.assertRaises(ValueError):
+            with self.engine.batch(self.patient.id):
+                self.engine.set_value(self.patient.id, (0, 0, TIME_FIELD), 8 * 60)
+                self.engine.set_value(self.patient.id, (0, 0, STATUS_FIELD), 99)
+        self.engine.flush()
+        self.assertEqual(self.signals, [])
+        self.assertEqual(self.counters(), (writes, compiles))
+        self.assertEqual(self.patient.schedule.plan.minute(0, 0), NO_TIME)
+
+
+if __name__ == "__main__":
+    unittest.main()
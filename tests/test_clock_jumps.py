@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# Alarm motoru ileri/geri atlayan sahte bir saatle: uyku ve saat atlamalarında arada kalan dozlar
+# kaçırılmış olarak bir kez bildirilir, zamanında olanlar çalar, haftalık sıfırlama sınırı doğru işlenir.
+# Kullanım: python3 -m unittest discover tests
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QCoreApplication
+
+from hemsirem_engine import AlarmEngine
+from hemsirem_plan import DAYS, TIME_FIELD, STATUS_FIELD, Status, week_number
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+MONDAY = datetime(2025, 8, 4)
+
+
+class ClockJumpTest(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.engine = None
+
+    def tearDown(self):
+        if self.engine is not None:
+            self.engine.close()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def start(self, now, times):
+        # times: (gün, zaman dilimi, "SS:DD") üçlüleri
+        self.now = now
+        self.engine = AlarmEngine(self.data_dir, clock=lambda: self.now)
+        for day, slot, text in times:
+            hour, minute = map(int, text.split(":"))
+            self.engine.set_value("default", (day, slot, TIME_FIELD), hour * 60 + minute)
+        self.emitted = []
+        self.engine.alarm.connect(self.emitted.append)
+
+    def jump(self, now):
+        # Saat 'now' anına atlar ve zamanlayıcı çalar; (zamanında, kaçırılmış) alarmlar "GG.AA.YYYY SS:DD" olarak
+        self.now = now
+        self.emitted.clear()
+        self.engine.check_for_alarms()
+        on_time, missed = [], []
+        for alarm in self.emitted:
+            if alarm["type"] in ("batch", "missed"):
+                on_time += alarm["alarms"]
+                missed += alarm["missed"]
+            else:
+                on_time.append(alarm)
+        return ([f"{item['date']} {item['time']}" for item in on_time],
+                [f"{item['date']} {item['time']}" for item in missed])
+
+    def test_forward_hours(self):
+        self.start(MONDAY.replace(hour=7, minute=59, second=30), [(0, 0, "08:00"), (0, 2, "12:00")])
+        self.assertEqual(self.jump(MONDAY.replace(hour=13, second=5)), ([], ["04.08.2025 08:00", "04.08.2025 12:00"]))
+        self.assertEqual(self.jump(MONDAY.replace(hour=16)), ([], []))
+
+    def test_steps_of_hours_report_each_dose_once(self):
+        times = [(day, 0, "08:00") for day in range(len(DAYS))] + [(0, 3, "17:30")]
+        self.start(MONDAY, times)
+        reported = []
+        for hours in range(3, 49, 3):
+            on_time, missed = self.jump(MONDAY + timedelta(hours=hours))
+            reported += on_time + missed
+        self.assertEqual(reported, ["04.08.2025 08:00", "04.08.2025 17:30", "05.08.2025 08:00"])
+
+    def test_forward_day(self):
+        self.start(MONDAY.replace(hour=7, minute=59, second=30), [(0, 0, "08:00"), (1, 0, "08:00"), (0, 2, "12:00")])
+        on_time, missed = self.jump(MONDAY + timedelta(days=1, hours=9))
+        self.assertEqual(on_time, [])
+        self.assertEqual(missed, ["04.08.2025 08:00", "04.08.2025 12:00", "05.08.2025 08:00"])
+
+    def test_more_than_a_week_is_capped(self):
+        # On günlük uykudan sonra her girdi bir kez (son bir haftadaki anıyla) bildirilir
+        times = [(day, 0, "08:00") for day in range(len(DAYS))]
+        self.start(MONDAY.replace(hour=7, minute=59, second=30), times)
+        on_time, missed = self.jump(MONDAY + timedelta(days=10, hours=9))
+        self.assertEqual(on_time, [])
+        self.assertEqual(len(missed), len(DAYS))
+        expected = [(MONDAY + timedelta(days=day)).strftime("%d.%m.%Y 08:00") for day in range(4, 11)]
+        self.assertEqual(missed, expected)
+
+    def test_same_minute_one_hour_apart(self):
+        self.start(MONDAY.replace(hour=7, minute=59, second=30), [(0, 0, "08:00"), (0, 1, "09:00")])
+        self.assertEqual(self.jump(MONDAY.replace(hour=8, second=10)), (["04.08.2025 08:00"], []))
+        self.assertEqual(self.jump(MONDAY.replace(hour=9, second=10)), (["04.08.2025 09:00"], []))
+
+    def test_backward_clock(self):
+        self.start(MONDAY.replace(hour=7, minute=59, second=30), [(0, 0, "08:00"), (0, 1, "09:00")])
+        self.assertEqual(self.jump(MONDAY.replace(hour=8, second=10)), (["04.08.2025 08:00"], []))
+        # Saat geri alındı: geri gidiş bir alarm üretmez, sonraki dakikalar yeniden değerlendirilir
+        self.assertEqual(self.jump(MONDAY.replace(hour=7, minute=30)), ([], []))
+        self.assertEqual(self.jump(MONDAY.replace(hour=8, second=5)), (["04.08.2025 08:00"], []))
+        self.assertEqual(self.jump(MONDAY.replace(hour=9, second=5)), (["04.08.2025 09:00"], []))
+
+    def test_weekly_reset_boundary(self):
+        # Pazar 22:00 dozu alınmadı, 23:00 dozu alındı; pazartesi sabahına kadar uyku
+        sunday = MONDAY - timedelta(days=1)
+        self.start(sunday.replace(hour=21), [(6, 4, "22:00"), (6, 5, "23:00"), (0, 0, "08:00")])
+        self.engine.set_value("default", (6, 5, STATUS_FIELD), Status.TAKEN)
+        resets = []
+        self.engine.weekly_reset.connect(resets.append)
+        on_time, missed = self.jump(MONDAY.replace(hour=9))
+        self.assertEqual(on_time, [])
+        self.assertEqual(missed, ["03.08.2025 22:00", "04.08.2025 08:00"])
+        self.assertEqual(resets, ["default"])
+        schedule = self.engine.patients["default"].schedule
+        self.assertEqual(schedule.plan.week, week_number(MONDAY.date()))
+        self.assertEqual(schedule.plan.status(6, 5), Status.UNKNOWN)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# Veri dizinine tek yazar: ikinci bir motor (servis ya da süreç içi arayüz) aynı dosyaları açamaz.
+# Kullanım: python3 -m unittest discover tests
+
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+import hemsirem
+from hemsirem_daemon import HemsiremDaemon
+from hemsirem_engine import AlarmEngine, DataDirLocked, default_data_dir
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+class DataDirLockTest(unittest.TestCase):
+    def setUp(self):
+        self.home = tempfile.mkdtemp()
+        self._home = mock.patch.dict(os.environ, {"HOME": self.home})
+        self._home.start()
+        self.data_dir = default_data_dir()
+
+    def tearDown(self):
+        self._home.stop()
+        shutil.rmtree(self.home, ignore_errors=True)
+
+    def test_second_engine_is_refused_until_first_closes(self):
+        engine = AlarmEngine(self.data_dir)
+        with self.assertRaises(DataDirLocked) as raised:
+            AlarmEngine(self.data_dir)
+        self.assertIn(str(os.getpid()), str(raised.exception))
+        engine.close()
+        AlarmEngine(self.data_dir).close()
+
+    def test_daemon_refuses_locked_data_dir(self):
+        engine = AlarmEngine(self.data_dir)
+        try:
+            with self.assertRaises(DataDirLocked):
+                HemsiremDaemon(self.data_dir)
+        finally:
+            engine.close()
+
+    def test_lock_held_by_another_process(self):
+        holder = subprocess.Popen(
+            [sys.executable, "-c", "import sys, hemsirem_engine; lock = hemsirem_engine.lock_data_dir(sys.argv[1]); "
+                                   "print('locked', flush=True); sys.stdin.read()", self.data_dir],
+            cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, env=dict(os.environ))
+        try:
+            os.makedirs(self.data_dir, exist_ok=True)
+            self.assertEqual(holder.stdout.readline().strip(), "locked")
+            with self.assertRaises(DataDirLocked):
+                AlarmEngine(self.data_dir)
+        finally:
+            holder.communicate("")
+        # Süreç çıkınca kilit çekirdek tarafından bırakılır
+        AlarmEngine(self.data_dir).close()
+
+    def test_gui_does_not_open_locked_files(self):
+        # Servise bağlanılamıyor ve dizin kilitli: arayüz kendi motorunu açmaz, yeniden dener ve vazgeçer
+        engine = AlarmEngine(self.data_dir)
+        try:
+            with mock.patch.object(hemsirem, "DAEMON_RETRY_DELAY_S", 0), \
+                    mock.patch.object(hemsirem.RemoteEngine, "connect_to_daemon", return_value=False) as connect:
+                self.assertIsNone(hemsirem.start_engine())
+            self.assertEqual(connect.call_count, hemsirem.DAEMON_CONNECT_ATTEMPTS)
+        finally:
+            engine.close()
+        local = hemsirem.start_engine()
+        self.assertIsInstance(local, AlarmEngine)
+        local.close()
+
+    def test_alarm_client_never_opens_files(self):
+        with mock.patch.object(hemsirem.RemoteEngine, "connect_to_daemon", return_value=False):
+            self.assertIsNone(hemsirem.start_engine(alarm_client=True))
+        self.assertFalse(os.path.exists(self.data_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
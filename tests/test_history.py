@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# Uyum geçmişi: yalnızca eklemeli kayıt dosyası, blok dizini, yarım kalan kaydın atılması ve salt okunur açılış.
+# Kullanım: python3 -m unittest discover tests
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from hemsirem_history import BLOCK_RECORDS, INDEX_ENTRY, RECORD, AdherenceHistory
+from hemsirem_plan import TIME_SLOTS, Status
+
+START = date(2025, 1, 1)
+DAYS = 200 # 200 gün x 6 zaman dilimi = 1200 kayıt, üç blok
+
+
+def status_of(day, slot):
+    return Status((day + slot) % len(Status))
+
+
+class AdherenceHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        history = AdherenceHistory(self.data_dir)
+        for offset in range(DAYS):
+            for slot in range(len(TIME_SLOTS)):
+                history.append(START + timedelta(days=offset), slot, status_of(offset, slot), 1_700_000_000 + offset)
+        history.close()
+        self.data_file = history.data_file
+        self.index_file = history.index_file
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def reopen(self, readonly=False):
+        return AdherenceHistory(self.data_dir, readonly=readonly)
+
+    def contents(self):
+        with open(self.data_file, 'rb') as f, open(self.index_file, 'rb') as g:
+            return f.read(), g.read()
+
+    def test_append_flush_reopen(self):
+        self.assertGreater(DAYS * len(TIME_SLOTS), 2 * BLOCK_RECORDS)
+        self.assertEqual(os.path.getsize(self.data_file), DAYS * len(TIME_SLOTS) * RECORD.size)
+        history = self.reopen()
+        self.assertEqual(len(history), DAYS * len(TIME_SLOTS))
+        history.append(START, 0, Status.TAKEN, 1_800_000_000)
+        self.assertTrue(history.has_pending())
+        self.assertEqual(len(history), DAYS * len(TIME_SLOTS) + 1)
+        history.flush()
+        self.assertFalse(history.has_pending())
+        # Aynı doz için son kayıt geçerlidir
+        self.assertEqual(self.reopen().final_statuses(START, START)[(START, 0)], Status.TAKEN)
+
+    def test_queries_across_blocks(self):
+        history = self.reopen()
+        # 85. gün ikinci bloğun, 170. gün üçüncü bloğun içindedir
+        for offset in (0, 85, 170):
+            week_start = START + timedelta(days=offset)
+            records = list(history.week(week_start))
+            self.assertEqual(len(records), 7 * len(TIME_SLOTS))
+            self.assertEqual(records[0].day, week_start)
+            self.assertEqual(records[-1].day, week_start + timedelta(days=6))
+            self.assertTrue(all(record.status == status_of((record.day - START).days, record.slot)
+                                for record in records))
+        march = list(history.month(2025, 3))
+        self.assertEqual(len(march), 31 * len(TIME_SLOTS))
+        evenings = list(history.records(START, START + timedelta(days=DAYS - 1), slot=3))
+        self.assertEqual(len(evenings), DAYS)
+        self.assertEqual({record.slot for record in evenings}, {3})
+        self.assertEqual(list(history.month(2025, 12)), [])
+
+    def test_torn_tail_is_truncated(self):
+        with open(self.data_file, 'ab') as f:
+            f.write(RECORD.pack(0, 0, 0, 0)[:5])
+        history = self.reopen()
+        self.assertEqual(len(history), DAYS * len(TIME_SLOTS))
+        history.append(START, 1, Status.FORGOT, 1_800_000_000)
+        history.flush()
+        self.assertEqual(os.path.getsize(self.data_file), (DAYS * len(TIME_SLOTS) + 1) * RECORD.size)
+        self.assertEqual(self.reopen().final_statuses(START, START, slot=1)[(START, 1)], Status.FORGOT)
+
+    def test_bad_or_missing_index_is_rebuilt(self):
+        _, index = self.contents()
+        for damage in (lambda: os.remove(self.index_file),
+                       lambda: open(self.index_file, 'wb').write(b"\x01\x02\x03"),
+                       lambda: open(self.index_file, 'wb').write(index[:INDEX_ENTRY.size])):
+            damage()
+            history = self.reopen()
+            self.assertEqual(len(list(history.week(START + timedelta(days=170)))), 7 * len(TIME_SLOTS))
+            self.assertEqual(self.contents()[1], index)
+
+    def test_readonly_leaves_files_unchanged(self):
+        with open(self.data_file, 'ab') as f:
+            f.write(b"\x00\x00\x00")
+        os.remove(self.index_file)
+        with open(self.data_file, 'rb') as f:
+            data = f.read()
+        history = self.reopen(readonly=True)
+        history.append(START, 0, Status.TAKEN, 1_800_000_000)
+        history.flush()
+        self.assertEqual(len(list(history.month(2025, 1))), 31 * len(TIME_SLOTS))
+        history.close()
+        with open(self.data_file, 'rb') as f:
+            self.assertEqual(f.read(), data)
+        self.assertFalse(os.path.exists(self.index_file))
+
+
+if __name__ == "__main__":
+    unittest.main()
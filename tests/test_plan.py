@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# Alan modeli: ilk sürümün veri dosyası yeni biçime dönüştürülür; geçersiz yollar ve değerler reddedilir.
+# Kullanım: python3 -m unittest discover tests
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from datetime import date
+from io import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from hemsirem_plan import (SCHEMA_VERSION, TIME_FIELD, STATUS_FIELD, WEEK_FIELD, NO_TIME, PLAN_WEEK_PATH, Schedule,
+                           Status, day_number, migrate_legacy, upgrade_change, week_number)
+from hemsirem_storage import JournalStorage
+
+MONDAY = date(2025, 8, 4)
+
+# İlk sürümün hemsiremdata.json dosyası: gün ve zaman dilimi adlarıyla anahtarlanmış, durumlar metin
+LEGACY_DATA = {
+    "Pazartesi": {"Sabah": {"time": "08:00", "status": "İçtim"}, "Akşam": {"time": "19:30", "status": "Bilinmiyor"}},
+    "Salı": {"Öğle": {"time": "12:3 ", "status": "İçmedim"}},
+    "Pazar": "bozuk",
+    "appointment_data": {"hospital": "Devlet", "doctor": "Dr. A", "time": "10:30", "date": "15.08.2025",
+                         "reminder_time": "09:00", "reminder_date": "14.08.2025"},
+    "daily_medications": {"Sabah": "Aspirin", "Gece": "Melatonin"},
+    "last_reset_date": "2025-08-04",
+    "appointment_reminder_last_triggered_datetime": "2025-08-01 09:00",
+}
+
+
+class LegacyMigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.storage = JournalStorage(self.data_dir)
+        with open(self.storage.snapshot_file, 'w', encoding='utf-8') as f:
+            json.dump(LEGACY_DATA, f, ensure_ascii=False, indent=4)
+
+    def tearDown(self):
+        self.storage.close()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def load(self):
+        self.storage.close()
+        self.storage = JournalStorage(self.data_dir)
+        with redirect_stdout(StringIO()) as output:
+            schedule = self.storage.load()
+        return schedule, output.getvalue()
+
+    def check(self, schedule):
+        plan = schedule.plan
+        self.assertEqual(plan.week, week_number(MONDAY))
+        self.assertEqual((plan.minute(0, 0), plan.minute(0, 4), plan.minute(1, 2)), (8 * 60, 19 * 60 + 30, NO_TIME))
+        self.assertEqual((plan.status(0, 0), plan.status(0, 4), plan.status(1, 2)),
+                         (Status.TAKEN, Status.UNKNOWN, Status.NOT_TAKEN))
+        self.assertEqual(schedule.daily_medications.to_list(), ["Aspirin", "", "", "", "", "Melatonin"])
+        self.assertEqual(schedule.appointment.to_dict(), LEGACY_DATA["appointment_data"])
+        self.assertEqual(schedule.extras["appointment_reminder_last_triggered_datetime"], "2025-08-01 09:00")
+
+    def test_baseline_file_is_migrated(self):
+        schedule, output = self.load()
+        self.assertIn("Bilgi:", output)
+        self.check(schedule)
+        # Haftası olmayan işaretli durumlar geçmişe aktarılmak üzere döndürülür
+        self.assertEqual(sorted(self.storage.migrated_statuses),
+                         [(week_number(MONDAY), 0, 0, Status.TAKEN), (week_number(MONDAY), 1, 2, Status.NOT_TAKEN)])
+        with open(self.storage.backup_file, encoding='utf-8') as f:
+            self.assertEqual(json.load(f), LEGACY_DATA)
+        with open(self.storage.snapshot_file, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)["schema"], SCHEMA_VERSION)
+        # İkinci açılış dönüştürmez
+        schedule, output = self.load()
+        self.assertEqual(output, "")
+        self.check(schedule)
+        self.assertEqual(self.storage.migrated_statuses, [])
+
+    def test_legacy_journal_records_are_upgraded(self):
+        self.load()
+        with open(self.storage.journal_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"p": ["Çarşamba", "İkindi", "time"], "v": "15:45"}, ensure_ascii=False) + "\n")
+            f.write(json.dumps({"p": ["daily_medications"], "v": {"Öğle": "Parol"}}, ensure_ascii=False) + "\n")
+        schedule, _ = self.load()
+        self.assertEqual(schedule.plan.minute(2, 3), 15 * 60 + 45)
+        self.assertEqual(schedule.daily_medications[2], "Parol")
+
+    def test_corrupt_file_is_reported(self):
+        with open(self.storage.snapshot_file, 'w', encoding='utf-8') as f:
+            f.write("[1, 2")
+        schedule, output = self.load()
+        self.assertIn("Hata:", output)
+        self.assertEqual(schedule.plan.minute(0, 0), NO_TIME)
+
+
+class UpgradeChangeTest(unittest.TestCase):
+    def test_legacy_paths(self):
+        self.assertEqual(upgrade_change(["Cuma", "Gece", "status"], "Hatırlamıyorum"),
+                         [((4, 5, STATUS_FIELD), Status.FORGOT)])
+        self.assertEqual(upgrade_change(["Cuma", "Gece", "status"], "?"), [((4, 5, STATUS_FIELD), Status.UNKNOWN)])
+        self.assertEqual(upgrade_change(["Cuma", "Gece", "week"], "2025-08-08"),
+                         [((4, 5, WEEK_FIELD), day_number(date(2025, 8, 8)))])
+        self.assertEqual(upgrade_change(["Cuma", "Gece", "week"], "dün"), [])
+        self.assertEqual(upgrade_change(["last_reset_date"], "2025-08-06"), [(PLAN_WEEK_PATH, week_number(MONDAY))])
+        self.assertEqual(upgrade_change(["Cuma", "Gece"], {}), [])
+        self.assertEqual(upgrade_change([0, 0, TIME_FIELD], 480), [((0, 0, TIME_FIELD), 480)])
+
+    def test_migrate_skips_unknown_slots(self):
+        applied = []
+        migrate_legacy({"Pazartesi": {"Brunch": {"time": "10:00", "status": "İçtim"}}, "last_reset_date": "2025-08-04"},
+                       lambda path, value: applied.append((path, value)))
+        self.assertEqual(applied, [(PLAN_WEEK_PATH, week_number(MONDAY))])
+
+
+class InvalidPayloadTest(unittest.TestCase):
+    def setUp(self):
+        self.schedule = Schedule()
+        self.notified = []
+        self.schedule.subscribe(self.notified.append)
+
+    def test_bad_paths(self):
+        for path in (("Pazartesi", "Sabah", "time"), (7, 0, TIME_FIELD), (0, 6, TIME_FIELD), (0, 0, 9), ("Salı",),
+                     ("appointment_data", "time"), ()):
+            with self.assertRaises(ValueError, msg=path):
+                self.schedule.set(path, 0)
+        self.assertEqual(self.notified, [])
+
+    def test_bad_values(self):
+        for path, value in (((0, 0, TIME_FIELD), 24 * 60), ((0, 0, TIME_FIELD), -2), ((0, 0, TIME_FIELD), "08:00"),
+                            ((0, 0, TIME_FIELD), True), ((0, 0, STATUS_FIELD), 9), ((0, 0, WEEK_FIELD), 1 << 16),
+                            (PLAN_WEEK_PATH, "2025-08-04"), (("appointment_data",), {"time": "8:30"}),
+                            (("appointment_data",), {"date": "31.02.2025"}), (("daily_medications",), [1]),
+                            (("recurrences",), {"medication": "A"}),
+                            (("recurrences",), [{"medication": "A", "start": "01.08.2025 08:00", "rule": "FREQ=YEARLY"}])):
+            with self.assertRaises(ValueError, msg=(path, value)):
+                self.schedule.set(path, value)
+        self.assertEqual(self.notified, [])
+        self.assertEqual(self.schedule.to_state(), Schedule().to_state())
+
+    def test_state_loading_strictness(self):
+        state = {"settings": {"appointment_data": {"hospital": "Devlet", "time": "8:30"}, "daily_medications": [1, "B"],
+                              "recurrences": [{"medication": "A", "start": "?", "rule": "FREQ=DAILY"}]}}
+        schedule = Schedule.from_state(state)
+        self.assertEqual((schedule.appointment.hospital, schedule.appointment.time), ("Devlet", ""))
+        self.assertEqual(schedule.daily_medications.to_list()[:2], ["", "B"])
+        self.assertEqual(schedule.recurrences, ())
+        with self.assertRaises(ValueError):
+            Schedule.from_state(state, strict=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# Tekrar kuralları: tekrarların hesaplanması ve alarm motoruna bağlanması (uyku sonrası özet, kalıcı anahtar).
+# Kullanım: python3 -m unittest discover tests
+
+import os
+import sys
+import shutil
+import tempfile
+import itertools
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QCoreApplication
+
+from hemsirem_alarms import alarm_key
+from hemsirem_engine import AlarmEngine
+from hemsirem_recurrence import Recurrence
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+START = datetime(2025, 8, 1, 0, 0)
+
+
+def rule(medication, text, start=START):
+    return {"medication": medication, "start": start.strftime("%d.%m.%Y %H:%M"), "rule": text}
+
+
+class RecurrenceTest(unittest.TestCase):
+    def test_every_eight_hours(self):
+        recurrence = Recurrence("Antibiyotik", START, "FREQ=HOURLY;INTERVAL=8")
+        self.assertEqual(recurrence.next_occurrences(START, 3),
+                         [START + timedelta(hours=8), START + timedelta(hours=16), START + timedelta(days=1)])
+        self.assertEqual(recurrence.describe(), "8 saatte bir")
+
+    def test_monthly_ordinal_and_last_day(self):
+        first_monday = Recurrence("B12", datetime(2025, 8, 1, 10), "FREQ=MONTHLY;BYDAY=1MO")
+        self.assertEqual(first_monday.next_occurrences(datetime(2025, 8, 1), 2),
+                         [datetime(2025, 8, 4, 10), datetime(2025, 9, 1, 10)])
+        last_day = Recurrence("D", datetime(2025, 1, 1, 9), "FREQ=MONTHLY;BYMONTHDAY=-1")
+        self.assertEqual(last_day.next_after(datetime(2025, 2, 1)), datetime(2025, 2, 28, 9))
+
+    def test_jump_matches_full_iteration(self):
+        for text in ("FREQ=HOURLY;INTERVAL=7;COUNT=50", "FREQ=DAILY;INTERVAL=3;BYHOUR=8,20",
+                     "FREQ=WEEKLY;INTERVAL=2;BYDAY=TU,SU;COUNT=33", "FREQ=MONTHLY;BYMONTHDAY=31,-1;COUNT=20",
+                     "FREQ=MONTHLY;BYDAY=-1FR,MO;BYMONTHDAY=1,2,3,-1;COUNT=15",
+                     "FREQ=DAILY;UNTIL=20250901T000000"):
+            recurrence = Recurrence("X", datetime(2025, 7, 3, 9, 30), text)
+            full = list(itertools.islice(recurrence.occurrences(), 2000))
+            for hours in range(-24, 24 * 120, 37):
+                after = datetime(2025, 7, 3, 9, 30) + timedelta(hours=hours)
+                self.assertEqual(recurrence.next_occurrences(after, 3), [m for m in full if m > after][:3], (text, after))
+
+    def test_round_trip_and_invalid_rules(self):
+        recurrence = Recurrence.from_line("Antibiyotik | 01.08.2025 08:00 | freq=hourly;interval=8")
+        self.assertEqual(Recurrence.from_dict(recurrence.to_dict()).to_line(), recurrence.to_line())
+        # BYDAY ile BYMONTHDAY birlikte: yalnızca ikisine de uyan günler (13'üne denk gelen cumalar)
+        friday_13 = Recurrence.from_line("D | 01.01.2025 09:00 | FREQ=MONTHLY;BYDAY=FR;BYMONTHDAY=13")
+        self.assertEqual(Recurrence.from_line(friday_13.to_line()).to_line(), friday_13.to_line())
+        self.assertEqual(friday_13.next_occurrences(datetime(2025, 1, 1), 3),
+                         [datetime(2025, 6, 13, 9), datetime(2026, 2, 13, 9), datetime(2026, 3, 13, 9)])
+        for text in ("INTERVAL=2", "FREQ=DAILY;INTERVAL=0", "FREQ=WEEKLY;BYDAY=1SU", "FREQ=DAILY;X=1",
+                     "FREQ=HOURLY;BYHOUR=8"):
+            with self.assertRaises(ValueError, msg=text):
+                Recurrence("X", START, text)
+
+
+class RecurrenceAlarmTest(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.now = datetime(2025, 8, 3, 23, 30)
+        self.engine = AlarmEngine(self.data_dir, clock=lambda: self.now)
+        self.emitted = []
+        self.engine.alarm.connect(self.emitted.append)
+
+    def tearDown(self):
+        self.engine.close()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def wake(self, now):
+        self.now = now
+        self.emitted.clear()
+        self.engine.check_for_alarms()
+        on_time, missed = [], []
+        for alarm in self.emitted:
+            if alarm["type"] in ("batch", "missed"):
+                on_time += alarm["alarms"]
+                missed += alarm["missed"]
+            else:
+                on_time.append(alarm)
+        return on_time, missed
+
+    def test_long_sleep_reports_latest_missed_dose_with_count(self):
+        self.engine.set_value("default", ("recurrences",), [rule("Antibiyotik", "FREQ=HOURLY;INTERVAL=8")])
+        on_time, missed = self.wake(datetime(2025, 8, 4, 9, 0))
+        self.assertEqual(on_time, [])
+        self.assertEqual([(item["time"], item["missed_count"]) for item in missed], [("08:00", 2)])
+        self.assertEqual(self.engine.alarm_scheduler.next_deadline(), datetime(2025, 8, 4, 16, 0))
+
+    def test_due_dose_rings_and_earlier_ones_are_summarised(self):
+        self.engine.set_value("default", ("recurrences",), [rule("Antibiyotik", "FREQ=HOURLY;INTERVAL=8")])
+        on_time, missed = self.wake(datetime(2025, 8, 4, 8, 0, 20))
+        self.assertEqual([item["time"] for item in on_time], ["08:00"])
+        self.assertEqual([(item["time"], item["missed_count"]) for item in missed], [("00:00", 1)])
+        self.assertEqual(self.wake(datetime(2025, 8, 4, 16, 0, 5))[0][0]["medications"], "Antibiyotik")
+
+    def test_alarm_key_survives_deleting_an_earlier_rule(self):
+        first, second = rule("A", "FREQ=DAILY;BYHOUR=7"), rule("B", "FREQ=DAILY;BYHOUR=8")
+        self.engine.set_value("default", ("recurrences",), [first, second])
+        on_time, _ = self.wake(datetime(2025, 8, 4, 8, 0, 5))
+        key = alarm_key(on_time[0])
+        self.assertEqual(on_time[0]["medications"], "B")
+        self.engine.set_value("default", ("recurrences",), [second])
+        on_time, _ = self.wake(datetime(2025, 8, 5, 8, 0, 5))
+        self.assertEqual(alarm_key(on_time[0]), key)
+        # Silinen kural yığından düşer, kalan kuralın sıradaki tekrarı bekler
+        self.assertEqual(self.engine.alarm_scheduler.next_deadline(), datetime(2025, 8, 6, 8, 0))
+        self.assertEqual(len(self.engine.alarm_scheduler), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# Uyum raporu: işaretlenmemiş planlı dozlar hafta kapanınca "Bilinmiyor" olarak sayılır.
+# Kullanım: python3 -m unittest discover tests
+
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QCoreApplication
+
+from hemsirem_engine import AlarmEngine
+from hemsirem_history import AdherenceHistory
+from hemsirem_plan import DAYS, TIME_SLOTS, TIME_FIELD, STATUS_FIELD, Status
+from hemsirem_report import REPORT_STATUSES, AdherenceReport, percentages
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+MONDAY = datetime(2025, 8, 4)
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def counts(report):
+    return dict(zip(REPORT_STATUSES, report.total))
+
+
+class UnmarkedDosesTest(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.now = MONDAY.replace(hour=7)
+        self.engine = AlarmEngine(self.data_dir, clock=lambda: self.now)
+        self.patient = self.engine.patients["default"]
+        for day in range(len(DAYS)):
+            for slot in range(len(TIME_SLOTS)):
+                self.engine.set_value("default", (day, slot, TIME_FIELD), 8 * 60 + slot * 120)
+        self.engine.set_value("default", (0, 0, STATUS_FIELD), Status.TAKEN)
+
+    def tearDown(self):
+        self.engine.close()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def report(self):
+        self.engine.flush()
+        history = AdherenceHistory(self.data_dir, readonly=True)
+        return AdherenceReport(history, MONDAY.date(), MONDAY.date() + timedelta(days=6))
+
+    def test_closed_week_counts_unmarked_doses(self):
+        self.now += timedelta(days=7)
+        self.engine.check_and_reset_weekly(self.patient)
+        report = self.report()
+        self.assertEqual(report.dose_count, len(DAYS) * len(TIME_SLOTS))
+        self.assertEqual(counts(report)["İçtim"], 1)
+        self.assertEqual(counts(report)["Bilinmiyor"], len(DAYS) * len(TIME_SLOTS) - 1)
+        self.assertAlmostEqual(percentages(report.total)[0], 100 / 42)
+
+    def test_slots_without_time_are_not_scheduled(self):
+        self.engine.set_value("default", (6, 5, TIME_FIELD), -1)
+        self.now += timedelta(days=7)
+        self.engine.check_and_reset_weekly(self.patient)
+        self.assertEqual(self.report().dose_count, len(DAYS) * len(TIME_SLOTS) - 1)
+
+    def test_marked_later_overrides_unknown(self):
+        self.now += timedelta(days=7)
+        self.engine.check_and_reset_weekly(self.patient)
+        # Biten haftanın dozu sonradan işaretlendi: geçmişteki son kayıt geçerlidir
+        self.patient.history.append(MONDAY.date(), 1, Status.NOT_TAKEN, self.now.timestamp())
+        self.assertEqual(counts(self.report())["Bilinmiyor"], len(DAYS) * len(TIME_SLOTS) - 2)
+
+    def test_clock_set_back_records_nothing(self):
+        self.now -= timedelta(days=7)
+        self.engine.check_and_reset_weekly(self.patient)
+        self.assertEqual(self.report().dose_count, 1)
+
+
+class ReportWorkerImportTest(unittest.TestCase):
+    def test_report_does_not_load_qt_or_engine(self):
+        # Rapor işçileri yalnızca geçmişi okur; motor ve PyQt5 her süreçte yüklenmemeli
+        loaded = subprocess.run(
+            [sys.executable, "-c", "import sys, hemsirem_report; "
+                                   "print(sorted(m for m in sys.modules if m.startswith(('PyQt5', 'hemsirem_engine'))))"],
+            cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        self.assertEqual(loaded, "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
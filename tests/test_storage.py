@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# Depolama: günlüğün yeniden açılışta oynatılması, elektrik kesintisinde yarım kalan son satır,
+# anlık görüntüye atomik sıkıştırma; SQLite arka ucunun eski şemadan dönüştürülmesi ve seçimi.
+# Kullanım: python3 -m unittest discover tests
+
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from datetime import date
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import hemsirem_storage
+from hemsirem_plan import (DAYS, TIME_SLOTS, SCHEMA_VERSION, PLAN_WEEK_PATH, TIME_FIELD, STATUS_FIELD, NO_TIME,
+                           Status, week_number)
+from hemsirem_storage import JournalStorage, SqliteStorage, open_storage
+
+MONDAY = date(2025, 8, 4)
+
+
+class JournalStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.storage = JournalStorage(self.data_dir)
+        self.schedule = self.storage.load()
+
+    def tearDown(self):
+        self.storage.close()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def reopen(self):
+        self.storage.close()
+        self.storage = JournalStorage(self.data_dir)
+        self.schedule = self.storage.load()
+        return self.schedule
+
+    def journal_lines(self):
+        with open(self.storage.journal_file, 'rb') as f:
+            return f.read().splitlines()
+
+    def test_journal_replayed_after_restart(self):
+        self.schedule.set(PLAN_WEEK_PATH, week_number(MONDAY))
+        self.schedule.set((0, 0, TIME_FIELD), 8 * 60)
+        with self.schedule.batch():
+            self.schedule.set((0, 0, STATUS_FIELD), Status.TAKEN)
+            self.schedule.set(("daily_medications",), ["Aspirin"])
+        self.storage.flush()
+        self.assertEqual(len(self.journal_lines()), 3)
+        self.assertFalse(os.path.exists(self.storage.snapshot_file))
+        schedule = self.reopen()
+        self.assertEqual(schedule.plan.minute(0, 0), 8 * 60)
+        self.assertEqual(schedule.plan.status(0, 0), Status.TAKEN)
+        self.assertEqual(schedule.daily_medications[0], "Aspirin")
+
+    def test_torn_last_line_is_truncated(self):
+        self.schedule.set((0, 0, TIME_FIELD), 8 * 60)
+        self.storage.flush()
+        # Yazma sırasında elektrik kesildi: son satırın yalnızca bir kısmı diske ulaştı
+        with open(self.storage.journal_file, 'ab') as f:
+            f.write(b'{"b":[[[0,1,0],540],[[0,1,1')
+        schedule = self.reopen()
+        self.assertEqual(schedule.plan.minute(0, 0), 8 * 60)
+        self.assertEqual(schedule.plan.minute(0, 1), NO_TIME)
+        self.assertEqual(len(self.journal_lines()), 1)
+        # Sonraki kayıt yarım satıra yapışmaz
+        schedule.set((0, 2, TIME_FIELD), 12 * 60)
+        self.storage.flush()
+        self.assertEqual(self.reopen().plan.minute(0, 2), 12 * 60)
+
+    def test_compaction_writes_snapshot_atomically(self):
+        self.schedule.set((1, 0, TIME_FIELD), 9 * 60)
+        with mock.patch.object(hemsirem_storage.os, "replace", wraps=os.replace) as replace:
+            self.storage.compact(background=False)
+        self.assertIn(mock.call(self.storage.snapshot_file + ".tmp", self.storage.snapshot_file), replace.call_args_list)
+        for path in (self.storage.journal_file, self.storage.compacting_file, self.storage.snapshot_file + ".tmp"):
+            self.assertFalse(os.path.exists(path), path)
+        with open(self.storage.snapshot_file, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)["schema"], SCHEMA_VERSION)
+        self.assertEqual(self.reopen().plan.minute(1, 0), 9 * 60)
+
+    def test_interrupted_compaction_keeps_old_snapshot(self):
+        self.schedule.set((1, 0, TIME_FIELD), 9 * 60)
+        self.storage.compact(background=False)
+        with open(self.storage.snapshot_file, 'rb') as f:
+            snapshot = f.read()
+        self.schedule.set((1, 1, TIME_FIELD), 10 * 60)
+        real_replace = os.replace
+
+        def replace(src, dst):
+            if dst == self.storage.snapshot_file:
+                raise OSError("disk dolu")
+            real_replace(src, dst)
+
+        # Anlık görüntü yerine konamadı: eski dosya bozulmaz, devreden günlük diskte kalır
+        with mock.patch.object(hemsirem_storage.os, "replace", side_effect=replace), redirect_stdout(StringIO()):
+            self.storage.compact(background=False)
+        with open(self.storage.snapshot_file, 'rb') as f:
+            self.assertEqual(f.read(), snapshot)
+        self.assertTrue(os.path.exists(self.storage.compacting_file))
+        schedule = self.reopen()
+        self.assertEqual((schedule.plan.minute(1, 0), schedule.plan.minute(1, 1)), (9 * 60, 10 * 60))
+        # Açılışta yarım kalan sıkıştırma tamamlanır
+        self.assertFalse(os.path.exists(self.storage.compacting_file))
+
+    def test_threshold_compacts_in_background(self):
+        with mock.patch.object(hemsirem_storage, "COMPACT_THRESHOLD", 5):
+            for day in range(5):
+                self.schedule.set((day, 0, TIME_FIELD), 8 * 60 + day)
+            self.storage.flush()
+            self.storage.close()
+        self.assertFalse(os.path.exists(self.storage.journal_file))
+        schedule = self.reopen()
+        self.assertEqual([schedule.plan.minute(day, 0) for day in range(5)], [8 * 60 + day for day in range(5)])
+
+
+class SqliteStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.storage = None
+
+    def tearDown(self):
+        if self.storage is not None:
+            self.storage.close()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def open(self):
+        if self.storage is not None:
+            self.storage.close()
+        self.storage = SqliteStorage(self.data_dir, DAYS, TIME_SLOTS)
+        with redirect_stdout(StringIO()) as output:
+            schedule = self.storage.load()
+        return schedule, output.getvalue()
+
+    def create_v1(self, week_column):
+        # Sürüm 1 veritabanı: metin saat ve durum; "week" sütunu geçmiş kaydı eklenince ALTER TABLE ile gelmişti
+        conn = sqlite3.connect(os.path.join(self.data_dir, "hemsiremdata.sqlite3"))
+        conn.executescript(f"""
+            CREATE TABLE schedule (weekday INTEGER NOT NULL, slot INTEGER NOT NULL, time TEXT, minute_of_day INTEGER,
+                                   status TEXT, PRIMARY KEY (weekday, slot));
+            CREATE INDEX schedule_by_minute ON schedule (weekday, minute_of_day);
+            CREATE TABLE status_log (id INTEGER PRIMARY KEY, changed_at TEXT NOT NULL, weekday INTEGER NOT NULL,
+                                     slot INTEGER NOT NULL, status TEXT);
+            CREATE INDEX status_log_by_slot ON status_log (weekday, slot, changed_at);
+            CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT);
+            {"ALTER TABLE schedule ADD COLUMN week TEXT;" if week_column else ""}
+        """)
+        rows = [(0, 0, "08:00", 480, "İçtim"), (1, 2, "12:30", 750, "Bilinmiyor"), (2, 1, "", None, "İçmedim")]
+        for row in rows:
+            columns = "weekday, slot, time, minute_of_day, status" + (", week" if week_column else "")
+            values = row + (("2025-08-04",) if week_column else ())
+            conn.execute(f"INSERT INTO schedule ({columns}) VALUES ({', '.join('?' * len(values))})", values)
+        conn.execute("INSERT INTO status_log (changed_at, weekday, slot, status) VALUES ('2025-08-04 08:01:00', 0, 0, 'İçtim')")
+        settings = {"_migrated": "hemsiremdata.json", "last_reset_date": "2025-08-04",
+                    "daily_medications": {"Sabah": "Aspirin", "Gece": "Melatonin"},
+                    "appointment_data": {"hospital": "Devlet", "time": "10:3", "date": "15.08.2025"}}
+        if week_column:
+            settings["status_week"] = "2025-08-04"
+        conn.executemany("INSERT INTO settings (key, value) VALUES (?, ?)",
+                         [(key, value if key == "_migrated" else json.dumps(value, ensure_ascii=False))
+                          for key, value in settings.items()])
+        conn.commit()
+        conn.close()
+
+    def check_v1_data(self, schedule):
+        self.assertEqual(schedule.plan.week, week_number(MONDAY))
+        self.assertEqual((schedule.plan.minute(0, 0), schedule.plan.minute(1, 2), schedule.plan.minute(2, 1)),
+                         (8 * 60, 12 * 60 + 30, NO_TIME))
+        self.assertEqual((schedule.plan.status(0, 0), schedule.plan.status(2, 1)), (Status.TAKEN, Status.NOT_TAKEN))
+        self.assertEqual(schedule.daily_medications.to_list(), ["Aspirin", "", "", "", "", "Melatonin"])
+        # Eski sürümün kaydettiği yarım saat boş bırakılır, diğer alanlar korunur
+        self.assertEqual((schedule.appointment.hospital, schedule.appointment.time), ("Devlet", ""))
+        self.assertEqual(schedule.appointment.date, "15.08.2025")
+
+    def test_v1_database_is_migrated(self):
+        for week_column in (True, False):
+            with self.subTest(week_column=week_column):
+                shutil.rmtree(self.data_dir)
+                os.makedirs(self.data_dir)
+                self.create_v1(week_column)
+                schedule, output = self.open()
+                self.assertIn("Bilgi:", output)
+                self.check_v1_data(schedule)
+                self.assertTrue(os.path.exists(self.storage.backup_file))
+                # Haftası olmayan durumlar son sıfırlama haftasına yazılır ve geçmişe aktarılmak üzere döndürülür
+                self.assertEqual(len(self.storage.migrated_statuses), 0 if week_column else 2)
+                conn = self.storage._conn
+                self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+                self.assertEqual(conn.execute("SELECT status FROM status_log").fetchall(), [(Status.TAKEN,)])
+                # Dönüştürülmüş veritabanı yeniden açılınca yeniden dönüştürülmez
+                schedule, output = self.open()
+                self.assertEqual(output, "")
+                self.check_v1_data(schedule)
+
+    def test_changes_survive_reopen(self):
+        schedule, _ = self.open()
+        schedule.set(PLAN_WEEK_PATH, week_number(MONDAY))
+        with schedule.batch():
+            schedule.set((3, 4, TIME_FIELD), 18 * 60)
+            schedule.set((3, 4, STATUS_FIELD), Status.FORGOT)
+        schedule.set(("daily_medications",), ["", "", "", "", "Parol"])
+        self.storage.flush()
+        schedule, _ = self.open()
+        self.assertEqual((schedule.plan.minute(3, 4), schedule.plan.status(3, 4)), (18 * 60, Status.FORGOT))
+        self.assertEqual(schedule.daily_medications[4], "Parol")
+
+    def test_json_data_is_imported(self):
+        journal = JournalStorage(self.data_dir)
+        journal.load().set((0, 0, TIME_FIELD), 7 * 60)
+        journal.close()
+        schedule, _ = self.open()
+        self.assertEqual(schedule.plan.minute(0, 0), 7 * 60)
+        # Aktarım bir kez yapılır; sonraki açılışlar JSON dosyalarını okumaz
+        os.remove(journal.journal_file)
+        self.assertEqual(self.open()[0].plan.minute(0, 0), 7 * 60)
+
+    def test_backend_chosen_by_environment(self):
+        for value, backend in (("sqlite", SqliteStorage), ("SQLite", SqliteStorage), ("journal", JournalStorage),
+                               ("", JournalStorage)):
+            with mock.patch.dict(os.environ, {"HEMSIREM_STORAGE": value}):
+                self.assertIsInstance(open_storage(self.data_dir, DAYS, TIME_SLOTS), backend, value)
+        with mock.patch.dict(os.environ, {"HEMSIREM_STORAGE": "redis"}), redirect_stdout(StringIO()) as output:
+            self.assertIsInstance(open_storage(self.data_dir, DAYS, TIME_SLOTS), JournalStorage)
+        self.assertIn("Uyarı:", output.getvalue())
+        with mock.patch.dict(os.environ, {"HEMSIREM_STORAGE": "journal"}):
+            self.assertIsInstance(open_storage(self.data_dir, DAYS, TIME_SLOTS, backend="sqlite"), SqliteStorage)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# Haftalık şablon: bir zaman diliminin saati ve günlük ilacı seçilen günlere kopyalanır; aynı olan günler
+# atlanır ve tüm işlem tek kayıt, tek alarm dizini derlemesiyle uygulanır.
+# Kullanım: python3 -m unittest discover tests
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from hemsirem_plan import DAY_GROUPS, DAYS, TIME_SLOTS, TIME_FIELD, Schedule, template_changes
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+import hemsirem
+from hemsirem_engine import AlarmEngine
+
+
+class TemplateChangesTest(unittest.TestCase):
+    def setUp(self):
+        self.schedule = Schedule()
+
+    def test_day_groups(self):
+        for group, days in (("Hafta içi", range(5)), ("Hafta sonu", (5, 6)), ("Tüm hafta", range(len(DAYS)))):
+            self.assertEqual(template_changes(self.schedule, 2, 12 * 60, DAY_GROUPS[group]),
+                             [((day, 2, TIME_FIELD), 12 * 60) for day in days], group)
+
+    def test_days_with_the_time_are_skipped(self):
+        self.schedule.apply((1, 0, TIME_FIELD), 8 * 60)
+        self.schedule.apply((3, 0, TIME_FIELD), 8 * 60)
+        self.schedule.apply((4, 0, TIME_FIELD), 9 * 60)
+        self.assertEqual(template_changes(self.schedule, 0, 8 * 60, DAY_GROUPS["Hafta içi"]),
+                         [((day, 0, TIME_FIELD), 8 * 60) for day in (0, 2, 4)])
+        for day in DAY_GROUPS["Hafta içi"]:
+            self.schedule.apply((day, 0, TIME_FIELD), 8 * 60)
+        self.assertEqual(template_changes(self.schedule, 0, 8 * 60, DAY_GROUPS["Hafta içi"], ""), [])
+
+    def test_daily_medications_replaced(self):
+        self.schedule.apply(("daily_medications",), ["Aspirin", "Parol"])
+        changes = template_changes(self.schedule, 1, 10 * 60, [0], "Coraspin")
+        self.assertEqual(changes[-1], (("daily_medications",), ["Aspirin", "Coraspin"] + [""] * (len(TIME_SLOTS) - 2)))
+        # Liste kopyalanır; çizelgenin kendisi değişmez
+        self.assertEqual(self.schedule.daily_medications[1], "Parol")
+        self.assertEqual(template_changes(self.schedule, 1, 10 * 60, [], "Parol"), [])
+
+
+class TemplateDialogTest(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.engine = AlarmEngine(self.data_dir, clock=lambda: datetime(2025, 8, 4, 7, 0))
+        self.window = hemsirem.HemşiremApp(self.engine)
+        self.patient = self.engine.patients["default"]
+        self.engine.set_value(self.patient.id, (6, 1, TIME_FIELD), 10 * 60)
+        self.engine.flush()
+
+    def tearDown(self):
+        self.engine.close()
+        self.window.deleteLater()
+        app.processEvents()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_apply_is_one_write_and_one_compile(self):
+        def fill(dialog):
+            dialog.slot_combo.setCurrentIndex(1)
+            dialog.time_edit.setText("10:00")
+            dialog.medications_edit.setText("Coraspin")
+            dialog.select_days(DAY_GROUPS["Tüm hafta"])
+            return 1
+
+        writes, compiles = self.patient.storage.writes, self.patient.schedule_index.compiles
+        with mock.patch.object(hemsirem.TemplateDialog, "exec_", fill):
+            self.window.show_template_dialog()
+        self.engine.flush()
+        self.assertEqual(self.patient.storage.writes, writes + 1)
+        self.assertEqual(self.patient.schedule_index.compiles, compiles + 1)
+        schedule = self.patient.schedule
+        self.assertEqual([schedule.plan.minute(day, 1) for day in range(len(DAYS))], [10 * 60] * len(DAYS))
+        self.assertEqual(schedule.daily_medications[1], "Coraspin")
+
+    def test_cancel_changes_nothing(self):
+        writes = self.patient.storage.writes
+        with mock.patch.object(hemsirem.TemplateDialog, "exec_", return_value=0):
+            self.window.show_template_dialog()
+        self.engine.flush()
+        self.assertEqual(self.patient.storage.writes, writes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# Saat ve tarih girişi: maskeli alan her tuşta yazılsa da yarım girilen saat kaydedilmez.
+# Kullanım: python3 -m unittest discover tests
+
+import os
+import sys
+import unittest
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QCoreApplication
+
+from hemsirem_model import WeeklyScheduleModel
+from hemsirem_plan import DAYS, TIME_SLOTS, TIME_FIELD, NO_TIME, Appointment, WeeklyPlan, parse_date, parse_time
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+
+class ParseTest(unittest.TestCase):
+    def test_time_needs_two_digit_parts(self):
+        self.assertEqual(parse_time("08:30"), 8 * 60 + 30)
+        self.assertEqual(parse_time("23:59"), 23 * 60 + 59)
+        for text in ("08:3 ", "8:30", "0 :30", "  :  ", "24:00", "08:60", "0830", "０８:３０", "", None):
+            self.assertIsNone(parse_time(text), text)
+
+    def test_date_needs_full_parts(self):
+        self.assertEqual(parse_date("31.07.2025"), date(2025, 7, 31))
+        for text in ("1.7.2025", "31.07.202 ", "31.02.2025", "  .  .    ", None):
+            self.assertIsNone(parse_date(text), text)
+
+    def test_appointment_rejects_partial_time(self):
+        appointment = Appointment()
+        with self.assertRaises(ValueError):
+            appointment.time = "10:3 "
+        appointment.time = "10:30"
+        self.assertEqual(appointment.time, "10:30")
+
+
+class TimeEditTest(unittest.TestCase):
+    def test_keystrokes_write_only_the_complete_time(self):
+        written = []
+        plan = WeeklyPlan()
+        model = WeeklyScheduleModel(DAYS, TIME_SLOTS, lambda path, value: written.append((path, value)))
+        model.set_plan(plan)
+        index = model.index(0, model.column(0, TIME_FIELD))
+        # "99:99" maskeli alanda "08:30" yazılırken model her tuşta bu metinleri alır
+        for text in ("0 :  ", "08:  ", "08:3 "):
+            self.assertFalse(model.setData(index, text), text)
+        self.assertEqual(written, [])
+        self.assertTrue(model.setData(index, "08:30"))
+        self.assertEqual(written, [((0, 0, TIME_FIELD), 8 * 60 + 30)])
+
+    def test_cleared_time_is_no_time(self):
+        written = []
+        plan = WeeklyPlan()
+        plan.minutes[0] = 8 * 60
+        model = WeeklyScheduleModel(DAYS, TIME_SLOTS, lambda path, value: written.append((path, value)))
+        model.set_plan(plan)
+        self.assertTrue(model.setData(model.index(0, model.column(0, TIME_FIELD)), "  :  "))
+        self.assertEqual(written, [((0, 0, TIME_FIELD), NO_TIME)])
+
+
+if __name__ == "__main__":
+    unittest.main()